@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Subject, Attendance, AttendanceReport
+from .models import Subject, Attendance, AttendanceArchive, AttendanceReport
 
 
 @admin.register(Subject)
@@ -41,4 +41,15 @@ class AttendanceReportAdmin(admin.ModelAdmin):
     readonly_fields = ('attendance_percentage', 'generated_at')
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('student__user', 'subject')
\ No newline at end of file
+        return super().get_queryset(request).select_related('student__user', 'subject')
+
+
+@admin.register(AttendanceArchive)
+class AttendanceArchiveAdmin(admin.ModelAdmin):
+    """
+    Read-only view of packed attendance for closed academic years
+    """
+    list_display = ('student', 'subject', 'academic_year', 'start_date', 'days', 'created_at')
+    list_filter = ('academic_year', 'subject')
+    search_fields = ('student__student_id',)
+    readonly_fields = ('statuses', 'marked', 'created_at')
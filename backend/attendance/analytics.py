@@ -0,0 +1,214 @@
+"""
+Class-wide attendance analytics computed with NumPy.
+
+Attendance for one class/section and month is pulled as flat columns
+(`values_list`, or decoded from the archive for closed years) and scattered into students × days arrays, from which the
+matrix, per-student percentages, absence streaks, rolling class percentage
+and subject breakdowns are derived without per-row Python loops.
+
+Results are cached per class-month. Any attendance write for the class
+bumps its cache version (see `bump_version`), so stale entries are never
+served.
+"""
+import calendar
+from datetime import date
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import IntegerField
+from django.db.models.functions import Cast
+
+from students.models import Student
+from .archive import attendance_rows
+from .models import Attendance, Subject
+
+STATUS_CODES = Attendance.STATUS_CODES
+ATTENDED_CODES = (STATUS_CODES['present'], STATUS_CODES['late'])
+ROLLING_WINDOW = 7
+
+
+def cache_timeout():
+    return getattr(settings, 'ATTENDANCE_ANALYTICS_CACHE_TIMEOUT', 60 * 60)
+
+
+def chronic_threshold():
+    return getattr(settings, 'ATTENDANCE_CHRONIC_THRESHOLD', 75.0)
+
+
+def _version_key(class_name, section):
+    return f"attendance_analytics_version:{class_name}:{section}"
+
+
+def bump_version(class_name, section):
+    """Invalidate every cached month of a class/section."""
+    key = _version_key(class_name, section)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def cached(kind, class_name, section, year, month, build):
+    version = cache.get(_version_key(class_name, section), 1)
+    key = f"attendance_analytics:{kind}:{class_name}:{section}:{year}:{month}:v{version}"
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, cache_timeout())
+    return data
+
+
+class ClassMonth:
+    """Columnar attendance for one class/section and month."""
+
+    def __init__(self, class_name, section, year, month):
+        self.class_name, self.section, self.year, self.month = class_name, section, year, month
+        first = date(year, month, 1)
+        last = date(year, month, calendar.monthrange(year, month)[1])
+
+        self.students = list(
+            Student.objects.filter(current_class=class_name, current_section=section, is_active=True)
+            .order_by(Cast('roll_number', IntegerField()), 'student_id')
+            .values('id', 'student_id', 'roll_number', 'user__first_name', 'user__last_name')
+        )
+        student_ids = np.array([s['id'] for s in self.students], dtype=np.int64)
+
+        # Live and archived years alike
+        rows = attendance_rows(first, last, current_class=class_name, current_section=section, is_active=True)
+        count = len(rows)
+        student_col = np.fromiter((r[0] for r in rows), dtype=np.int64, count=count)
+        day_col = np.fromiter((r[1].day - 1 for r in rows), dtype=np.int64, count=count)
+        subject_col = np.fromiter((r[2] for r in rows), dtype=np.int64, count=count)
+        status_col = np.fromiter((STATUS_CODES.get(r[3], STATUS_CODES['absent']) for r in rows), dtype=np.int8, count=count)
+
+        # Map student pks to matrix rows; the roster is in roll order, so search a sorted view
+        order = np.argsort(student_ids)
+        # Rows of students who left the roster between the two queries are dropped
+        found = np.isin(student_col, student_ids)
+        self.row = order[np.searchsorted(student_ids[order], student_col[found])]
+        self.day = day_col[found]
+        self.subject_col = subject_col[found]
+        self.attended = np.isin(status_col[found], ATTENDED_CODES)
+
+        shape = (len(self.students), last.day)
+        self.marked = np.zeros(shape, dtype=np.int32)
+        self.present = np.zeros(shape, dtype=np.int32)
+        np.add.at(self.marked, (self.row, self.day), 1)
+        np.add.at(self.present, (self.row, self.day), self.attended.astype(np.int32))
+
+        # Days on which any student of the class was marked
+        self.school_days = np.flatnonzero(self.marked.sum(axis=0) > 0)
+        self.dates = [date(year, month, int(d) + 1) for d in self.school_days]
+
+    def matrix(self, threshold=None):
+        threshold = chronic_threshold() if threshold is None else threshold
+        marked = self.marked[:, self.school_days]
+        present = self.present[:, self.school_days]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            daily = np.where(marked > 0, present / marked, np.nan)
+            percentage = np.where(marked.sum(axis=1) > 0, present.sum(axis=1) * 100.0 / marked.sum(axis=1), np.nan)
+
+            # Rolling class percentage over the last ROLLING_WINDOW school days
+            class_marked = np.cumsum(np.concatenate([[0], marked.sum(axis=0)]))
+            class_present = np.cumsum(np.concatenate([[0], present.sum(axis=0)]))
+            window = np.minimum(np.arange(1, len(self.school_days) + 1), ROLLING_WINDOW)
+            ends = np.arange(1, len(self.school_days) + 1)
+            rolling = (class_present[ends] - class_present[ends - window]) * 100.0 / (class_marked[ends] - class_marked[ends - window])
+            class_daily = present.sum(axis=0) * 100.0 / marked.sum(axis=0)
+
+        absent_days = (marked > 0) & (present == 0)
+        longest, current = _runs(absent_days)
+        chronic = np.nan_to_num(percentage, nan=100.0) < threshold
+
+        students = [
+            {
+                'id': s['id'],
+                'student_id': s['student_id'],
+                'roll_number': s['roll_number'],
+                'name': f"{s['user__first_name']} {s['user__last_name']}".strip(),
+                'percentage': _num(percentage[i]),
+                'absent_days': int(absent_days[i].sum()),
+                'longest_absence_streak': int(longest[i]),
+                'current_absence_streak': int(current[i]),
+                'chronic_absentee': bool(chronic[i]),
+            }
+            for i, s in enumerate(self.students)
+        ]
+        return {
+            **self._header(),
+            'threshold': threshold,
+            'days': self.dates,
+            'students': students,
+            'matrix': [[_num(v) for v in row] for row in daily],
+            'class_daily_percentage': [_num(v) for v in class_daily],
+            'rolling_percentage': [_num(v) for v in rolling],
+            'rolling_window': ROLLING_WINDOW,
+            'chronic_absentees': [s['id'] for s in students if s['chronic_absentee']],
+        }
+
+    def subjects(self):
+        subject_ids = np.unique(self.subject_col)
+        column = np.searchsorted(subject_ids, self.subject_col)
+        shape = (len(self.students), len(subject_ids))
+        marked = np.zeros(shape, dtype=np.int32)
+        present = np.zeros(shape, dtype=np.int32)
+        np.add.at(marked, (self.row, column), 1)
+        np.add.at(present, (self.row, column), self.attended.astype(np.int32))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            per_student = np.where(marked > 0, present * 100.0 / marked, np.nan)
+            overall = present.sum(axis=0) * 100.0 / marked.sum(axis=0)
+
+        names = dict(Subject.objects.filter(pk__in=subject_ids.tolist()).values_list('pk', 'name'))
+        return {
+            **self._header(),
+            'subjects': [
+                {'id': int(pk), 'name': names.get(int(pk)), 'percentage': _num(overall[j]), 'sessions': int(marked[:, j].max(initial=0))}
+                for j, pk in enumerate(subject_ids)
+            ],
+            'students': [
+                {
+                    'id': s['id'],
+                    'student_id': s['student_id'],
+                    'roll_number': s['roll_number'],
+                    'percentages': {str(int(pk)): _num(per_student[i, j]) for j, pk in enumerate(subject_ids)},
+                }
+                for i, s in enumerate(self.students)
+            ],
+        }
+
+    def _header(self):
+        return {'class': self.class_name, 'section': self.section, 'year': self.year, 'month': self.month}
+
+
+def _runs(flags):
+    """Longest and trailing run of True per row of a 2-D boolean array."""
+    rows, cols = flags.shape
+    padded = np.zeros((rows, cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = flags
+    edges = np.diff(padded, axis=1)
+    starts = np.argwhere(edges == 1)
+    ends = np.argwhere(edges == -1)
+    lengths = ends[:, 1] - starts[:, 1]
+    longest = np.zeros(rows, dtype=np.int64)
+    current = np.zeros(rows, dtype=np.int64)
+    np.maximum.at(longest, starts[:, 0], lengths)
+    trailing = ends[:, 1] == cols
+    current[starts[trailing, 0]] = lengths[trailing]
+    return longest, current
+
+
+def _num(value):
+    value = float(value)
+    return None if np.isnan(value) else round(value, 2)
+
+
+def class_matrix(class_name, section, year, month, threshold=None):
+    kind = f"matrix:{threshold if threshold is not None else chronic_threshold()}"
+    return cached(kind, class_name, section, year, month,
+                  lambda: ClassMonth(class_name, section, year, month).matrix(threshold))
+
+
+def class_subjects(class_name, section, year, month):
+    return cached('subjects', class_name, section, year, month,
+                  lambda: ClassMonth(class_name, section, year, month).subjects())
@@ -0,0 +1,254 @@
+"""
+Bitmap archive for the attendance of closed academic years.
+
+`archive_year()` packs every (student, subject) series of a finished
+AcademicYear into one AttendanceArchive row: 2 bits per calendar day for
+the status and a 1-bit "marked" mask, so a full year costs under 150 bytes
+per student and subject. The live `Attendance` rows are then deleted.
+`restore_year()` reverses the process.
+
+Readers call `attendance_rows()`, which returns the same
+`(student_id, date, subject_id, status)` tuples whether a date range is
+live, archived or both.
+"""
+from calendar import monthrange
+from collections import Counter
+from datetime import date, timedelta
+from itertools import groupby
+
+import numpy as np
+from django.db import transaction
+
+from students.cache import invalidate_teacher_profiles
+from students.models import Student
+
+from .models import Attendance, AttendanceArchive, AttendanceSyncOperation
+
+STATUS_CODES = Attendance.STATUS_CODES
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def pack_statuses(codes):
+    """Pack an array of 2-bit status codes, four days per byte."""
+    codes = np.asarray(codes, dtype=np.uint8)
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] | quads[:, 1] << 2 | quads[:, 2] << 4 | quads[:, 3] << 6).astype(np.uint8).tobytes()
+
+
+def unpack_statuses(blob, days):
+    packed = np.frombuffer(bytes(blob), dtype=np.uint8)
+    quads = np.stack([(packed >> shift) & 0b11 for shift in (0, 2, 4, 6)], axis=1)
+    return quads.reshape(-1)[:days]
+
+
+def pack_mask(flags):
+    return np.packbits(np.asarray(flags, dtype=bool)).tobytes()
+
+
+def unpack_mask(blob, days):
+    return np.unpackbits(np.frombuffer(bytes(blob), dtype=np.uint8), count=days).astype(bool)
+
+
+def _year_days(academic_year):
+    return (academic_year.end_date - academic_year.start_date).days + 1
+
+
+def archive_year(academic_year, batch_size=1000):
+    """
+    Pack and remove the live attendance of a closed academic year.
+
+    Live rows of a year that is already (partly) archived, e.g. days left
+    behind by `restore_year()`, are merged into the existing archives, the
+    live value winning for a day held by both. Returns
+    `(rows_archived, archives_written)`.
+    """
+    from .signals import muted
+
+    if academic_year.is_current:
+        raise ArchiveError(f"{academic_year} is the current academic year")
+
+    start, days = academic_year.start_date, _year_days(academic_year)
+    live = Attendance.objects.filter(date__gte=start, date__lte=academic_year.end_date)
+    rows = live.order_by('student_id', 'subject_id', 'date').values_list(
+        'student_id', 'subject_id', 'date', 'status', 'teacher_id', 'marked_by_id'
+    )
+
+    archived = written = 0
+    with transaction.atomic():
+        existing = {
+            (a.student_id, a.subject_id): a for a in AttendanceArchive.objects.filter(
+                academic_year=academic_year, student_id__in=live.values('student_id'),
+            ).only('student_id', 'subject_id', 'statuses', 'marked')
+        }
+        batch = []
+        for (student_id, subject_id), series in groupby(rows.iterator(chunk_size=5000), key=lambda r: (r[0], r[1])):
+            series = list(series)
+            offsets = np.fromiter(((r[2] - start).days for r in series), dtype=np.int64, count=len(series))
+            previous = existing.get((student_id, subject_id))
+            if previous is None:
+                codes = np.zeros(days, dtype=np.uint8)
+                mask = np.zeros(days, dtype=bool)
+            else:
+                codes = unpack_statuses(previous.statuses, days).copy()
+                mask = unpack_mask(previous.marked, days)
+            codes[offsets] = [STATUS_CODES.get(r[3], STATUS_CODES['absent']) for r in series]
+            mask[offsets] = True
+            batch.append(AttendanceArchive(
+                academic_year=academic_year, student_id=student_id, subject_id=subject_id,
+                teacher_id=Counter(r[4] for r in series).most_common(1)[0][0],
+                marked_by_id=Counter(r[5] for r in series).most_common(1)[0][0],
+                start_date=start, days=days, statuses=pack_statuses(codes), marked=pack_mask(mask),
+            ))
+            archived += len(series)
+            if len(batch) >= batch_size:
+                written += _write_archives(batch)
+                batch = []
+        written += _write_archives(batch)
+
+        # The monthly reports already count these rows and must not be
+        # decremented, so the per-row handlers are muted and the caches
+        # dropped once for the whole year
+        invalidate_teacher_profiles(live.values('teacher_id'))
+        AttendanceSyncOperation.objects.filter(attendance__in=live).update(attendance=None)
+        ids = list(live.values_list('id', flat=True))
+        with muted():
+            for first in range(0, len(ids), batch_size):
+                Attendance.objects.filter(pk__in=ids[first:first + batch_size]).delete()
+    return archived, written
+
+
+def _write_archives(batch):
+    return len(AttendanceArchive.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=['academic_year', 'student', 'subject'],
+        update_fields=['teacher', 'marked_by', 'statuses', 'marked'],
+    ))
+
+
+def restore_year(academic_year, batch_size=5000):
+    """
+    Unpack an archived year back into live Attendance rows.
+
+    Returns `(rows_restored, archives_skipped, rows_conflicting)`. Archives
+    whose teacher or marking user no longer exists are kept. Days that were
+    marked live again after archiving keep their live row; the archived
+    values of those days stay in the (trimmed) archive instead of being lost.
+    """
+    from .analytics import bump_version
+
+    restored = skipped = conflicts = 0
+    with transaction.atomic():
+        live = set(
+            Attendance.objects.filter(date__gte=academic_year.start_date, date__lte=academic_year.end_date)
+            .values_list('student_id', 'subject_id', 'date')
+        )
+        archives = AttendanceArchive.objects.filter(academic_year=academic_year)
+        done, trimmed, students = [], [], set()
+        batch = []
+        for archive in archives.iterator(chunk_size=500):
+            if archive.teacher_id is None or archive.marked_by_id is None:
+                skipped += 1
+                continue
+            clashes = []
+            for day, status in _decode(archive):
+                if (archive.student_id, archive.subject_id, day) in live:
+                    clashes.append((day - archive.start_date).days)
+                    continue
+                batch.append(Attendance(
+                    student_id=archive.student_id, subject_id=archive.subject_id, teacher_id=archive.teacher_id,
+                    marked_by_id=archive.marked_by_id, date=day, status=status,
+                ))
+            students.add(archive.student_id)
+            if clashes:
+                mask = np.zeros(archive.days, dtype=bool)
+                mask[clashes] = True
+                archive.marked = pack_mask(mask)
+                trimmed.append(archive)
+                conflicts += len(clashes)
+            else:
+                done.append(archive.pk)
+            if len(batch) >= batch_size:
+                restored += len(Attendance.objects.bulk_create(batch))
+                batch = []
+        restored += len(Attendance.objects.bulk_create(batch))
+        AttendanceArchive.objects.bulk_update(trimmed, ['marked'], batch_size=500)
+        for start in range(0, len(done), 500):
+            AttendanceArchive.objects.filter(pk__in=done[start:start + 500]).delete()
+    invalidate_teacher_profiles(
+        Attendance.objects.filter(date__gte=academic_year.start_date, date__lte=academic_year.end_date).values('teacher_id')
+    )
+    for class_name, section in Student.objects.filter(pk__in=students).values_list('current_class', 'current_section').distinct():
+        bump_version(class_name, section)
+    return restored, skipped, conflicts
+
+
+def _decode(archive, first=None, last=None):
+    """Yield `(date, status)` for the marked days of an archive, optionally within a date range."""
+    codes = unpack_statuses(archive.statuses, archive.days)
+    offsets = np.flatnonzero(unpack_mask(archive.marked, archive.days))
+    if first is not None:
+        offsets = offsets[offsets >= (first - archive.start_date).days]
+    if last is not None:
+        offsets = offsets[offsets <= (last - archive.start_date).days]
+    for offset in offsets.tolist():
+        yield archive.start_date + timedelta(days=offset), STATUS_NAMES[int(codes[offset])]
+
+
+def _student_lookups(student_filter):
+    return {f'student__{k}' if k != 'pk' else 'student_id': v for k, v in student_filter.items()}
+
+
+def archived_marks(year=None, month=None, **student_filter):
+    """
+    `(student_id, subject_id, date, status)` of archived days that have no
+    live row, optionally limited to a calendar year and/or month.
+    """
+    student_lookups = _student_lookups(student_filter)
+    archives = AttendanceArchive.objects.filter(**student_lookups)
+    first = last = None
+    if year:
+        first = date(year, month or 1, 1)
+        last = date(year, month or 12, monthrange(year, month or 12)[1])
+        archives = archives.filter(start_date__lte=last, academic_year__end_date__gte=first)
+    marks = [
+        (archive.student_id, archive.subject_id, day, status)
+        for archive in archives.only('student_id', 'subject_id', 'start_date', 'days', 'statuses', 'marked')
+        for day, status in _decode(archive, first, last)
+        if not month or day.month == month
+    ]
+    if not marks:
+        return marks
+    live = set(
+        Attendance.objects.filter(date__gte=min(m[2] for m in marks), date__lte=max(m[2] for m in marks), **student_lookups)
+        .values_list('student_id', 'subject_id', 'date')
+    )
+    return [m for m in marks if m[:3] not in live]
+
+
+def attendance_rows(first, last, **student_filter):
+    """
+    `(student_id, date, subject_id, status)` for a date range from live and archived attendance.
+
+    `student_filter` holds Student lookups such as `current_class='10'` or `pk=5`.
+    """
+    student_lookups = _student_lookups(student_filter)
+    rows = list(Attendance.objects.filter(date__gte=first, date__lte=last, **student_lookups)
+                .order_by().values_list('student_id', 'date', 'subject_id', 'status'))
+    archives = AttendanceArchive.objects.filter(
+        start_date__lte=last, academic_year__end_date__gte=first, **student_lookups
+    ).only('student_id', 'subject_id', 'start_date', 'days', 'statuses', 'marked')
+    # A live row wins over an archived value of the same day (see restore_year)
+    live = {(r[0], r[1], r[2]) for r in rows}
+    for archive in archives:
+        rows.extend(
+            (archive.student_id, day, archive.subject_id, status) for day, status in _decode(archive, first, last)
+            if (archive.student_id, day, archive.subject_id) not in live
+        )
+    return rows
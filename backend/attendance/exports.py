@@ -0,0 +1,74 @@
+"""
+Term-wide attendance exports.
+
+Rows come from one `values_list()` query read with `iterator()`, ordered
+along the (student, subject, date) unique index. The wide layout pivots
+each student × subject group into one line with a column per date as the
+rows stream past, so only the current group is ever held in memory.
+
+Only live attendance is exported; restore an archived year first.
+"""
+from itertools import groupby
+
+from backend.exports import chunk_size
+from .models import Attendance
+
+STUDENT_COLUMNS = ['student_id', 'roll_number', 'name', 'class', 'section', 'subject']
+STATUS_LETTERS = {value: value[0].upper() for value, _ in Attendance.ATTENDANCE_STATUS}
+TOTAL_COLUMNS = ['present', 'absent', 'late', 'excused', 'percentage']
+
+
+def export_queryset(filters):
+    rows = Attendance.objects.all()
+    if filters.class_name:
+        rows = rows.filter(student__current_class=filters.class_name)
+    if filters.section:
+        rows = rows.filter(student__current_section=filters.section)
+    if filters.subject:
+        rows = rows.filter(subject_id=filters.subject)
+    if filters.start:
+        rows = rows.filter(date__gte=filters.start)
+    if filters.end:
+        rows = rows.filter(date__lte=filters.end)
+    return rows
+
+
+def _stream(queryset):
+    return queryset.order_by('student_id', 'subject_id', 'date').values_list(
+        'student_id', 'student__student_id', 'student__roll_number', 'student__user__first_name',
+        'student__user__last_name', 'student__current_class', 'student__current_section',
+        'subject__code', 'date', 'status', 'remarks',
+    ).iterator(chunk_size=chunk_size())
+
+
+def _student_cells(row):
+    return [row[1], row[2], f'{row[3]} {row[4]}'.strip(), row[5], row[6], row[7]]
+
+
+def attendance_table(filters, layout='wide'):
+    """`(header, rows)` for the filtered attendance in the `wide` or `long` layout."""
+    queryset = export_queryset(filters)
+    if layout == 'long':
+        header = STUDENT_COLUMNS + ['date', 'status', 'remarks']
+        rows = (_student_cells(r) + [r[8], r[9], r[10]] for r in _stream(queryset))
+        return header, rows
+
+    dates = list(queryset.order_by('date').values_list('date', flat=True).distinct())
+    header = STUDENT_COLUMNS + [d.isoformat() for d in dates] + TOTAL_COLUMNS
+    return header, _pivot(_stream(queryset), {d: i for i, d in enumerate(dates)})
+
+
+def _pivot(stream, columns):
+    for _, group in groupby(stream, key=lambda r: (r[0], r[7])):
+        cells = [''] * len(columns)
+        counts = dict.fromkeys(STATUS_LETTERS, 0)
+        first = None
+        for row in group:
+            first = first or row
+            cells[columns[row[8]]] = STATUS_LETTERS.get(row[9], '')
+            if row[9] in counts:
+                counts[row[9]] += 1
+        marked = sum(counts.values())
+        attended = counts['present'] + counts['late']
+        percentage = round(attended * 100.0 / marked, 2) if marked else ''
+        yield _student_cells(first) + cells + [counts['present'], counts['absent'], counts['late'], counts['excused'], percentage]
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from attendance.archive import ArchiveError, archive_year
+from results.models import AcademicYear
+
+
+class Command(BaseCommand):
+    help = 'Pack the attendance of a closed academic year into bitmap archives and remove the live rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', required=True, help='Academic year name, e.g. 2024-2025')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Archives written per insert')
+
+    def handle(self, *args, **options):
+        try:
+            academic_year = AcademicYear.objects.get(name=options['year'])
+        except AcademicYear.DoesNotExist:
+            raise CommandError(f"No academic year named {options['year']}")
+        try:
+            rows, archives = archive_year(academic_year, batch_size=options['batch_size'])
+        except ArchiveError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Archived {rows} attendance rows into {archives} archives for {academic_year}."))
@@ -0,0 +1,141 @@
+import re
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import User
+from attendance.models import Attendance, AttendanceSession
+from attendance.views import AttendanceListCreateView, AttendanceSessionListCreateView
+from backend.pagination import KeysetPagination
+from library.views import BookIssueListCreateView
+from notices.models import UserNotification
+from notices.views import NotificationListView
+from results.models import Result
+from results.views import ResultListCreateView
+from students.models import Student
+from tasks.models import Task
+
+# SQLite reports `SCAN <table>` without `USING ... INDEX` for a full table
+# scan; PostgreSQL reports `Seq Scan on <table>`
+FULL_SCAN = re.compile(r'^SCAN (?!\(|CONSTANT)(\S+)(?!.*\bUSING\b)|Seq Scan on (\S+)')
+# A keyset page must come off an index in order, not sort every matching row
+SORT = re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY|^\s*(?:->\s*)?Sort\b')
+
+
+def _user(role):
+    return User.objects.filter(role=role).order_by('pk').first() or User(pk=0, role=role)
+
+
+def _student():
+    # An unsaved sample still yields the real query shape on an empty database
+    return Student.objects.order_by('pk').first() or Student(pk=0, current_class='1', current_section='A')
+
+
+def _view_queryset(view_class, user, params=None):
+    """The queryset a list view would serve to `user` for the given query params."""
+    request = Request(APIRequestFactory().get('/', params or {}))
+    request.user = user
+    view = view_class()
+    view.setup(request)
+    view.request, view.format_kwarg = request, None
+    return view.get_queryset()
+
+
+def _keyset_page(view_class, user, params=None):
+    """The first page a `KeysetPagination` list view would fetch for `user`."""
+    queryset = _view_queryset(view_class, user, params).order_by(*view_class.keyset_ordering)
+    return queryset[:KeysetPagination.page_size + 1]
+
+
+def hot_paths():
+    """`(label, queryset)` for the main query of each hot endpoint, with sample parameters."""
+    session = AttendanceSession.objects.order_by('-date').first()
+    day = session.date if session else date.today()
+    result = Result.objects.order_by('pk').values('exam_id', 'published_by_id').first() or {'exam_id': 0, 'published_by_id': 0}
+    admin, teacher, student = _user('admin'), _user('teacher'), _user('student')
+    return [
+        ('attendance session list by date',
+         _view_queryset(AttendanceSessionListCreateView, admin, {'date': day.isoformat()})),
+        ('session marks by status',
+         Attendance.objects.filter(session_id=session.pk if session else 0, status='absent')),
+        ('results publish (exam, publisher, draft)',
+         Result.objects.filter(exam_id=result['exam_id'], published_by_id=result['published_by_id'], status='draft')),
+        ('results approve (exam, pending)',
+         Result.objects.filter(exam_id=result['exam_id'], status='pending_approval')),
+        ('teacher result list', _view_queryset(ResultListCreateView, teacher)),
+        ('student task list', Task.for_student(_student())),
+        ('notification list', _view_queryset(NotificationListView, student)),
+        ('unread notification count', UserNotification.objects.filter(user_id=student.pk, is_read=False)),
+    ]
+
+
+def keyset_pages():
+    """`(label, queryset)` for the first page of each keyset-paginated list."""
+    admin, teacher, student = _user('admin'), _user('teacher'), _user('student')
+    return [
+        ('attendance list page', _keyset_page(AttendanceListCreateView, admin)),
+        ('result list page', _keyset_page(ResultListCreateView, admin)),
+        ('teacher result list page', _keyset_page(ResultListCreateView, teacher)),
+        ('student result list page', _keyset_page(ResultListCreateView, student)),
+        ('book issue list page', _keyset_page(BookIssueListCreateView, admin)),
+        ('notification list page', _keyset_page(NotificationListView, student)),
+    ]
+
+
+def _details(plan):
+    for line in plan.splitlines():
+        # SQLite lines are "<id> <parent> <notused> <detail>"
+        yield line.split(maxsplit=3)[-1] if connection.vendor == 'sqlite' else line.strip()
+
+
+def full_scans(plan):
+    """Tables read with a full scan in an `explain()` plan."""
+    tables = []
+    for detail in _details(plan):
+        match = FULL_SCAN.search(detail)
+        if match:
+            tables.append(match.group(1) or match.group(2))
+    return tables
+
+
+def sorts(plan):
+    """Sort steps in an `explain()` plan."""
+    return [detail for detail in _details(plan) if SORT.search(detail)]
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the main query of each hot endpoint and fail if any of them scans a whole table, '
+        'or if a keyset-paginated list sorts instead of reading an index in order'
+    )
+
+    def handle(self, *args, **options):
+        failures = []
+        checks = [(label, queryset, False) for label, queryset in hot_paths()]
+        checks += [(label, queryset, True) for label, queryset in keyset_pages()]
+        for label, queryset, ordered in checks:
+            plan = queryset.explain()
+            scans = full_scans(plan)
+            steps = sorts(plan) if ordered else []
+            if not plan.strip():
+                # e.g. an EmptyResultSet query that never reaches the database
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f"NO PLAN    {label}"))
+            elif scans:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {label}: {', '.join(scans)}"))
+            elif steps:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f"SORT       {label}"))
+            else:
+                self.stdout.write(f"ok         {label}")
+            if scans or steps or options['verbosity'] > 1:
+                self.stdout.write('\n'.join(f'    {line}' for line in plan.splitlines()))
+        if failures:
+            raise CommandError(
+                f"{len(failures)} hot path(s) are unchecked, fall back to a full table scan or sort: {', '.join(failures)}"
+            )
+        self.stdout.write(self.style.SUCCESS('All hot paths use an index.'))
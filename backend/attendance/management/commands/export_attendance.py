@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from attendance.exports import attendance_table
+from backend.exports import LAYOUTS, ExportError, ExportFilters, export_to_file
+
+
+class Command(BaseCommand):
+    help = 'Export attendance to a CSV or XLSX file (format follows the --output extension)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', dest='path', required=True, help='Destination .csv or .xlsx file')
+        parser.add_argument('--class', dest='class_name', type=str, default=None, help='Only students of this class')
+        parser.add_argument('--section', type=str, default=None, help='Only students of this section')
+        parser.add_argument('--subject', type=int, default=None, help='Only this subject id')
+        parser.add_argument('--from', dest='start', type=str, default=None, help='First date (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end', type=str, default=None, help='Last date (YYYY-MM-DD)')
+        parser.add_argument('--layout', choices=LAYOUTS, default='wide')
+
+    def handle(self, *args, **options):
+        try:
+            filters = ExportFilters(options['class_name'], options['section'], options['subject'], options['start'], options['end'])
+        except ExportError as e:
+            raise CommandError(str(e))
+        header, rows = attendance_table(filters, options['layout'])
+        export_to_file(header, rows, options['path'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote attendance export to {options['path']}"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from attendance.reports import rebuild_reports
+
+
+class Command(BaseCommand):
+    help = 'Recompute monthly AttendanceReport rows from raw attendance'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, default=None, help='Only this year')
+        parser.add_argument('--month', type=int, default=None, help='Only this month (1-12)')
+        parser.add_argument('--class', dest='class_name', type=str, default=None, help='Only students of this class')
+        parser.add_argument('--section', type=str, default=None, help='Only students of this section')
+
+    def handle(self, *args, **options):
+        month = options['month']
+        if month is not None and not 1 <= month <= 12:
+            raise CommandError('--month must be between 1 and 12')
+        written = rebuild_reports(
+            year=options['year'], month=month, class_name=options['class_name'], section=options['section'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} attendance report rows."))
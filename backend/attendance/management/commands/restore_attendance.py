@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from attendance.archive import restore_year
+from results.models import AcademicYear
+
+
+class Command(BaseCommand):
+    help = 'Unpack an archived academic year back into live attendance rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', required=True, help='Academic year name, e.g. 2024-2025')
+
+    def handle(self, *args, **options):
+        try:
+            academic_year = AcademicYear.objects.get(name=options['year'])
+        except AcademicYear.DoesNotExist:
+            raise CommandError(f"No academic year named {options['year']}")
+        rows, skipped, conflicts = restore_year(academic_year)
+        self.stdout.write(self.style.SUCCESS(f"Restored {rows} attendance rows for {academic_year}."))
+        if conflicts:
+            self.stdout.write(self.style.WARNING(
+                f"{conflicts} archived days were marked live again and were not restored; they stay in the archive."
+            ))
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"{skipped} archives kept: their teacher or marking user no longer exists."))
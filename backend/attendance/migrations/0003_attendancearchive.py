@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_attendancesession_attendance_session'),
+        ('results', '0002_result_approval_remarks_result_approved_at_and_more'),
+        ('students', '0007_student_search_index'),
+        ('teachers', '0004_teacher_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('days', models.PositiveIntegerField()),
+                ('statuses', models.BinaryField()),
+                ('marked', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('academic_year', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_archives', to='results.academicyear')),
+                ('marked_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_archives', to='students.student')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_archives', to='attendance.subject')),
+                ('teacher', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='teachers.teacher')),
+            ],
+            options={
+                'ordering': ['academic_year', 'student', 'subject'],
+                'unique_together': {('academic_year', 'student', 'subject')},
+            },
+        ),
+    ]
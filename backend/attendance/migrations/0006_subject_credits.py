@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subject',
+            name='credits',
+            field=models.PositiveSmallIntegerField(default=3),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_subject_credits'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendancesyncoperation',
+            name='key',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AlterUniqueTogether(
+            name='attendancesyncoperation',
+            unique_together={('user', 'key')},
+        ),
+    ]
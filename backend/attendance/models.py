@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from students.models import Student
 from teachers.models import Teacher
@@ -13,6 +16,8 @@ class Subject(models.Model):
     name = models.CharField(max_length=100, unique=True)
     code = models.CharField(max_length=20, unique=True)
     description = models.TextField(blank=True, null=True)
+    # Weight of the subject in semester GPAs (see results.transcripts)
+    credits = models.PositiveSmallIntegerField(default=3)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -27,6 +32,8 @@ class AttendanceSession(models.Model):
     """
     A session for taking attendance for a class/section/period on a specific date and subject.
     """
+    COUNTED_STATUSES = ('present', 'absent', 'late', 'excused')
+
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='sessions')
     date = models.DateField()
     period = models.PositiveIntegerField(default=1)
@@ -39,9 +46,34 @@ class AttendanceSession(models.Model):
     def __str__(self):
         return f"{self.subject.name} {self.class_name}-{self.section} P{self.period} {self.date}"
 
+    @classmethod
+    def with_counts(cls, queryset):
+        """
+        Annotate roster size and per-status mark counts in the same query.
+
+        `total_students` is the active enrollment of the class/section, so
+        students who have not been marked yet are included.
+        """
+        roster = Student.objects.filter(
+            current_class=OuterRef('class_name'), current_section=OuterRef('section'), is_active=True
+        ).order_by().values('current_class').annotate(n=Count('*')).values('n')
+        counts = {
+            f'count_{status}': Count('attendances', filter=Q(attendances__status=status))
+            for status in cls.COUNTED_STATUSES
+        }
+        return queryset.annotate(
+            total_students=Coalesce(Subquery(roster, output_field=models.IntegerField()), 0),
+            marked_count=Count('attendances'),
+            **counts,
+        )
+
     class Meta:
         unique_together = ['subject', 'date', 'period', 'class_name', 'section']
         ordering = ['-date', 'subject__name', 'period']
+        indexes = [
+            # The session list is filtered by day; the unique key starts with subject
+            models.Index(fields=['date'], name='att_session_date_idx'),
+        ]
 
 
 class Attendance(models.Model):
@@ -62,15 +94,41 @@ class Attendance(models.Model):
     date = models.DateField()
     status = models.CharField(max_length=10, choices=ATTENDANCE_STATUS, default='absent')
     remarks = models.TextField(blank=True, null=True)
-    marked_at = models.DateTimeField(auto_now_add=True)
+    # When the mark was made; offline clients send their own time (last writer wins)
+    marked_at = models.DateTimeField(default=timezone.now)
     marked_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='marked_attendances')
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.student.student_id} - {self.subject.name} - {self.date} - {self.status}"
+
+    REPORT_FIELDS = ('student_id', 'subject_id', 'date', 'status')
+    # 2-bit codes used by the analytics arrays and the archive bitmaps
+    STATUS_CODES = {'present': 0, 'late': 1, 'absent': 2, 'excused': 3}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the monthly report currently counts for this row
+        if all(f in field_names for f in cls.REPORT_FIELDS):
+            instance._loaded_mark = instance.report_mark()
+        return instance
+
+    def report_mark(self):
+        """`(student_id, subject_id, date, status)` as counted by AttendanceReport."""
+        return tuple(getattr(self, f) for f in self.REPORT_FIELDS)
     
     class Meta:
         unique_together = ['student', 'subject', 'date']
         ordering = ['-date', 'student__student_id']
+        indexes = [
+            # Sync deltas walk rows changed since a token
+            models.Index(fields=['updated_at', 'id'], name='attendance_updated_idx'),
+            # Per-session status counts (AttendanceSession.with_counts)
+            models.Index(fields=['session', 'status'], name='attendance_session_status_idx'),
+            # Keyset pages of the attendance list, newest first
+            models.Index(fields=['date', 'id'], name='attendance_date_id_idx'),
+        ]
         verbose_name = 'Attendance'
         verbose_name_plural = 'Attendance Records'
 
@@ -109,4 +167,62 @@ class AttendanceReport(models.Model):
         unique_together = ['student', 'subject', 'month', 'year']
         ordering = ['-year', '-month', 'student__student_id']
         verbose_name = 'Attendance Report'
-        verbose_name_plural = 'Attendance Reports'
\ No newline at end of file
+        verbose_name_plural = 'Attendance Reports'
+
+
+class AttendanceArchive(models.Model):
+    """
+    Packed attendance of one student in one subject for a closed academic year.
+
+    `statuses` stores 2 bits per calendar day counted from `start_date` and
+    `marked` one bit per day (see attendance.archive). Remarks and session
+    links are not kept; `teacher` and `marked_by` hold the most frequent
+    values so rows can be restored.
+    """
+    academic_year = models.ForeignKey('results.AcademicYear', on_delete=models.CASCADE, related_name='attendance_archives')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_archives')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='attendance_archives')
+    teacher = models.ForeignKey(Teacher, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    marked_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    start_date = models.DateField()
+    days = models.PositiveIntegerField()
+    statuses = models.BinaryField()
+    marked = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.student.student_id} - {self.subject.name} - {self.academic_year.name}"
+
+    class Meta:
+        unique_together = ['academic_year', 'student', 'subject']
+        ordering = ['academic_year', 'student', 'subject']
+
+
+
+class AttendanceSyncOperation(models.Model):
+    """
+    Idempotency record for an operation received from an offline client.
+
+    Replaying an operation with a key the same user sent before returns the
+    stored outcome instead of applying it again.
+    """
+    OUTCOMES = [
+        ('applied', 'Applied'),
+        ('stale', 'Stale'),
+        ('rejected', 'Rejected'),
+    ]
+
+    key = models.CharField(max_length=64)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attendance_sync_operations')
+    outcome = models.CharField(max_length=10, choices=OUTCOMES)
+    error = models.CharField(max_length=200, blank=True, default='')
+    attendance = models.ForeignKey(Attendance, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.key} - {self.outcome}"
+
+    class Meta:
+        # Keys are generated per device; another user's key is not a replay
+        unique_together = ['user', 'key']
+        ordering = ['-created_at']
@@ -0,0 +1,175 @@
+"""
+Incrementally maintained monthly AttendanceReport rollups.
+
+Every write to `Attendance` turns into per-(student, subject, month) status
+deltas. `apply_deltas()` makes sure the report rows exist and then applies
+the deltas with `F()` arithmetic, recomputing the percentage in the same
+UPDATE. Keys that share the same delta are flushed in one statement, so
+marking a whole session costs a handful of queries. `rebuild_reports()`
+recomputes months from the raw attendance rows and the archived years.
+"""
+from collections import Counter, defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast, ExtractMonth, ExtractYear
+
+from .archive import archived_marks
+from .models import Attendance, AttendanceReport
+
+STATUS_FIELDS = {
+    'present': 'present_days',
+    'absent': 'absent_days',
+    'late': 'late_days',
+    'excused': 'excused_days',
+}
+ATTENDED = ('present', 'late')
+
+
+def _as_date(value):
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def report_key(student_id, subject_id, day):
+    day = _as_date(day)
+    return student_id, subject_id, day.year, day.month
+
+
+class ReportDeltas:
+    """Accumulates status changes per report row before a flush."""
+
+    def __init__(self):
+        self.changes = defaultdict(Counter)
+
+    def add(self, student_id, subject_id, day, status, sign=1):
+        if status in STATUS_FIELDS:
+            self.changes[report_key(student_id, subject_id, day)][status] += sign
+
+    def move(self, old, new):
+        """Record a change from `old` to `new`, each `(student_id, subject_id, date, status)` or None."""
+        if old == new:
+            return
+        if old is not None:
+            self.add(*old, sign=-1)
+        if new is not None:
+            self.add(*new)
+
+    def flush(self):
+        apply_deltas(self.changes)
+        self.changes = defaultdict(Counter)
+
+
+def apply_deltas(changes):
+    """Apply `{(student, subject, year, month): Counter(status -> delta)}` to the report rows."""
+    # Drop statuses (and keys) whose changes cancelled out
+    changes = {key: {s: n for s, n in counter.items() if n} for key, counter in changes.items()}
+    changes = {key: delta for key, delta in changes.items() if delta}
+    if not changes:
+        return
+
+    with transaction.atomic(savepoint=False):
+        AttendanceReport.objects.bulk_create(
+            [
+                AttendanceReport(student_id=student, subject_id=subject, year=year, month=month)
+                for student, subject, year, month in changes
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+
+        # One UPDATE per (subject, month, delta) group
+        groups = defaultdict(list)
+        for (student, subject, year, month), delta in changes.items():
+            groups[(subject, year, month, tuple(sorted(delta.items())))].append(student)
+        for (subject, year, month, delta), students in groups.items():
+            for start in range(0, len(students), 500):
+                AttendanceReport.objects.filter(
+                    subject_id=subject, year=year, month=month, student_id__in=students[start:start + 500]
+                ).update(**_update_expressions(dict(delta)))
+
+
+def _update_expressions(delta):
+    total = sum(delta.values())
+    attended = sum(delta.get(status, 0) for status in ATTENDED)
+    values = {
+        field: F(field) + delta[status]
+        for status, field in STATUS_FIELDS.items()
+        if delta.get(status)
+    }
+    if total:
+        values['total_days'] = F('total_days') + total
+    # The UPDATE sees the old column values, so fold the deltas into the ratio
+    new_total = F('total_days') + total
+    new_attended = F('present_days') + F('late_days') + attended
+    values['attendance_percentage'] = Case(
+        When(Q(total_days__gt=-total), then=Cast(new_attended, FloatField()) * 100.0 / new_total),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    return values
+
+
+def rebuild_reports(year=None, month=None, class_name=None, section=None):
+    """
+    Recompute report rows from raw and archived attendance, optionally
+    limited to a month and/or class/section. Returns the number of report
+    rows written.
+    """
+    marks = Attendance.objects.all()
+    reports = AttendanceReport.objects.all()
+    if year:
+        marks = marks.filter(date__year=year)
+        reports = reports.filter(year=year)
+    if month:
+        marks = marks.filter(date__month=month)
+        reports = reports.filter(month=month)
+    if class_name:
+        marks = marks.filter(student__current_class=class_name)
+        reports = reports.filter(student__current_class=class_name)
+    if section:
+        marks = marks.filter(student__current_section=section)
+        reports = reports.filter(student__current_section=section)
+
+    counts = {f'n_{status}': Count('id', filter=Q(status=status)) for status in STATUS_FIELDS}
+    rows = marks.annotate(
+        report_year=ExtractYear('date'), report_month=ExtractMonth('date'),
+    ).order_by().values('student_id', 'subject_id', 'report_year', 'report_month').annotate(
+        n_total=Count('id'), **counts
+    )
+
+    student_filter = {'current_class': class_name, 'current_section': section}
+    archived = defaultdict(Counter)
+    for student_id, subject_id, day, status in archived_marks(
+        year, month, **{k: v for k, v in student_filter.items() if v}
+    ):
+        archived[report_key(student_id, subject_id, day)][status] += 1
+
+    written = 0
+    with transaction.atomic():
+        reports.delete()
+        batch = []
+        for row in rows.iterator(chunk_size=2000):
+            counts = archived.pop((row['student_id'], row['subject_id'], row['report_year'], row['report_month']), Counter())
+            batch.append(_report(
+                (row['student_id'], row['subject_id'], row['report_year'], row['report_month']),
+                counts + Counter({status: row[f'n_{status}'] for status in STATUS_FIELDS}),
+            ))
+            if len(batch) >= 2000:
+                written += len(AttendanceReport.objects.bulk_create(batch))
+                batch = []
+        # Months that only exist in the archive
+        batch.extend(_report(key, counts) for key, counts in archived.items())
+        written += len(AttendanceReport.objects.bulk_create(batch, batch_size=2000))
+    return written
+
+
+def _report(key, counts):
+    student_id, subject_id, year, month = key
+    report = AttendanceReport(
+        student_id=student_id, subject_id=subject_id, year=year, month=month,
+        total_days=sum(counts[status] for status in STATUS_FIELDS),
+        **{field: counts[status] for status, field in STATUS_FIELDS.items()},
+    )
+    report.calculate_percentage()
+    return report
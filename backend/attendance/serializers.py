@@ -17,23 +17,58 @@ class AttendanceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Attendance
         fields = '__all__'
+        read_only_fields = ['marked_at']
 
 
 class AttendanceSessionSerializer(serializers.ModelSerializer):
+    """
+    Session with roster and mark counts.
+
+    The counts come from `AttendanceSession.with_counts()`; instances without
+    the annotations (e.g. a freshly created session) are counted on demand.
+    """
     subject_name = serializers.CharField(source='subject.name', read_only=True)
     total_students = serializers.SerializerMethodField()
     present_count = serializers.SerializerMethodField()
+    absent_count = serializers.SerializerMethodField()
+    late_count = serializers.SerializerMethodField()
+    excused_count = serializers.SerializerMethodField()
+    unmarked_count = serializers.SerializerMethodField()
 
     class Meta:
         model = AttendanceSession
         fields = '__all__'
 
+    def _counts(self, obj):
+        if not hasattr(obj, 'marked_count'):
+            annotated = AttendanceSession.with_counts(AttendanceSession.objects.filter(pk=obj.pk)).values(
+                'total_students', 'marked_count', *(f'count_{s}' for s in AttendanceSession.COUNTED_STATUSES)
+            ).first() or {}
+            for key, value in annotated.items():
+                setattr(obj, key, value)
+        return obj
+
     def get_total_students(self, obj):
-        # If enrollment model exists, replace with actual class roster size.
-        return obj.attendances.values('student_id').distinct().count()
+        return self._counts(obj).total_students
 
     def get_present_count(self, obj):
-        return obj.attendances.filter(status__in=['present', 'late']).count()
+        # Late arrivals count as present, as before
+        obj = self._counts(obj)
+        return obj.count_present + obj.count_late
+
+    def get_absent_count(self, obj):
+        return self._counts(obj).count_absent
+
+    def get_late_count(self, obj):
+        return self._counts(obj).count_late
+
+    def get_excused_count(self, obj):
+        return self._counts(obj).count_excused
+
+    def get_unmarked_count(self, obj):
+        obj = self._counts(obj)
+        return max(obj.total_students - obj.marked_count, 0)
+
 
 class AttendanceReportSerializer(serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.user.get_full_name', read_only=True)
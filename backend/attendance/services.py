@@ -0,0 +1,125 @@
+"""
+Bulk attendance writes shared by the API views.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Q
+
+from students.cache import invalidate_teacher_profiles
+from students.models import Student
+from .analytics import bump_version
+from .models import Attendance, AttendanceSession
+from .reports import ReportDeltas
+
+STATUSES = {value for value, _ in Attendance.ATTENDANCE_STATUS}
+
+
+class BulkMarkError(Exception):
+    """Raised with per-record `errors` when a bulk payload is rejected."""
+
+    def __init__(self, errors):
+        super().__init__('Invalid attendance records')
+        self.errors = errors
+
+
+def session_teacher(session, user):
+    """The teacher to record on marks: the session's, else the requesting teacher's profile."""
+    if session.teacher_id is not None:
+        return session.teacher_id
+    profile = getattr(user, 'teacher_profile', None) if user.role == 'teacher' else None
+    return profile.pk if profile is not None else None
+
+
+def mark_session(session, records, user, default_status=None):
+    """
+    Upsert attendance for many students of one session in a single statement.
+
+    `records` is a list of `{'student': pk, 'status': ..., 'remarks': ...}`.
+    With `default_status`, every active student of the section that is not
+    listed is marked with it. The whole payload is rejected with
+    `BulkMarkError` if any record is invalid.
+    """
+    errors = []
+    marks = {}
+    positions = {}
+    for index, record in enumerate(records):
+        record = record if isinstance(record, dict) else {}
+        student, status = record.get('student'), record.get('status')
+        try:
+            student = int(student)
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'student': student, 'error': 'student must be a student id'})
+            continue
+        if status not in STATUSES:
+            errors.append({'index': index, 'student': student, 'error': f'invalid status {status!r}'})
+            continue
+        if student in marks:
+            errors.append({'index': index, 'student': student, 'error': 'duplicate student'})
+            continue
+        marks[student] = (status, record.get('remarks') or '')
+        positions[student] = index
+
+    if default_status is not None and default_status not in STATUSES:
+        errors.append({'index': None, 'student': None, 'error': f'invalid default_status {default_status!r}'})
+
+    # One query validates the listed students against the section and, with a
+    # default status, also fetches the rest of the active roster
+    roster = Student.objects.filter(current_class=session.class_name, current_section=session.section)
+    wanted = Q(pk__in=list(marks))
+    if default_status is not None:
+        wanted |= Q(is_active=True)
+    enrolled = dict(roster.filter(wanted).values_list('pk', 'is_active'))
+    for student in marks.keys() - enrolled.keys():
+        errors.append({'index': positions[student], 'student': student, 'error': 'student is not in this class/section'})
+
+    teacher_id = session_teacher(session, user)
+    if teacher_id is None:
+        errors.append({'index': None, 'student': None, 'error': 'session has no teacher'})
+    if errors:
+        raise BulkMarkError(sorted(errors, key=lambda e: (e['index'] is None, e['index'] or 0)))
+
+    if default_status is not None:
+        for student, active in enrolled.items():
+            if active and student not in marks:
+                marks[student] = (default_status, '')
+
+    rows = [
+        Attendance(
+            session=session, student_id=student, subject_id=session.subject_id, teacher_id=teacher_id,
+            date=session.date, status=status, remarks=remarks, marked_by=user,
+        )
+        for student, (status, remarks) in sorted(marks.items())
+    ]
+    with transaction.atomic():
+        # Concurrent markings of the session queue up here, so the previous
+        # statuses the report deltas start from are current
+        AttendanceSession.objects.select_for_update().filter(pk=session.pk).exists()
+        # bulk_create skips signals, so feed the monthly reports directly
+        deltas = ReportDeltas()
+        previous = dict(
+            Attendance.objects.filter(subject_id=session.subject_id, date=session.date, student_id__in=list(marks))
+            .values_list('student_id', 'status')
+        )
+        for student, (status, _) in marks.items():
+            old = (student, session.subject_id, session.date, previous[student]) if student in previous else None
+            deltas.move(old, (student, session.subject_id, session.date, status))
+
+        Attendance.objects.bulk_create(
+            rows,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['student', 'subject', 'date'],
+            update_fields=['session', 'teacher', 'status', 'remarks', 'marked_at', 'marked_by', 'updated_at'],
+        )
+        deltas.flush()
+    bump_version(session.class_name, session.section)
+    invalidate_teacher_profiles([teacher_id])
+
+    counts = Counter(status for status, _ in marks.values())
+    return {
+        'session': session.pk,
+        'date': session.date,
+        'marked': len(rows),
+        'counts': {status: counts.get(status, 0) for status, _ in Attendance.ATTENDANCE_STATUS},
+    }
@@ -0,0 +1,67 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from students.models import Student
+from .analytics import bump_version
+from .models import Attendance
+from .reports import ReportDeltas
+
+
+_state = threading.local()
+
+
+@contextmanager
+def muted():
+    """
+    Skip the per-row Attendance handlers inside the block; the caller keeps
+    reports and caches in step for the whole batch.
+    """
+    _state.muted = True
+    try:
+        yield
+    finally:
+        _state.muted = False
+
+
+def is_muted():
+    return getattr(_state, 'muted', False)
+
+
+def _bump_analytics(student_id):
+    section = Student.objects.filter(pk=student_id).values_list('current_class', 'current_section').first()
+    if section is not None:
+        bump_version(*section)
+
+
+@receiver(pre_save, sender=Attendance)
+def remember_previous_mark(sender, instance, raw=False, **kwargs):
+    # Instances built by hand (not loaded from the db) still need their old state
+    if raw or is_muted() or instance.pk is None or hasattr(instance, '_loaded_mark'):
+        return
+    instance._loaded_mark = (
+        Attendance.objects.filter(pk=instance.pk).values_list(*Attendance.REPORT_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Attendance)
+def update_report_on_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw or is_muted():
+        return
+    deltas = ReportDeltas()
+    deltas.move(None if created else getattr(instance, '_loaded_mark', None), instance.report_mark())
+    deltas.flush()
+    instance._loaded_mark = instance.report_mark()
+    _bump_analytics(instance.student_id)
+
+
+@receiver(post_delete, sender=Attendance)
+def update_report_on_delete(sender, instance, **kwargs):
+    if is_muted():
+        return
+    deltas = ReportDeltas()
+    deltas.move(getattr(instance, '_loaded_mark', instance.report_mark()), None)
+    deltas.flush()
+    _bump_analytics(instance.student_id)
@@ -0,0 +1,258 @@
+"""
+Offline-first attendance sync for teacher devices.
+
+A client sends the operations it queued while offline, each with a
+client-generated idempotency `key` and the client time the mark was made
+(`marked_at`), together with the sync token from its previous call. The
+batch is applied in one transaction:
+
+* operations whose key was seen before are answered from the stored outcome;
+* marks are written only if they are newer than what the server holds
+  (last writer wins on `marked_at`);
+* every processed key is recorded in AttendanceSyncOperation.
+
+The response carries the per-operation outcomes, the rows changed on the
+server since the client's token, and a new token.
+
+`updated_at` is stamped before a transaction commits, so a slow writer can
+commit a row behind a cursor that was already handed out. The token's
+position is therefore held `COMMIT_LAG` behind the present, and the rows
+delivered past it travel in the token as `(id, updated_at)` pairs so the
+next call skips them unless they changed again.
+"""
+import base64
+import json
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from students.cache import invalidate_teacher_profiles
+from students.models import Student
+from .analytics import bump_version
+from .models import Attendance, AttendanceSession, AttendanceSyncOperation
+from .reports import ReportDeltas
+from .services import STATUSES, session_teacher
+
+MAX_OPERATIONS = 500
+MAX_CHANGES = 500
+# Tolerated drift of device clocks ahead of the server
+CLOCK_SKEW = timedelta(minutes=5)
+# Longest a marking transaction may take between stamping and committing
+COMMIT_LAG = timedelta(seconds=30)
+CHANGE_FIELDS = ('id', 'session_id', 'student_id', 'subject_id', 'date', 'status', 'remarks', 'marked_at', 'updated_at')
+
+
+class SyncError(Exception):
+    pass
+
+
+def encode_token(updated_at, pk, seen=()):
+    payload = {'t': updated_at.isoformat(), 'i': pk}
+    if seen:
+        payload['s'] = sorted([row_id, moment.isoformat()] for row_id, moment in seen)
+    payload = json.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _parse_moment(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        raise ValueError
+    return moment
+
+
+def decode_token(token):
+    """
+    `(updated_at, id, seen)` from a token; a missing token starts at the
+    beginning of today.
+    """
+    if not token:
+        start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        return start, 0, frozenset()
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        seen = frozenset((int(row_id), _parse_moment(moment)) for row_id, moment in payload.get('s', []))
+        return _parse_moment(payload['t']), int(payload['i']), seen
+    except (TypeError, ValueError, KeyError, AttributeError, UnicodeDecodeError):
+        raise SyncError('Invalid sync token')
+
+
+def sync(user, operations, token=None):
+    since = decode_token(token)
+    if not isinstance(operations, list) or len(operations) > MAX_OPERATIONS:
+        raise SyncError(f'operations must be a list of at most {MAX_OPERATIONS} items')
+
+    with transaction.atomic():
+        results = apply_operations(user, operations)
+    changes, next_token, has_more = changes_since(user, since)
+    return {'results': results, 'changes': changes, 'sync_token': next_token or encode_token(*since), 'has_more': has_more}
+
+
+def apply_operations(user, operations):
+    results = {}
+    parsed = []
+    keys = [op.get('key') for op in operations if isinstance(op, dict) and op.get('key')]
+    seen = {
+        op.key: op for op in AttendanceSyncOperation.objects.filter(user=user, key__in=keys)
+    }
+
+    for index, op in enumerate(operations):
+        op = op if isinstance(op, dict) else {}
+        key = str(op.get('key') or '')[:64]
+        if not key:
+            results[f'#{index}'] = {'key': None, 'outcome': 'rejected', 'error': 'key is required'}
+            continue
+        if key in results:
+            continue
+        if key in seen:
+            previous = seen[key]
+            results[key] = {'key': key, 'outcome': previous.outcome, 'error': previous.error, 'duplicate': True}
+            continue
+        marked_at = parse_datetime(str(op.get('marked_at') or ''))
+        if marked_at is not None and timezone.is_naive(marked_at):
+            marked_at = timezone.make_aware(marked_at)
+        error = None
+        if op.get('status') not in STATUSES:
+            error = f"invalid status {op.get('status')!r}"
+        elif marked_at is None:
+            error = 'marked_at must be an ISO 8601 timestamp'
+        elif marked_at > timezone.now() + CLOCK_SKEW:
+            error = 'marked_at is in the future'
+        try:
+            session_id, student_id = int(op.get('session')), int(op.get('student'))
+        except (TypeError, ValueError):
+            error = error or 'session and student must be ids'
+            session_id = student_id = None
+        if error:
+            results[key] = {'key': key, 'outcome': 'rejected', 'error': error}
+            continue
+        parsed.append({'key': key, 'session': session_id, 'student': student_id, 'status': op['status'],
+                       'remarks': op.get('remarks') or '', 'marked_at': marked_at})
+
+    # One query each for the sessions and the students referenced; the
+    # sessions are locked so concurrent markings cannot interleave with the
+    # last-writer check below
+    sessions = AttendanceSession.objects.select_for_update().in_bulk({p['session'] for p in parsed})
+    enrollment = dict(
+        (pk, (class_name, section)) for pk, class_name, section in
+        Student.objects.filter(pk__in={p['student'] for p in parsed}).values_list('pk', 'current_class', 'current_section')
+    )
+    candidates = {}
+    for p in parsed:
+        session = sessions.get(p['session'])
+        error = None
+        if session is None:
+            error = 'unknown session'
+        elif enrollment.get(p['student']) != (session.class_name, session.section):
+            error = 'student is not in this class/section'
+        elif session_teacher(session, user) is None:
+            error = 'session has no teacher'
+        if error:
+            results[p['key']] = {'key': p['key'], 'outcome': 'rejected', 'error': error}
+            continue
+        p['session_obj'] = session
+        target = (p['student'], session.subject_id, session.date)
+        # Within a batch the latest mark for a row wins as well
+        current = candidates.get(target)
+        if current is not None and current['marked_at'] >= p['marked_at']:
+            results[p['key']] = {'key': p['key'], 'outcome': 'stale', 'error': ''}
+            continue
+        if current is not None:
+            results[current['key']] = {'key': current['key'], 'outcome': 'stale', 'error': ''}
+        candidates[target] = p
+
+    # Last writer wins against the server's copy
+    existing = {}
+    if candidates:
+        lookup = Q()
+        for student_id, subject_id, day in candidates:
+            lookup |= Q(student_id=student_id, subject_id=subject_id, date=day)
+        for row in Attendance.objects.filter(lookup).values('id', 'student_id', 'subject_id', 'date', 'status', 'marked_at'):
+            existing[(row['student_id'], row['subject_id'], row['date'])] = row
+
+    writes = []
+    deltas = ReportDeltas()
+    touched_sections = set()
+    for target, p in candidates.items():
+        current = existing.get(target)
+        if current is not None and current['marked_at'] >= p['marked_at']:
+            results[p['key']] = {'key': p['key'], 'outcome': 'stale', 'error': ''}
+            continue
+        session = p['session_obj']
+        writes.append(Attendance(
+            session=session, student_id=p['student'], subject_id=session.subject_id,
+            teacher_id=session_teacher(session, user), date=session.date, status=p['status'],
+            remarks=p['remarks'], marked_at=p['marked_at'], marked_by=user,
+        ))
+        deltas.move((*target, current['status']) if current else None, (*target, p['status']))
+        touched_sections.add((session.class_name, session.section))
+        results[p['key']] = {'key': p['key'], 'outcome': 'applied', 'error': ''}
+
+    if writes:
+        Attendance.objects.bulk_create(
+            writes,
+            update_conflicts=True,
+            unique_fields=['student', 'subject', 'date'],
+            update_fields=['session', 'teacher', 'status', 'remarks', 'marked_at', 'marked_by', 'updated_at'],
+        )
+        deltas.flush()
+        for class_name, section in touched_sections:
+            bump_version(class_name, section)
+        invalidate_teacher_profiles({w.teacher_id for w in writes})
+
+    applied_ids = {}
+    if writes:
+        # bulk_create upserts do not reliably return ids for updated rows
+        lookup = Q()
+        for w in writes:
+            lookup |= Q(student_id=w.student_id, subject_id=w.subject_id, date=w.date)
+        applied_ids = {
+            (s, sub, d): pk for pk, s, sub, d in
+            Attendance.objects.filter(lookup).values_list('id', 'student_id', 'subject_id', 'date')
+        }
+    targets = {p['key']: target for target, p in candidates.items()}
+    AttendanceSyncOperation.objects.bulk_create([
+        AttendanceSyncOperation(
+            key=r['key'], user=user, outcome=r['outcome'], error=r['error'],
+            attendance_id=applied_ids.get(targets.get(r['key'])) if r['outcome'] == 'applied' else None,
+        )
+        for r in results.values() if r['key'] and not r.get('duplicate')
+    ], ignore_conflicts=True)
+
+    ordered = []
+    for index, op in enumerate(operations):
+        key = str(op.get('key') or '')[:64] if isinstance(op, dict) else ''
+        ordered.append(results.get(key) if key else results[f'#{index}'])
+    return [{k: v for k, v in r.items() if k != 'duplicate' or v} for r in ordered]
+
+
+def changes_since(user, since):
+    """
+    Rows visible to `user` changed after the `(updated_at, id, seen)` token
+    position, oldest first.
+    """
+    moment, last_id, seen = since
+    rows = Attendance.objects.filter(Q(updated_at__gt=moment) | Q(updated_at=moment, id__gt=last_id))
+    if user.role != 'admin':
+        profile = getattr(user, 'teacher_profile', None)
+        if profile is None:
+            return [], None, False
+        rows = rows.filter(Q(teacher=profile) | Q(session__teacher=profile))
+    rows = [
+        row for row in rows.order_by('updated_at', 'id').values(*CHANGE_FIELDS)[:MAX_CHANGES + 1 + len(seen)]
+        if (row['id'], row['updated_at']) not in seen
+    ]
+    has_more = len(rows) > MAX_CHANGES
+    rows = rows[:MAX_CHANGES]
+    if not rows:
+        return rows, None, has_more
+
+    # Hold the position back by COMMIT_LAG; what was sent past it is carried
+    # in the token instead
+    position = min((rows[-1]['updated_at'], rows[-1]['id']), (timezone.now() - COMMIT_LAG, 0))
+    position = max(position, (moment, last_id))
+    delivered = seen | {(row['id'], row['updated_at']) for row in rows}
+    return rows, encode_token(*position, {pair for pair in delivered if pair[::-1] > position}), has_more
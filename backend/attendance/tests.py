@@ -1,3 +1,456 @@
+import os
+import tempfile
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+from accounts.models import User
+from students.models import Student
+from teachers.models import Teacher
+from results.models import AcademicYear
+from .archive import _decode, archive_year, attendance_rows, pack_statuses, restore_year, unpack_statuses
+from .models import Subject, Attendance, AttendanceArchive, AttendanceReport, AttendanceSession, AttendanceSyncOperation
+from .reports import rebuild_reports
+from .services import mark_session
+
+
+def make_student(username, class_name='10', section='A', **extra):
+    user = User.objects.create_user(username=username, password=None, role='student')
+    return Student.objects.create(
+        user=user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+        father_name='F', mother_name='M', guardian_contact='1',
+        current_class=class_name, current_section=section, **extra
+    )
+
+
+class BulkMarkAttendanceTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        teacher_user = User.objects.create_user(username='teach', password=None, role='teacher')
+        self.teacher = Teacher.objects.create(user=teacher_user, joining_date='2020-01-01', qualification='M.Sc', department='Science')
+        self.client.force_authenticate(user=teacher_user)
+        self.subject = Subject.objects.create(name='Science', code='SCI')
+        self.session = AttendanceSession.objects.create(
+            subject=self.subject, date='2025-05-01', period=1, class_name='10', section='A'
+        )
+        self.students = [make_student(f's{i}') for i in range(5)]
+        self.outsider = make_student('other', section='B')
+        self.url = f'/api/attendance/sessions/{self.session.pk}/mark-bulk/'
+
+    def test_marks_whole_roster_in_a_few_queries(self):
+        payload = {
+            'default_status': 'present',
+            'records': [{'student': self.students[0].pk, 'status': 'absent', 'remarks': 'sick'}],
+        }
+        # session, roster, savepoint, session lock, previous marks, upsert, report rows,
+        # one UPDATE per delta, teacher profile key
+        with self.assertNumQueries(11):
+            resp = self.client.post(self.url, payload, format='json')
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.assertEqual(resp.data['marked'], 5)
+        self.assertEqual(resp.data['counts']['present'], 4)
+        self.assertEqual(resp.data['counts']['absent'], 1)
+        self.assertEqual(Attendance.objects.filter(teacher=self.teacher).count(), 5)
+
+    def test_remarking_updates_existing_rows(self):
+        records = [{'student': s.pk, 'status': 'present'} for s in self.students]
+        self.client.post(self.url, {'records': records}, format='json')
+        records[1]['status'] = 'late'
+        resp = self.client.post(self.url, {'records': records}, format='json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(Attendance.objects.count(), 5)
+        self.assertEqual(Attendance.objects.get(student=self.students[1]).status, 'late')
+
+    def test_rejects_students_from_other_sections(self):
+        records = [
+            {'student': self.students[0].pk, 'status': 'present'},
+            {'student': self.outsider.pk, 'status': 'present'},
+            {'student': self.students[1].pk, 'status': 'sleeping'},
+        ]
+        resp = self.client.post(self.url, {'records': records}, format='json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual([e['index'] for e in resp.data['errors']], [1, 2])
+        self.assertFalse(Attendance.objects.exists())
+
+
+class AttendanceSessionListTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        teacher_user = User.objects.create_user(username='teach', password=None, role='teacher')
+        self.teacher = Teacher.objects.create(user=teacher_user, joining_date='2020-01-01', qualification='M.Sc', department='Science')
+        self.client.force_authenticate(user=teacher_user)
+        self.subject = Subject.objects.create(name='Science', code='SCI')
+        self.students = [make_student(f's{i}') for i in range(4)]
+
+    def _session(self, period):
+        return AttendanceSession.objects.create(
+            subject=self.subject, date='2025-05-01', period=period, class_name='10', section='A', teacher=self.teacher
+        )
+
+    def _mark(self, session, student, status):
+        Attendance.objects.create(
+            session=session, student=student, subject=self.subject, teacher=self.teacher,
+            date=f'2025-05-0{session.period}', status=status, marked_by=self.teacher.user,
+        )
+
+    def test_counts_come_from_one_query(self):
+        first = self._session(1)
+        self._mark(first, self.students[0], 'present')
+        self._mark(first, self.students[1], 'late')
+        self._mark(first, self.students[2], 'absent')
+        resp = self.client.get('/api/attendance/sessions/')
+        row = resp.data['results'][0]
+        self.assertEqual(row['total_students'], 4)
+        self.assertEqual(row['present_count'], 2)
+        self.assertEqual(row['absent_count'], 1)
+        self.assertEqual(row['unmarked_count'], 1)
+
+        for period in range(2, 6):
+            self._session(period)
+        with self.assertNumQueries(2):
+            # count + page, nothing per row
+            resp = self.client.get('/api/attendance/sessions/')
+        self.assertEqual(len(resp.data['results']), 5)
+
+
+class AttendanceReportRollupTest(TestCase):
+    def setUp(self):
+        teacher_user = User.objects.create_user(username='teach', password=None, role='teacher')
+        self.teacher = Teacher.objects.create(user=teacher_user, joining_date='2020-01-01', qualification='M.Sc', department='Science')
+        self.subject = Subject.objects.create(name='Science', code='SCI')
+        self.students = [make_student(f's{i}') for i in range(3)]
+
+    def _mark(self, student, day, status):
+        return Attendance.objects.create(
+            student=student, subject=self.subject, teacher=self.teacher, date=day, status=status,
+            marked_by=self.teacher.user,
+        )
+
+    def _report(self, student, month=5):
+        return AttendanceReport.objects.get(student=student, subject=self.subject, year=2025, month=month)
+
+    def test_marks_update_monthly_counters(self):
+        first = self._mark(self.students[0], '2025-05-01', 'present')
+        self._mark(self.students[0], '2025-05-02', 'absent')
+        self._mark(self.students[0], '2025-06-02', 'late')
+        report = self._report(self.students[0])
+        self.assertEqual((report.total_days, report.present_days, report.absent_days), (2, 1, 1))
+        self.assertEqual(report.attendance_percentage, 50.0)
+
+        first = Attendance.objects.get(pk=first.pk)
+        first.status = 'late'
+        first.save()
+        report = self._report(self.students[0])
+        self.assertEqual((report.total_days, report.present_days, report.late_days), (2, 0, 1))
+
+        first.delete()
+        report = self._report(self.students[0])
+        self.assertEqual((report.total_days, report.absent_days), (1, 1))
+        self.assertEqual(report.attendance_percentage, 0.0)
+        self.assertEqual(self._report(self.students[0], month=6).attendance_percentage, 100.0)
+
+    def test_bulk_marking_and_rebuild_agree(self):
+        session = AttendanceSession.objects.create(
+            subject=self.subject, date='2025-05-05', period=1, class_name='10', section='A', teacher=self.teacher
+        )
+        mark_session(session, [{'student': self.students[0].pk, 'status': 'absent'}], self.teacher.user, 'present')
+        mark_session(session, [{'student': self.students[1].pk, 'status': 'excused'}], self.teacher.user, 'present')
+        self._mark(self.students[2], '2025-05-06', 'late')
+        incremental = sorted(AttendanceReport.objects.values_list(
+            'student_id', 'total_days', 'present_days', 'absent_days', 'late_days', 'excused_days', 'attendance_percentage'
+        ))
+        self.assertEqual(incremental[0][1:], (1, 1, 0, 0, 0, 100.0))
+
+        call_command('rebuild_attendance_reports', '--year=2025', '--month=5', stdout=StringIO())
+        rebuilt = sorted(AttendanceReport.objects.values_list(
+            'student_id', 'total_days', 'present_days', 'absent_days', 'late_days', 'excused_days', 'attendance_percentage'
+        ))
+        self.assertEqual(incremental, rebuilt)
+
+    def test_report_filters_must_be_numbers(self):
+        client = APIClient()
+        client.force_authenticate(user=self.teacher.user)
+        self.assertEqual(client.get('/api/attendance/reports/', {'student': 'abc'}).status_code, 400)
+        self.assertEqual(client.get('/api/attendance/reports/', {'subject': self.subject.pk}).status_code, 200)
+
+
+class AttendanceAnalyticsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        teacher_user = User.objects.create_user(username='teach', password=None, role='teacher')
+        self.teacher = Teacher.objects.create(user=teacher_user, joining_date='2020-01-01', qualification='M.Sc', department='Science')
+        self.client.force_authenticate(user=teacher_user)
+        self.science = Subject.objects.create(name='Science', code='SCI')
+        self.maths = Subject.objects.create(name='Maths', code='MAT')
+        self.good = make_student('good', roll_number='1')
+        self.poor = make_student('poor', roll_number='2')
+        # School days 1-5 May; poor misses 2-4 May in science
+        for day in range(1, 6):
+            for subject in (self.science, self.maths):
+                self._mark(self.good, subject, day, 'present')
+                absent = subject == self.science and 2 <= day <= 4
+                self._mark(self.poor, subject, day, 'absent' if absent else 'late')
+
+    def _mark(self, student, subject, day, status):
+        Attendance.objects.create(
+            student=student, subject=subject, teacher=self.teacher, date=f'2025-05-{day:02d}', status=status,
+            marked_by=self.teacher.user,
+        )
+
+    def _get(self, name, **params):
+        query = {'class': '10', 'section': 'A', 'year': 2025, 'month': 5, **params}
+        return self.client.get(f'/api/attendance/analytics/{name}/', query)
+
+    def test_rows_outside_the_roster_are_skipped(self):
+        from .analytics import ClassMonth
+        moved = make_student('moved', section='B', roll_number='3')
+        self._mark(moved, self.science, 1, 'absent')
+        expected = ClassMonth('10', 'A', 2025, 5).matrix()
+        # Rows of a student transferred out after the roster was read
+        moved_rows = attendance_rows(date(2025, 5, 1), date(2025, 5, 31), pk=moved.pk)
+        with mock.patch('attendance.analytics.attendance_rows', lambda *a, **kw: attendance_rows(*a, **kw) + moved_rows):
+            self.assertEqual(ClassMonth('10', 'A', 2025, 5).matrix(), expected)
+
+    def test_matrix_streaks_and_flags(self):
+        resp = self._get('matrix', threshold=80)
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.assertEqual(len(resp.data['days']), 5)
+        good, poor = resp.data['students']
+        self.assertEqual(good['percentage'], 100.0)
+        self.assertEqual(poor['percentage'], 70.0)
+        self.assertEqual(resp.data['matrix'][1], [1.0, 0.5, 0.5, 0.5, 1.0])
+        self.assertEqual(poor['absent_days'], 0)
+        self.assertEqual(resp.data['chronic_absentees'], [self.poor.pk])
+
+    def test_subject_percentages(self):
+        resp = self._get('subjects')
+        science = next(s for s in resp.data['subjects'] if s['name'] == 'Science')
+        self.assertEqual(science['percentage'], 70.0)
+        poor = resp.data['students'][1]
+        self.assertEqual(poor['percentages'][str(self.science.pk)], 40.0)
+        self.assertEqual(poor['percentages'][str(self.maths.pk)], 100.0)
+
+    def test_rejects_out_of_range_dates(self):
+        for params in ({'year': 0}, {'year': 10000}, {'month': 13}, {'year': 'x'}):
+            self.assertEqual(self._get('subjects', **params).status_code, 400, params)
+
+    def test_cached_until_class_attendance_changes(self):
+        self._get('matrix')
+        with self.assertNumQueries(0):
+            self._get('matrix')
+        Attendance.objects.filter(student=self.poor, subject=self.maths, date='2025-05-02').get().delete()
+        self._mark(self.poor, self.maths, 2, 'absent')
+        resp = self._get('matrix')
+        self.assertEqual(resp.data['students'][1]['longest_absence_streak'], 1)
+        self.assertEqual(resp.data['students'][1]['current_absence_streak'], 0)
+
+
+class AttendanceArchiveTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        teacher_user = User.objects.create_user(username='teach', password=None, role='teacher')
+        self.teacher = Teacher.objects.create(user=teacher_user, joining_date='2020-01-01', qualification='M.Sc', department='Science')
+        self.client.force_authenticate(user=teacher_user)
+        self.subject = Subject.objects.create(name='Science', code='SCI')
+        self.student = make_student('arch')
+        self.year = AcademicYear.objects.create(name='2023-2024', start_date='2023-04-01', end_date='2024-03-31')
+        self.year.refresh_from_db()
+        statuses = ['present', 'absent', 'late', 'excused', 'present']
+        for i, status in enumerate(statuses):
+            Attendance.objects.create(
+                student=self.student, subject=self.subject, teacher=self.teacher, date=f'2023-04-{i + 3:02d}',
+                status=status, marked_by=teacher_user,
+            )
+        self.original = sorted(Attendance.objects.values_list('date', 'status'))
+
+    def test_pack_roundtrip(self):
+        codes = [0, 1, 2, 3, 3, 2, 1]
+        self.assertEqual(list(unpack_statuses(pack_statuses(codes), len(codes))), codes)
+
+    def test_archive_and_restore(self):
+        call_command('archive_attendance', '--year=2023-2024', stdout=StringIO())
+        self.assertFalse(Attendance.objects.exists())
+        archive = AttendanceArchive.objects.get()
+        self.assertEqual(len(archive.statuses), 92)  # 366 days, four per byte
+        # Monthly reports are left as they were
+        self.assertEqual(AttendanceReport.objects.get().total_days, 5)
+
+        resp = self.client.get('/api/attendance/history/', {'student': self.student.pk, 'year': self.year.pk, 'detail': 'true'})
+        self.assertTrue(resp.data['archived'])
+        self.assertEqual(resp.data['subjects'][0]['total_days'], 5)
+        self.assertEqual(resp.data['subjects'][0]['attendance_percentage'], 60.0)
+        self.assertEqual([(r['date'].isoformat(), r['status']) for r in resp.data['records']][:2],
+                         [('2023-04-03', 'present'), ('2023-04-04', 'absent')])
+
+        call_command('restore_attendance', '--year=2023-2024', stdout=StringIO())
+        self.assertEqual(sorted(Attendance.objects.values_list('date', 'status')), self.original)
+        self.assertFalse(AttendanceArchive.objects.exists())
+        self.assertEqual(AttendanceReport.objects.get().total_days, 5)
+
+    def test_archive_detaches_sync_operations(self):
+        mark = Attendance.objects.first()
+        operation = AttendanceSyncOperation.objects.create(key='k1', user=mark.marked_by, outcome='applied', attendance=mark)
+        call_command('archive_attendance', '--year=2023-2024', stdout=StringIO())
+        self.assertFalse(Attendance.objects.exists())
+        operation.refresh_from_db()
+        self.assertIsNone(operation.attendance_id)
+
+    def test_restore_keeps_days_marked_live_again(self):
+        call_command('archive_attendance', '--year=2023-2024', stdout=StringIO())
+        Attendance.objects.create(
+            student=self.student, subject=self.subject, teacher=self.teacher, date='2023-04-04',
+            status='present', marked_by=self.teacher.user,
+        )
+        resp = self.client.get('/api/attendance/history/', {'student': self.student.pk, 'year': self.year.pk})
+        self.assertEqual(resp.data['subjects'][0]['total_days'], 5)
+
+        self.assertEqual(restore_year(self.year), (4, 0, 1))
+        self.assertEqual(Attendance.objects.get(date='2023-04-04').status, 'present')
+        archive = AttendanceArchive.objects.get()
+        self.assertEqual([(d.isoformat(), s) for d, s in _decode(archive)], [('2023-04-04', 'absent')])
+
+        # Archiving again merges into the leftover row; the live value wins
+        self.assertEqual(archive_year(self.year), (5, 1))
+        self.assertFalse(Attendance.objects.exists())
+        archive = AttendanceArchive.objects.get()
+        self.assertEqual([s for _, s in _decode(archive)], ['present', 'present', 'late', 'excused', 'present'])
+
+    def test_rebuild_keeps_archived_months(self):
+        call_command('archive_attendance', '--year=2023-2024', stdout=StringIO())
+        self.assertEqual(rebuild_reports(year=2023), 1)
+        report = AttendanceReport.objects.get()
+        self.assertEqual((report.total_days, report.present_days, report.attendance_percentage), (5, 2, 60.0))
+
+    def test_history_rejects_non_numeric_ids(self):
+        resp = self.client.get('/api/attendance/history/', {'student': 'abc', 'year': self.year.pk})
+        self.assertEqual(resp.status_code, 400)
+
+
+class AttendanceSyncTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        teacher_user = User.objects.create_user(username='teach', password=None, role='teacher')
+        self.teacher = Teacher.objects.create(user=teacher_user, joining_date='2020-01-01', qualification='M.Sc', department='Science')
+        self.client.force_authenticate(user=teacher_user)
+        self.subject = Subject.objects.create(name='Science', code='SCI')
+        self.session = AttendanceSession.objects.create(
+            subject=self.subject, date='2025-05-01', period=1, class_name='10', section='A', teacher=self.teacher
+        )
+        self.students = [make_student(f's{i}') for i in range(3)]
+        self.url = '/api/attendance/sync/'
+
+    def op(self, key, student, status, marked_at):
+        return {'key': key, 'session': self.session.pk, 'student': student.pk, 'status': status, 'marked_at': marked_at}
+
+    def test_replayed_operations_are_applied_once(self):
+        ops = [self.op(f'k{i}', s, 'present', '2025-05-01T09:00:00Z') for i, s in enumerate(self.students)]
+        first = self.client.post(self.url, {'operations': ops}, format='json')
+        self.assertEqual(first.status_code, 200, first.data)
+        self.assertEqual([r['outcome'] for r in first.data['results']], ['applied'] * 3)
+        self.assertEqual(AttendanceReport.objects.get(student=self.students[0]).present_days, 1)
+
+        again = self.client.post(self.url, {'operations': ops, 'since': first.data['sync_token']}, format='json')
+        self.assertTrue(all(r['duplicate'] for r in again.data['results']))
+        self.assertEqual(Attendance.objects.count(), 3)
+        self.assertEqual(AttendanceReport.objects.get(student=self.students[0]).present_days, 1)
+        self.assertEqual(again.data['changes'], [])
+
+    def test_last_writer_wins(self):
+        student = self.students[0]
+        self.client.post(self.url, {'operations': [self.op('a', student, 'absent', '2025-05-01T10:00:00Z')]}, format='json')
+        resp = self.client.post(self.url, {'operations': [
+            self.op('b', student, 'present', '2025-05-01T09:00:00Z'),
+            self.op('c', student, 'late', '2025-05-01T11:00:00Z'),
+            self.op('d', student, 'excused', '2025-05-01T10:30:00Z'),
+        ]}, format='json')
+        self.assertEqual([r['outcome'] for r in resp.data['results']], ['stale', 'applied', 'stale'])
+        mark = Attendance.objects.get(student=student)
+        self.assertEqual(mark.status, 'late')
+        report = AttendanceReport.objects.get(student=student)
+        self.assertEqual((report.absent_days, report.late_days, report.total_days), (0, 1, 1))
+
+    def test_pulls_changes_since_token(self):
+        resp = self.client.post(self.url, {'operations': []}, format='json')
+        token = resp.data['sync_token']
+        mark_session(self.session, [{'student': self.students[1].pk, 'status': 'absent'}], self.teacher.user)
+        resp = self.client.post(self.url, {'since': token, 'operations': [
+            {'key': 'x', 'session': self.session.pk, 'student': 'nope', 'status': 'present', 'marked_at': '2025-05-01T09:00:00Z'},
+        ]}, format='json')
+        self.assertEqual(resp.data['results'][0]['outcome'], 'rejected')
+        self.assertEqual([(c['student_id'], c['status']) for c in resp.data['changes']], [(self.students[1].pk, 'absent')])
+        self.assertFalse(resp.data['has_more'])
+
+        bad = self.client.post(self.url, {'since': 'garbage', 'operations': []}, format='json')
+        self.assertEqual(bad.status_code, 400)
+
+    def test_late_commits_behind_the_token_are_delivered(self):
+        first = self.client.post(self.url, {'operations': [self.op('k0', self.students[0], 'present', '2025-05-01T09:00:00Z')]},
+                                 format='json')
+        delivered = Attendance.objects.get(student=self.students[0])
+        # A slow writer stamped its row before the delivered one but committed after
+        mark_session(self.session, [{'student': self.students[1].pk, 'status': 'absent'}], self.teacher.user)
+        Attendance.objects.filter(student=self.students[1]).update(updated_at=delivered.updated_at - timedelta(seconds=1))
+        resp = self.client.post(self.url, {'operations': [], 'since': first.data['sync_token']}, format='json')
+        self.assertEqual([c['student_id'] for c in resp.data['changes']], [self.students[1].pk])
+
+    def test_keys_are_scoped_to_the_user(self):
+        self.client.post(self.url, {'operations': [self.op('k0', self.students[0], 'present', '2025-05-01T09:00:00Z')]},
+                         format='json')
+        admin = User.objects.create_user(username='admin', password=None, role='admin')
+        self.client.force_authenticate(user=admin)
+        resp = self.client.post(self.url, {'operations': [self.op('k0', self.students[1], 'late', '2025-05-01T09:00:00Z')]},
+                                format='json')
+        self.assertEqual(resp.data['results'], [{'key': 'k0', 'outcome': 'applied', 'error': ''}])
+        self.assertEqual(AttendanceSyncOperation.objects.filter(key='k0').count(), 2)
+
+
+class AttendanceExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        teacher_user = User.objects.create_user(username='teach', password=None, role='teacher')
+        Teacher.objects.create(user=teacher_user, joining_date='2020-01-01', qualification='M.Sc', department='Science')
+        self.client.force_authenticate(user=teacher_user)
+        subject = Subject.objects.create(name='Science', code='SCI')
+        self.students = [make_student(f's{i}') for i in range(2)]
+        for day, statuses in (('2025-05-01', ('present', 'absent')), ('2025-05-02', ('late', 'present'))):
+            session = AttendanceSession.objects.create(subject=subject, date=day, period=1, class_name='10', section='A')
+            mark_session(session, [{'student': s.pk, 'status': st} for s, st in zip(self.students, statuses)], teacher_user)
+
+    def test_wide_csv_pivots_dates_into_columns(self):
+        resp = self.client.get('/api/attendance/export/', {'class': '10', 'section': 'A', 'from': '2025-05-01'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        lines = b''.join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[6:], ['2025-05-01', '2025-05-02', 'present', 'absent', 'late', 'excused', 'percentage'])
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[1].split(',')[6:], ['P', 'L', '1', '0', '1', '0', '100.0'])
+        self.assertEqual(lines[2].split(',')[6:], ['A', 'P', '1', '1', '0', '0', '50.0'])
+
+    def test_long_xlsx_and_command(self):
+        from openpyxl import load_workbook
+        resp = self.client.get('/api/attendance/export/', {'output': 'xlsx', 'layout': 'long'})
+        self.assertEqual(resp.status_code, 200)
+        sheet = load_workbook(BytesIO(b''.join(resp.streaming_content)), read_only=True).active
+        self.assertEqual(len(list(sheet.rows)), 5)
+
+        path = os.path.join(tempfile.mkdtemp(), 'attendance.csv')
+        call_command('export_attendance', '--output', path, '--to', '2025-05-01', stdout=StringIO())
+        with open(path) as exported:
+            self.assertEqual(exported.readline().strip().split(',')[6:], ['2025-05-01', 'present', 'absent', 'late', 'excused', 'percentage'])
+
+        bad = self.client.get('/api/attendance/export/', {'from': 'yesterday'})
+        self.assertEqual(bad.status_code, 400)
+
 
-# Create your tests here.
+class QueryPlanTest(TestCase):
+    def test_hot_paths_use_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', verbosity=2, stdout=out)
+        self.assertIn('All hot paths use an index.', out.getvalue())
+        # Checked against real plans even on an empty database
+        self.assertIn('task_class_section_idx', out.getvalue())
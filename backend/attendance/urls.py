@@ -10,5 +10,11 @@ urlpatterns = [
     path('<int:pk>/', views.AttendanceDetailView.as_view(), name='attendance-detail'),
     path('reports/', views.AttendanceReportListCreateView.as_view(), name='attendance-report-list-create'),
     path('sessions/', views.AttendanceSessionListCreateView.as_view(), name='attendance-session-list-create'),
+    path('sessions/<int:pk>/mark-bulk/', views.BulkMarkAttendanceView.as_view(), name='session-mark-bulk'),
+    path('analytics/matrix/', views.AttendanceMatrixView.as_view(), name='analytics-matrix'),
+    path('analytics/subjects/', views.AttendanceSubjectAnalyticsView.as_view(), name='analytics-subjects'),
+    path('sync/', views.AttendanceSyncView.as_view(), name='attendance-sync'),
+    path('export/', views.AttendanceExportView.as_view(), name='attendance-export'),
+    path('history/', views.AttendanceHistoryView.as_view(), name='attendance-history'),
     path('mark/', views.MarkAttendanceView.as_view(), name='mark-attendance'),
 ]
@@ -1,10 +1,24 @@
+from collections import Counter, defaultdict
+from datetime import MAXYEAR, MINYEAR
+
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.utils import timezone
 from django.utils.dateparse import parse_date
 from django.shortcuts import get_object_or_404
-from .models import Subject, Attendance, AttendanceReport, AttendanceSession
+from backend.exports import ExportError, export_response, request_options
+from backend.pagination import KeysetPagination
+from results.models import AcademicYear
+from students.models import Student
+from .models import Subject, Attendance, AttendanceArchive, AttendanceReport, AttendanceSession
+from .archive import attendance_rows
+from .exports import attendance_table
+from .services import BulkMarkError, mark_session
+from .sync import SyncError, sync
+from . import analytics
 from .serializers import (
     SubjectSerializer,
     AttendanceSerializer,
@@ -29,6 +43,8 @@ class AttendanceListCreateView(generics.ListCreateAPIView):
     queryset = Attendance.objects.all()
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-date', '-id')
 
 
 class AttendanceDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -36,18 +52,46 @@ class AttendanceDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def perform_update(self, serializer):
+        serializer.save(marked_at=timezone.now())
+
+
+NUMERIC_REPORT_FILTERS = {'student', 'subject', 'year', 'month'}
+
 
 class AttendanceReportListCreateView(generics.ListCreateAPIView):
+    """
+    Monthly per-student, per-subject rollups, kept up to date as attendance is marked.
+
+    Filter with `student`, `subject`, `year`, `month`, `class` and `section`.
+    """
     queryset = AttendanceReport.objects.all()
     serializer_class = AttendanceReportSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_queryset(self):
+        qs = AttendanceReport.objects.select_related('student__user', 'subject')
+        params = self.request.query_params
+        filters = {
+            'student': 'student_id', 'subject': 'subject_id', 'year': 'year', 'month': 'month',
+            'class': 'student__current_class', 'section': 'student__current_section',
+        }
+        for param, lookup in filters.items():
+            value = params.get(param)
+            if value:
+                if param in NUMERIC_REPORT_FILTERS and not value.isdigit():
+                    raise ValidationError({param: 'must be a number'})
+                qs = qs.filter(**{lookup: value})
+        return qs
+
 class AttendanceSessionListCreateView(generics.ListCreateAPIView):
     serializer_class = AttendanceSessionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        qs = AttendanceSession.objects.all()
+        qs = AttendanceSession.with_counts(AttendanceSession.objects.select_related('subject'))
+        # Meta.ordering is not applied to aggregated querysets
+        qs = qs.order_by(*AttendanceSession._meta.ordering)
         date_str = self.request.query_params.get('date')
         if date_str:
             date = parse_date(date_str)
@@ -97,8 +141,174 @@ class MarkAttendanceView(APIView):
                 'teacher': teacher,
                 'status': status_value,
                 'remarks': remarks,
+                'marked_at': timezone.now(),
                 'marked_by': request.user,
             }
         )
 
-        return Response(AttendanceSerializer(attendance).data, status=status.HTTP_201_CREATED)
\ No newline at end of file
+        return Response(AttendanceSerializer(attendance).data, status=status.HTTP_201_CREATED)
+
+
+class BulkMarkAttendanceView(APIView):
+    """
+    Mark a whole session in one request.
+
+    Body: `{"records": [{"student": <pk>, "status": "absent", "remarks": ""}, ...],
+    "default_status": "present"}`. `default_status` is optional and applies to
+    every active student of the section not listed in `records`.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        if request.user.role not in ('admin', 'teacher'):
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        session = get_object_or_404(AttendanceSession, pk=pk)
+        records = request.data.get('records', [])
+        default_status = request.data.get('default_status')
+        if not isinstance(records, list) or (not records and default_status is None):
+            return Response({'detail': 'records must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            summary = mark_session(session, records, request.user, default_status=default_status)
+        except BulkMarkError as e:
+            return Response({'detail': str(e), 'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+class AttendanceSyncView(APIView):
+    """
+    Push queued offline marks and pull server changes in one round trip.
+
+    Body: `{"since": <sync_token>, "operations": [{"key": "<uuid>", "session": <pk>,
+    "student": <pk>, "status": "present", "remarks": "", "marked_at": "<ISO 8601>"}, ...]}`.
+    Replayed keys return their original outcome; marks older than the
+    server's copy come back as `stale`. Store the returned `sync_token` and
+    call again while `has_more` is true.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        if request.user.role not in ('admin', 'teacher'):
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            data = sync(request.user, request.data.get('operations', []), request.data.get('since'))
+        except SyncError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class AttendanceExportView(APIView):
+    """
+    Stream attendance as CSV or XLSX for government reporting.
+
+    Filters: `?class=&section=&subject=<pk>&from=YYYY-MM-DD&to=YYYY-MM-DD`.
+    `?layout=wide` (default) gives one line per student and subject with a
+    column per date; `?layout=long` one line per mark. `?output=csv|xlsx`.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role not in ('admin', 'teacher'):
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            filters, output, layout = request_options(request.query_params)
+        except ExportError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        header, rows = attendance_table(filters, layout)
+        return export_response(header, rows, output, filters.filename('attendance'))
+
+
+class ClassMonthAnalyticsView(APIView):
+    """
+    Base for class-month analytics: `?class=&section=&year=&month=`.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role not in ('admin', 'teacher'):
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        params = request.query_params
+        class_name, section = params.get('class'), params.get('section')
+        try:
+            year, month = int(params.get('year', '')), int(params.get('month', ''))
+            if not 1 <= month <= 12 or not MINYEAR <= year <= MAXYEAR:
+                raise ValueError
+        except ValueError:
+            return Response({'detail': f'year ({MINYEAR}-{MAXYEAR}) and month (1-12) are required'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not class_name or not section:
+            return Response({'detail': 'class and section are required'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.compute(request, class_name, section, year, month)
+
+
+class AttendanceMatrixView(ClassMonthAnalyticsView):
+    """
+    Students x school-days attendance matrix with percentages, absence streaks,
+    rolling class percentage and chronic-absentee flags (`?threshold=` percent).
+    """
+
+    def compute(self, request, class_name, section, year, month):
+        threshold = request.query_params.get('threshold')
+        try:
+            threshold = float(threshold) if threshold else None
+        except ValueError:
+            return Response({'detail': 'threshold must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(analytics.class_matrix(class_name, section, year, month, threshold))
+
+
+class AttendanceSubjectAnalyticsView(ClassMonthAnalyticsView):
+    """Subject-wise attendance percentages for the class and for each student."""
+
+    def compute(self, request, class_name, section, year, month):
+        return Response(analytics.class_subjects(class_name, section, year, month))
+
+
+
+class AttendanceHistoryView(APIView):
+    """
+    A student's attendance for one academic year: `?student=<pk>&year=<academic year id>`.
+
+    Reads live rows and the bitmap archive of closed years alike. Pass
+    `detail=true` to include the individual daily records.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        for param in ('student', 'year'):
+            if not str(params.get(param, '')).isdigit():
+                return Response({'detail': f'{param} must be an id'}, status=status.HTTP_400_BAD_REQUEST)
+        student = get_object_or_404(Student, pk=params.get('student'))
+        if request.user.role == 'student' and student.user_id != request.user.id:
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        academic_year = get_object_or_404(AcademicYear, pk=params.get('year'))
+
+        rows = sorted(attendance_rows(academic_year.start_date, academic_year.end_date, pk=student.pk),
+                      key=lambda r: (r[1], r[2]))
+        counts = defaultdict(Counter)
+        for _, _, subject_id, status_value in rows:
+            counts[subject_id][status_value] += 1
+        names = dict(Subject.objects.filter(pk__in=counts).values_list('pk', 'name'))
+
+        subjects = []
+        for subject_id, counter in sorted(counts.items(), key=lambda item: names.get(item[0], '')):
+            total = sum(counter.values())
+            subjects.append({
+                'subject': subject_id,
+                'subject_name': names.get(subject_id),
+                'total_days': total,
+                **{f'{s}_days': counter.get(s, 0) for s, _ in Attendance.ATTENDANCE_STATUS},
+                'attendance_percentage': round((counter['present'] + counter['late']) * 100.0 / total, 2),
+            })
+
+        data = {
+            'student': student.pk,
+            'academic_year': academic_year.name,
+            'archived': AttendanceArchive.objects.filter(academic_year=academic_year, student=student).exists(),
+            'subjects': subjects,
+        }
+        if str(params.get('detail', '')).lower() in ('1', 'true', 'yes'):
+            data['records'] = [{'date': day, 'subject': subject_id, 'status': s} for _, day, subject_id, s in rows]
+        return Response(data)
@@ -0,0 +1,127 @@
+"""
+Tabular export writers shared by the attendance and results exports.
+
+A table is a header list plus an iterator of row lists, usually built from
+`values_list(...).iterator(chunk_size=...)`. CSV is streamed straight to the
+client with `StreamingHttpResponse`; XLSX goes through an openpyxl
+write-only workbook that spools rows to a temporary file, so neither format
+keeps the rows in memory.
+"""
+import csv
+import tempfile
+from datetime import date
+
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+
+OUTPUTS = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+LAYOUTS = ('wide', 'long')
+
+
+class ExportError(Exception):
+    pass
+
+
+def chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+class ExportFilters:
+    """Class/section/subject/date-range filters parsed from query params or command options."""
+
+    def __init__(self, class_name=None, section=None, subject=None, start=None, end=None):
+        self.class_name = class_name or None
+        self.section = section or None
+        try:
+            self.subject = int(subject) if subject not in (None, '') else None
+        except (TypeError, ValueError):
+            raise ExportError('subject must be a subject id')
+        self.start = self._date(start, 'from')
+        self.end = self._date(end, 'to')
+        if self.start and self.end and self.start > self.end:
+            raise ExportError('from must not be after to')
+
+    @staticmethod
+    def _date(value, name):
+        if value in (None, '') or isinstance(value, date):
+            return value or None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise ExportError(f'{name} must be a YYYY-MM-DD date')
+        return parsed
+
+    @classmethod
+    def from_params(cls, params):
+        return cls(params.get('class'), params.get('section'), params.get('subject'), params.get('from'), params.get('to'))
+
+    def filename(self, prefix):
+        parts = [prefix, self.class_name, self.section, self.start, self.end]
+        return '_'.join(str(p) for p in parts if p)
+
+
+def request_options(params):
+    """`(filters, output, layout)` from export query params (`?output=csv|xlsx&layout=wide|long`)."""
+    output = params.get('output', 'csv').lower()
+    if output not in OUTPUTS:
+        raise ExportError('output must be csv or xlsx')
+    layout = params.get('layout', 'wide').lower()
+    if layout not in LAYOUTS:
+        raise ExportError('layout must be wide or long')
+    return ExportFilters.from_params(params), output, layout
+
+
+class _Echo:
+    """File-like object whose `write` returns the value, for `csv.writer` streaming."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_csv(header, rows, fileobj):
+    writer = csv.writer(fileobj)
+    writer.writerow(header)
+    writer.writerows(rows)
+
+
+def write_xlsx(header, rows, fileobj, title='Export'):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(fileobj)
+
+
+def export_response(header, rows, output, filename):
+    """Stream a table to the client as `<filename>.csv` or `.xlsx`."""
+    if output == 'csv':
+        response = StreamingHttpResponse(iter_csv(header, rows), content_type=OUTPUTS['csv'])
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        return response
+    spool = tempfile.TemporaryFile()
+    write_xlsx(header, rows, spool, title=filename)
+    spool.seek(0)
+    return FileResponse(spool, as_attachment=True, filename=f'{filename}.xlsx', content_type=OUTPUTS['xlsx'])
+
+
+def export_to_file(header, rows, path):
+    """Write a table to `path`; the format follows the extension (.xlsx, else CSV)."""
+    if str(path).lower().endswith('.xlsx'):
+        with open(path, 'wb') as out:
+            write_xlsx(header, rows, out)
+    else:
+        with open(path, 'w', newline='', encoding='utf-8') as out:
+            write_csv(header, rows, out)
@@ -0,0 +1,63 @@
+"""
+Claiming batches of queued job rows for the background runners.
+
+Job models (students.QRCodeJob, results.ResultNotificationJob) share the
+`status`, `attempts`, `claim`, `error` and `updated_at` columns. A runner
+claims a batch by stamping it with a fresh token, works only on the rows
+that carry its token, and records outcomes with `finish()`, which checks
+the token again so a job re-queued in the meantime stays pending.
+
+Jobs whose runner died are found by their `updated_at` and failed; failed
+jobs are retried after a delay until they run out of attempts.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+def stale_after():
+    """Seconds a claimed job may run before it is considered abandoned."""
+    return getattr(settings, 'JOB_STALE_AFTER', 15 * 60)
+
+
+def retry_delay():
+    return getattr(settings, 'JOB_RETRY_DELAY', 60)
+
+
+def max_attempts():
+    return getattr(settings, 'JOB_MAX_ATTEMPTS', 3)
+
+
+def recover(model):
+    """Fail jobs abandoned by a crashed runner and re-queue failed jobs with attempts left."""
+    now = timezone.now()
+    model.objects.filter(status='running', updated_at__lt=now - timedelta(seconds=stale_after())).update(
+        status='failed', claim='', error='Runner stopped before finishing', updated_at=now,
+    )
+    model.objects.filter(
+        status='failed', attempts__lt=max_attempts(), updated_at__lt=now - timedelta(seconds=retry_delay()),
+    ).update(status='pending', updated_at=now)
+
+
+def claim(model, batch_size):
+    """Claim up to `batch_size` pending jobs; returns `(token, jobs)`."""
+    recover(model)
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        job_ids = list(model.objects.filter(status='pending').order_by('id').values_list('id', flat=True)[:batch_size])
+        # Concurrent runners may race for the same ids; each row ends up with one token
+        model.objects.filter(id__in=job_ids, status='pending').update(
+            status='running', claim=token, attempts=F('attempts') + 1, updated_at=timezone.now(),
+        )
+    return token, list(model.objects.filter(id__in=job_ids, claim=token, status='running'))
+
+
+def finish(model, token, job_ids, status, **fields):
+    """Record the outcome of claimed jobs that still hold `token`; returns the number updated."""
+    return model.objects.filter(id__in=job_ids, claim=token, status='running').update(
+        status=status, claim='', updated_at=timezone.now(), **fields,
+    )
@@ -157,6 +157,27 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Cache
+# Public profiles, class rosters, mark ledgers and attendance analytics are
+# cached and invalidated from signal handlers. The local-memory backend only
+# sees invalidations made in its own process, which is fine for runserver;
+# with several worker processes, point every process at a shared backend
+# (Redis, Memcached or django.core.cache.backends.db.DatabaseCache after
+# `python manage.py createcachetable`) or stale entries are served until
+# they expire.
+# The version counters behind the analytics and ledger caches live in the
+# same cache; if culling evicts one, its class falls back to version 1 and
+# can be served old entries, so keep MAX_ENTRIES (300 by default) well above
+# the number of cached entries.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    }
+}
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0003_alter_fine_options_bookview'),
+        ('students', '0008_qr_job_claim'),
+        ('teachers', '0004_teacher_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookissue',
+            index=models.Index(fields=['issued_date', 'id'], name='bookissue_issued_id_idx'),
+        ),
+    ]
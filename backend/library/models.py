@@ -64,6 +64,10 @@ class BookIssue(models.Model):
 
     class Meta:
         ordering = ['-issued_date']
+        indexes = [
+            # Keyset pages of the issue list, newest first
+            models.Index(fields=['issued_date', 'id'], name='bookissue_issued_id_idx'),
+        ]
 
 
 class Fine(models.Model):
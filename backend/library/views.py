@@ -3,6 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.db.models import Count
 
+from backend.pagination import KeysetPagination
 from .models import Book, BookIssue, Fine, BookView
 from .serializers import (
     BookSerializer,
@@ -28,6 +29,8 @@ class BookIssueListCreateView(generics.ListCreateAPIView):
     queryset = BookIssue.objects.all()
     serializer_class = BookIssueSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-issued_date', '-id')
 
 
 class BookIssueDetailView(generics.RetrieveUpdateDestroyAPIView):
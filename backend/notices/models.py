@@ -99,6 +99,12 @@ class UserNotification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Unread counts and mark-all-read
+            models.Index(fields=['user', 'is_read'], name='notification_user_read_idx'),
+            # Keyset pages of a user's notifications, newest first
+            models.Index(fields=['user', 'created_at', 'id'], name='notification_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"Notification for {self.user.username}: {self.title}"
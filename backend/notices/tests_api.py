@@ -57,3 +57,32 @@ class UserNotificationAPITests(TestCase):
         self.assertEqual(resp.status_code, 200)
         data = resp.json()
         self.assertEqual(data.get('unread'), 2)
+
+    def test_cursor_pagination_walks_ties_both_ways(self):
+        from django.utils import timezone
+        for i in range(5):
+            UserNotification.objects.create(user=self.user1, title=f'N{i}', content='C')
+        # Identical timestamps force the id tie-breaker to do the work
+        UserNotification.objects.filter(user=self.user1).update(created_at=timezone.now())
+
+        self.client.force_authenticate(user=self.user1)
+        seen = []
+        url = '/api/notices/notifications/?page_size=2'
+        pages = []
+        while url:
+            data = self.client.get(url).json()
+            pages.append(data)
+            seen.extend(n['title'] for n in data['results'])
+            url = data['next']
+        self.assertEqual(seen, ['N4', 'N3', 'N2', 'N1', 'N0'])
+        self.assertNotIn('count', pages[0])
+        self.assertIsNone(pages[0]['previous'])
+
+        back = self.client.get(pages[2]['previous']).json()
+        self.assertEqual([n['title'] for n in back['results']], ['N2', 'N1'])
+
+    def test_page_number_opt_out(self):
+        UserNotification.objects.create(user=self.user1, title='T1', content='C1')
+        self.client.force_authenticate(user=self.user1)
+        data = self.client.get('/api/notices/notifications/?page=1').json()
+        self.assertEqual(data['count'], 1)
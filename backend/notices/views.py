@@ -1,6 +1,7 @@
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from backend.pagination import KeysetPagination
 from .models import NoticeCategory, Notice, NoticeRead, UserNotification
 from .serializers import NoticeCategorySerializer, NoticeSerializer, NoticeReadSerializer, UserNotificationSerializer
 
@@ -45,6 +46,8 @@ class NotificationListView(generics.ListAPIView):
     """List notifications for the authenticated user, newest first."""
     serializer_class = UserNotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         return UserNotification.objects.filter(user=self.request.user).order_by('-created_at')
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Exam, Result, AcademicYear, Semester
+from .models import Exam, ExamStatistics, Result, ResultNotificationJob, AcademicYear, Semester, SemesterAggregate
 
 
 @admin.register(AcademicYear)
@@ -29,7 +29,7 @@ class ExamAdmin(admin.ModelAdmin):
     """
     Admin interface for Exam management
     """
-    list_display = ('name', 'exam_type', 'subject', 'total_marks', 'passing_marks', 'exam_date', 'is_active')
+    list_display = ('name', 'exam_type', 'subject', 'semester', 'total_marks', 'passing_marks', 'exam_date', 'is_active')
     list_filter = ('exam_type', 'exam_date', 'is_active', 'subject')
     search_fields = ('name', 'subject__name')
     readonly_fields = ('created_at',)
@@ -51,4 +51,35 @@ class ResultAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
             'student__user', 'exam__subject'
-        )
\ No newline at end of file
+        )
+
+
+@admin.register(ExamStatistics)
+class ExamStatisticsAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the precomputed exam statistics
+    """
+    list_display = ('exam', 'count', 'mean', 'median', 'std_dev', 'pass_count', 'computed_at')
+    search_fields = ('exam__name', 'exam__subject__name')
+    readonly_fields = [f.name for f in ExamStatistics._meta.fields]
+
+
+@admin.register(SemesterAggregate)
+class SemesterAggregateAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the stored semester transcripts
+    """
+    list_display = ('student', 'semester', 'percentage', 'gpa', 'credits', 'credits_earned', 'updated_at')
+    list_filter = ('semester__academic_year', 'semester')
+    search_fields = ('student__student_id', 'student__user__first_name', 'student__user__last_name')
+    readonly_fields = [f.name for f in SemesterAggregate._meta.fields]
+
+
+@admin.register(ResultNotificationJob)
+class ResultNotificationJobAdmin(admin.ModelAdmin):
+    """
+    Queued "results approved" notification fan-outs
+    """
+    list_display = ('exam', 'approved_at', 'status', 'attempts', 'sent', 'updated_at')
+    list_filter = ('status',)
+    readonly_fields = ('exam', 'approved_at', 'attempts', 'sent', 'error', 'created_at', 'updated_at')
@@ -0,0 +1,90 @@
+"""
+Term-wide result exports.
+
+Like the attendance export, results are read as `values_list()` rows with
+`iterator()` in (student, exam) order; the wide layout pivots each
+student's results into one line with a column per exam as they stream.
+"""
+from itertools import groupby
+
+from backend.exports import chunk_size
+from .models import Exam, Result
+
+STUDENT_COLUMNS = ['student_id', 'roll_number', 'name', 'class', 'section']
+LONG_COLUMNS = ['exam', 'subject', 'exam_date', 'total_marks', 'marks_obtained', 'grade', 'status']
+
+
+DEFAULT_STATUSES = ('approved',)
+
+
+def export_queryset(filters, statuses=DEFAULT_STATUSES, published_by=None):
+    rows = Result.objects.filter(status__in=statuses or DEFAULT_STATUSES)
+    if published_by is not None:
+        rows = rows.filter(published_by=published_by)
+    if filters.class_name:
+        rows = rows.filter(student__current_class=filters.class_name)
+    if filters.section:
+        rows = rows.filter(student__current_section=filters.section)
+    if filters.subject:
+        rows = rows.filter(exam__subject_id=filters.subject)
+    if filters.start:
+        rows = rows.filter(exam__exam_date__gte=filters.start)
+    if filters.end:
+        rows = rows.filter(exam__exam_date__lte=filters.end)
+    return rows
+
+
+def _stream(queryset):
+    return queryset.order_by('student_id', 'exam_id').values_list(
+        'student_id', 'student__student_id', 'student__roll_number', 'student__user__first_name',
+        'student__user__last_name', 'student__current_class', 'student__current_section',
+        'exam_id', 'marks_obtained', 'grade', 'status',
+    ).iterator(chunk_size=chunk_size())
+
+
+def _student_cells(row):
+    return [row[1], row[2], f'{row[3]} {row[4]}'.strip(), row[5], row[6]]
+
+
+def results_table(filters, layout='wide', statuses=DEFAULT_STATUSES, published_by=None):
+    """
+    `(header, rows)` for the filtered results in the `wide` or `long` layout.
+
+    Only approved results are exported unless `statuses` lists others;
+    `published_by` limits the export to one teacher's results.
+    """
+    queryset = export_queryset(filters, statuses, published_by)
+    exams = list(
+        Exam.objects.filter(pk__in=queryset.values('exam_id'))
+        .order_by('exam_date', 'pk').values('pk', 'name', 'subject__code', 'exam_date', 'total_marks')
+    )
+    if layout == 'long':
+        by_pk = {e['pk']: e for e in exams}
+        header = STUDENT_COLUMNS + LONG_COLUMNS
+        rows = (
+            _student_cells(r) + [
+                by_pk[r[7]]['name'], by_pk[r[7]]['subject__code'], by_pk[r[7]]['exam_date'],
+                by_pk[r[7]]['total_marks'], r[8], r[9], r[10],
+            ]
+            for r in _stream(queryset)
+        )
+        return header, rows
+
+    header = STUDENT_COLUMNS + [f"{e['name']} ({e['subject__code']})" for e in exams] + ['total', 'out_of', 'percentage']
+    columns = {e['pk']: i for i, e in enumerate(exams)}
+    out_of = {e['pk']: e['total_marks'] for e in exams}
+    return header, _pivot(_stream(queryset), columns, out_of)
+
+
+def _pivot(stream, columns, out_of):
+    for _, group in groupby(stream, key=lambda r: r[0]):
+        cells = [''] * len(columns)
+        obtained = possible = 0
+        first = None
+        for row in group:
+            first = first or row
+            cells[columns[row[7]]] = row[8]
+            obtained += row[8]
+            possible += out_of[row[7]]
+        percentage = round(obtained * 100.0 / possible, 2) if possible else ''
+        yield _student_cells(first) + cells + [obtained, possible, percentage]
@@ -0,0 +1,21 @@
+"""
+Vectorized grading shared by bulk mark entry and the class ledgers.
+"""
+import numpy as np
+
+from .models import Result
+
+
+def grade_percentages(percentage, passing):
+    """Grade array for percentages; `passing` (scalar or array) is the D cut-off."""
+    percentage = np.asarray(percentage, dtype=np.float64)
+    conditions = [percentage >= minimum for minimum, _ in Result.GRADE_BANDS]
+    conditions.append(percentage >= passing)
+    grades = [grade for _, grade in Result.GRADE_BANDS] + ['D']
+    return np.select(conditions, grades, default='F')
+
+
+def compute_grades(marks, exam):
+    """Grades for an array of marks on one exam, matching `Result.calculate_grade`."""
+    percentage = np.asarray(marks, dtype=np.float64) * 100.0 / exam.total_marks
+    return grade_percentages(percentage, exam.passing_marks).tolist()
@@ -0,0 +1,174 @@
+"""
+Class mark ledgers (tabulation sheets) computed with NumPy.
+
+An exam group is every Exam of one semester sharing a name, e.g. all
+"First Term" papers across subjects; names repeat every year, so the
+semester is part of the group. The ledger puts each active student of a class/section
+against each exam of the group, read as flat columns from one
+`values_list()` query and scattered into a students × exams array. Totals,
+percentages, grades, pass/fail and per-subject summaries are derived from
+that array.
+
+Ledgers are cached per (exam group, class, section). Result writes bump
+the class's cache version and exam edits bump a global one (see
+`results.signals`), so stale sheets are never served.
+"""
+import hashlib
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import IntegerField
+from django.db.models.functions import Cast
+
+from students.models import Student
+from .grading import grade_percentages
+from .models import Exam, Result
+
+DEFAULT_STATUSES = ('approved',)
+EXAMS_VERSION_KEY = 'results_ledger_version:exams'
+
+
+def cache_timeout():
+    return getattr(settings, 'RESULTS_LEDGER_CACHE_TIMEOUT', 60 * 60)
+
+
+def _version_key(class_name, section):
+    return f"results_ledger_version:{class_name}:{section}"
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def bump_version(class_name, section):
+    """Invalidate every cached ledger of a class/section."""
+    _bump(_version_key(class_name, section))
+
+
+def bump_exams_version():
+    """Invalidate every cached ledger, after an exam is added, edited or removed."""
+    _bump(EXAMS_VERSION_KEY)
+
+
+def bump_for_students(student_ids):
+    """Invalidate the ledgers of the classes of `student_ids` (a list or a subquery)."""
+    sections = set(
+        Student.objects.filter(pk__in=student_ids).values_list('current_class', 'current_section').distinct()
+    )
+    for class_name, section in sections:
+        bump_version(class_name, section)
+
+
+def _num(value):
+    value = float(value)
+    return None if np.isnan(value) else round(value, 2)
+
+
+def latest_semester(exam_name):
+    """Semester id of the most recent exam named `exam_name` (None if it has none)."""
+    return Exam.objects.filter(name=exam_name).order_by('-exam_date', '-pk').values_list('semester_id', flat=True).first()
+
+
+def build_ledger(exam_name, semester_id, class_name, section, statuses=DEFAULT_STATUSES):
+    exams = list(
+        Exam.objects.filter(name=exam_name, semester_id=semester_id).order_by('subject__name', 'exam_date', 'pk')
+        .values('pk', 'subject_id', 'subject__name', 'subject__code', 'exam_date', 'total_marks', 'passing_marks')
+    )
+    students = list(
+        Student.objects.filter(current_class=class_name, current_section=section, is_active=True)
+        .order_by(Cast('roll_number', IntegerField()), 'student_id')
+        .values('id', 'student_id', 'roll_number', 'user__first_name', 'user__last_name')
+    )
+    rows = list(
+        Result.objects.filter(
+            exam__name=exam_name, exam__semester_id=semester_id, student__current_class=class_name, student__current_section=section,
+            student__is_active=True, status__in=statuses,
+        ).order_by().values_list('student_id', 'exam_id', 'marks_obtained')
+    )
+
+    student_ids = np.array([s['id'] for s in students], dtype=np.int64)
+    exam_ids = np.array([e['pk'] for e in exams], dtype=np.int64)
+    count = len(rows)
+    student_col = np.fromiter((r[0] for r in rows), dtype=np.int64, count=count)
+    exam_col = np.fromiter((r[1] for r in rows), dtype=np.int64, count=count)
+    marks_col = np.fromiter((r[2] for r in rows), dtype=np.float64, count=count)
+
+    # Students are in roll order and exams by subject, so map ids through sorted views
+    student_order, exam_order = np.argsort(student_ids), np.argsort(exam_ids)
+    row = student_order[np.searchsorted(student_ids[student_order], student_col)]
+    column = exam_order[np.searchsorted(exam_ids[exam_order], exam_col)]
+    marks = np.full((len(students), len(exams)), np.nan)
+    marks[row, column] = marks_col
+
+    full = np.array([e['total_marks'] for e in exams], dtype=np.float64)
+    passing = np.array([e['passing_marks'] for e in exams], dtype=np.float64)
+    entered = ~np.isnan(marks)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        percentages = marks * 100.0 / full
+        subject_grades = np.where(entered, grade_percentages(percentages, passing), '')
+        passed_subject = entered & (marks >= passing)
+        totals = np.nansum(marks, axis=1)
+        out_of = full.sum()
+        percentage = totals * 100.0 / out_of if out_of else np.full(len(students), np.nan)
+        passed = passed_subject.all(axis=1) if len(exams) else np.zeros(len(students), dtype=bool)
+        # Below the C band a student who passed every subject gets D, otherwise F
+        grades = grade_percentages(percentage, np.where(passed, 0, np.inf))
+        averages = np.where(entered, marks, 0).sum(axis=0) / entered.sum(axis=0)
+        highest = np.nanmax(np.where(entered, marks, -np.inf), axis=0, initial=-np.inf)
+
+    return {
+        'exam': exam_name,
+        'semester': semester_id,
+        'class': class_name,
+        'section': section,
+        'statuses': list(statuses),
+        'subjects': [
+            {
+                'exam': e['pk'],
+                'subject': e['subject_id'],
+                'name': e['subject__name'],
+                'code': e['subject__code'],
+                'exam_date': e['exam_date'],
+                'total_marks': e['total_marks'],
+                'passing_marks': e['passing_marks'],
+                'entered': int(entered[:, j].sum()),
+                'passed': int(passed_subject[:, j].sum()),
+                'average': _num(averages[j]),
+                'highest': _num(highest[j]) if np.isfinite(highest[j]) else None,
+            }
+            for j, e in enumerate(exams)
+        ],
+        'out_of': int(out_of),
+        'students': [
+            {
+                'id': s['id'],
+                'student_id': s['student_id'],
+                'roll_number': s['roll_number'],
+                'name': f"{s['user__first_name']} {s['user__last_name']}".strip(),
+                'marks': [_num(v) for v in marks[i]],
+                'grades': [g or None for g in subject_grades[i].tolist()],
+                'total': _num(totals[i]),
+                'percentage': _num(percentage[i]),
+                'grade': str(grades[i]),
+                'passed': bool(passed[i]),
+            }
+            for i, s in enumerate(students)
+        ],
+    }
+
+
+def class_ledger(exam_name, semester_id, class_name, section, statuses=DEFAULT_STATUSES):
+    statuses = tuple(sorted(statuses))
+    version = cache.get(_version_key(class_name, section), 1)
+    exams_version = cache.get(EXAMS_VERSION_KEY, 1)
+    group = hashlib.md5(exam_name.encode()).hexdigest()
+    key = f"results_ledger:{semester_id}:{group}:{class_name}:{section}:{','.join(statuses)}:v{version}.{exams_version}"
+    data = cache.get(key)
+    if data is None:
+        data = build_ledger(exam_name, semester_id, class_name, section, statuses)
+        cache.set(key, data, cache_timeout())
+    return data
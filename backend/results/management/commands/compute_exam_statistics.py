@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from results.models import Exam
+from results.statistics import compute_exam_statistics
+
+
+class Command(BaseCommand):
+    help = 'Recompute ranks, percentiles and stored score distributions for exams'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--exam', type=int, action='append', default=None, help='Only this exam id (repeatable)')
+
+    def handle(self, *args, **options):
+        exams = Exam.objects.all()
+        if options['exam']:
+            exams = exams.filter(pk__in=options['exam'])
+            if not exams.exists():
+                raise CommandError('No matching exams')
+        count = 0
+        for exam in exams.iterator():
+            compute_exam_statistics(exam)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Recomputed statistics for {count} exams."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from backend.exports import LAYOUTS, ExportError, ExportFilters, export_to_file
+from results.exports import results_table
+
+
+class Command(BaseCommand):
+    help = 'Export results to a CSV or XLSX file (format follows the --output extension)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', dest='path', required=True, help='Destination .csv or .xlsx file')
+        parser.add_argument('--class', dest='class_name', type=str, default=None, help='Only students of this class')
+        parser.add_argument('--section', type=str, default=None, help='Only students of this section')
+        parser.add_argument('--subject', type=int, default=None, help='Only exams of this subject id')
+        parser.add_argument('--from', dest='start', type=str, default=None, help='First exam date (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='end', type=str, default=None, help='Last exam date (YYYY-MM-DD)')
+        parser.add_argument('--status', action='append', default=None, help='Only results with this status (repeatable; default approved)')
+        parser.add_argument('--layout', choices=LAYOUTS, default='wide')
+
+    def handle(self, *args, **options):
+        try:
+            filters = ExportFilters(options['class_name'], options['section'], options['subject'], options['start'], options['end'])
+        except ExportError as e:
+            raise CommandError(str(e))
+        header, rows = results_table(filters, options['layout'], options['status'])
+        export_to_file(header, rows, options['path'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote results export to {options['path']}"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from results.models import Semester
+from results.transcripts import rebuild_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored semester aggregates behind student transcripts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', type=int, default=None, help='Only this semester id')
+
+    def handle(self, *args, **options):
+        semester = None
+        if options['semester']:
+            semester = Semester.objects.filter(pk=options['semester']).first()
+            if semester is None:
+                raise CommandError('No such semester')
+        count = rebuild_aggregates(semester)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} semester aggregates."))
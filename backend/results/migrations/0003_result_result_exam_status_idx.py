@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0002_result_approval_remarks_result_approved_at_and_more'),
+        ('students', '0007_student_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['exam', 'status', 'published_by'], name='result_exam_status_idx'),
+        ),
+    ]
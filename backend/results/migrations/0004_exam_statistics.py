@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0003_result_result_exam_status_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='result',
+            name='percentile',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='result',
+            name='rank',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ExamStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('mean', models.FloatField(blank=True, null=True)),
+                ('median', models.FloatField(blank=True, null=True)),
+                ('std_dev', models.FloatField(blank=True, null=True)),
+                ('highest', models.PositiveIntegerField(blank=True, null=True)),
+                ('lowest', models.PositiveIntegerField(blank=True, null=True)),
+                ('pass_count', models.PositiveIntegerField(default=0)),
+                ('histogram', models.JSONField(blank=True, default=list)),
+                ('top', models.JSONField(blank=True, default=list)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('exam', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='results.exam')),
+            ],
+            options={
+                'verbose_name_plural': 'Exam statistics',
+            },
+        ),
+    ]
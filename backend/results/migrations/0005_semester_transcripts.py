@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0004_exam_statistics'),
+        ('students', '0007_student_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='semester',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exams', to='results.semester'),
+        ),
+        migrations.CreateModel(
+            name='SemesterAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('marks_obtained', models.PositiveIntegerField(default=0)),
+                ('total_marks', models.PositiveIntegerField(default=0)),
+                ('percentage', models.FloatField(default=0.0)),
+                ('gpa', models.FloatField(default=0.0)),
+                ('credits', models.PositiveIntegerField(default=0)),
+                ('credits_earned', models.PositiveIntegerField(default=0)),
+                ('subjects', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('semester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aggregates', to='results.semester')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='semester_aggregates', to='students.student')),
+            ],
+            options={
+                'ordering': ['semester__start_date'],
+                'unique_together': {('student', 'semester')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0006_result_notification_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultnotificationjob',
+            name='claim',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0007_result_notification_job_claim'),
+        ('students', '0008_qr_job_claim'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['created_at', 'id'], name='result_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['published_by', 'created_at', 'id'], name='result_publisher_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['student', 'created_at', 'id'], name='result_student_created_idx'),
+        ),
+    ]
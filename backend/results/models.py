@@ -20,6 +20,7 @@ class Exam(models.Model):
     name = models.CharField(max_length=100)
     exam_type = models.CharField(max_length=20, choices=EXAM_TYPES)
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='exams')
+    semester = models.ForeignKey('Semester', on_delete=models.SET_NULL, null=True, blank=True, related_name='exams')
     total_marks = models.PositiveIntegerField()
     passing_marks = models.PositiveIntegerField()
     exam_date = models.DateField()
@@ -28,6 +29,14 @@ class Exam(models.Model):
     
     def __str__(self):
         return f"{self.name} - {self.subject.name}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Moving an exam to another semester changes two transcripts
+        if 'semester_id' in field_names:
+            instance._loaded_semester_id = instance.semester_id
+        return instance
     
     class Meta:
         ordering = ['-exam_date']
@@ -67,31 +76,59 @@ class Result(models.Model):
     approval_remarks = models.TextField(blank=True, null=True)
     published_at = models.DateTimeField(null=True, blank=True)
     approved_at = models.DateTimeField(null=True, blank=True)
+    # Position among the exam's approved results, kept by results.statistics
+    rank = models.PositiveIntegerField(null=True, blank=True)
+    percentile = models.FloatField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.student.student_id} - {self.exam.name} - {self.marks_obtained}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember whether the row counted towards the exam statistics
+        if 'status' in field_names:
+            instance._loaded_status = instance.status
+        return instance
+
+    def ranked(self):
+        """Whether this row is, or was when loaded, part of the exam's approved set."""
+        return self.status == 'approved' or getattr(self, '_loaded_status', None) == 'approved'
     
+    # Minimum percentage for each grade above D; D needs the exam's passing
+    # marks (compared against the percentage), anything lower is F
+    GRADE_BANDS = [
+        (90, 'A+'),
+        (80, 'A'),
+        (70, 'B+'),
+        (60, 'B'),
+        (50, 'C+'),
+        (40, 'C'),
+    ]
+
+    # Grade points on a 4.0 scale, used for semester GPAs
+    GRADE_POINTS = {
+        'A+': 4.0,
+        'A': 3.6,
+        'B+': 3.2,
+        'B': 2.8,
+        'C+': 2.4,
+        'C': 2.0,
+        'D': 1.6,
+        'F': 0.0,
+    }
+
     def calculate_grade(self):
         percentage = (self.marks_obtained / self.exam.total_marks) * 100
         
-        if percentage >= 90:
-            return 'A+'
-        elif percentage >= 80:
-            return 'A'
-        elif percentage >= 70:
-            return 'B+'
-        elif percentage >= 60:
-            return 'B'
-        elif percentage >= 50:
-            return 'C+'
-        elif percentage >= 40:
-            return 'C'
-        elif percentage >= self.exam.passing_marks:
+        for minimum, grade in self.GRADE_BANDS:
+            if percentage >= minimum:
+                return grade
+        if percentage >= self.exam.passing_marks:
             return 'D'
-        else:
-            return 'F'
+        return 'F'
     
     def save(self, *args, **kwargs):
         self.grade = self.calculate_grade()
@@ -100,6 +137,15 @@ class Result(models.Model):
     class Meta:
         unique_together = ['student', 'exam']
         ordering = ['-created_at']
+        indexes = [
+            # Publish and approve select an exam's results by status and publisher
+            models.Index(fields=['exam', 'status', 'published_by'], name='result_exam_status_idx'),
+            # Keyset pages of the result list, newest first; teachers and
+            # students page through their own results
+            models.Index(fields=['created_at', 'id'], name='result_created_id_idx'),
+            models.Index(fields=['published_by', 'created_at', 'id'], name='result_publisher_created_idx'),
+            models.Index(fields=['student', 'created_at', 'id'], name='result_student_created_idx'),
+        ]
 
 
 class AcademicYear(models.Model):
@@ -147,4 +193,94 @@ class Semester(models.Model):
     
     class Meta:
         unique_together = ['academic_year', 'name']
-        ordering = ['academic_year', 'name']
\ No newline at end of file
+        ordering = ['academic_year', 'name']
+
+
+class ExamStatistics(models.Model):
+    """
+    Score distribution of an exam's approved results, recomputed whenever the
+    approved set changes (see results.statistics)
+    """
+    exam = models.OneToOneField(Exam, on_delete=models.CASCADE, related_name='statistics')
+    count = models.PositiveIntegerField(default=0)
+    mean = models.FloatField(null=True, blank=True)
+    median = models.FloatField(null=True, blank=True)
+    std_dev = models.FloatField(null=True, blank=True)
+    highest = models.PositiveIntegerField(null=True, blank=True)
+    lowest = models.PositiveIntegerField(null=True, blank=True)
+    pass_count = models.PositiveIntegerField(default=0)
+    histogram = models.JSONField(default=list, blank=True)
+    top = models.JSONField(default=list, blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Statistics for {self.exam}"
+
+    class Meta:
+        verbose_name_plural = 'Exam statistics'
+
+
+class SemesterAggregate(models.Model):
+    """
+    A student's performance over one semester, maintained from approved
+    results as they change (see results.transcripts)
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='semester_aggregates')
+    semester = models.ForeignKey(Semester, on_delete=models.CASCADE, related_name='aggregates')
+    marks_obtained = models.PositiveIntegerField(default=0)
+    total_marks = models.PositiveIntegerField(default=0)
+    percentage = models.FloatField(default=0.0)
+    gpa = models.FloatField(default=0.0)
+    credits = models.PositiveIntegerField(default=0)
+    credits_earned = models.PositiveIntegerField(default=0)
+    # Per-subject breakdown: marks, percentage, grade and grade point
+    subjects = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.student.student_id} - {self.semester} - GPA {self.gpa}"
+
+    class Meta:
+        unique_together = ['student', 'semester']
+        ordering = ['semester__start_date']
+
+
+class ResultNotificationJob(models.Model):
+    """
+    Pending "results approved" notifications for one approval of an exam,
+    sent by `process_result_notifications`. The recipients are the students
+    whose results carry the job's `approved_at` timestamp.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='notification_jobs')
+    approved_at = models.DateTimeField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    # Token of the runner working on the job (see backend.jobs)
+    claim = models.CharField(max_length=32, blank=True, default='')
+    sent = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.exam} approved {self.approved_at:%Y-%m-%d %H:%M} - {self.status}"
+
+    def recipients(self):
+        """Results that were approved in this job's transition."""
+        return Result.objects.filter(exam_id=self.exam_id, status='approved', approved_at=self.approved_at)
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['exam', 'approved_at'], name='unique_result_notification_job')
+        ]
+        indexes = [
+            models.Index(fields=['status', 'id'], name='result_notify_job_status_idx'),
+        ]
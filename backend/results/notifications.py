@@ -0,0 +1,56 @@
+"""
+Background fan-out of "results approved" notifications.
+
+Approving results queues a ResultNotificationJob instead of writing one
+UserNotification per student in the request. `process_pending_jobs()`
+claims a batch of jobs (see backend.jobs) and, per job, streams the
+recipients' user ids and bulk-creates their notifications in chunks. The
+notifications commit together with the job's outcome, so a failed or
+abandoned job can be retried without sending duplicates.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from backend.jobs import claim, finish
+from notices.models import UserNotification
+from .models import Exam, ResultNotificationJob
+
+
+def fanout_batch_size():
+    return getattr(settings, 'RESULT_NOTIFICATION_BATCH_SIZE', 500)
+
+
+def fan_out(job):
+    """Create the notifications of one job; returns the number sent."""
+    exam = Exam.objects.select_related('subject').get(pk=job.exam_id)
+    title = f"Results published: {exam.name} - {exam.subject.name}"
+    content = f"Your result for {exam.name} ({exam.subject.name}) has been approved and is now available on your report card."
+    user_ids = job.recipients().order_by('student_id').values_list('student__user_id', flat=True)
+    batch_size = fanout_batch_size()
+    sent = 0
+    batch = []
+    for user_id in user_ids.iterator(chunk_size=batch_size):
+        batch.append(UserNotification(user_id=user_id, title=title, content=content, link='/student/report-card'))
+        if len(batch) >= batch_size:
+            UserNotification.objects.bulk_create(batch)
+            sent += len(batch)
+            batch = []
+    UserNotification.objects.bulk_create(batch)
+    sent += len(batch)
+    return sent
+
+
+def process_pending_jobs(batch_size=20):
+    """Send one batch of pending notification jobs and return the number processed."""
+    token, jobs = claim(ResultNotificationJob, batch_size)
+    for job in jobs:
+        try:
+            with transaction.atomic():
+                sent = fan_out(job)
+                # Notifications and the outcome commit together; a job lost to
+                # a re-claim rolls its notifications back
+                if not finish(ResultNotificationJob, token, [job.pk], 'done', sent=sent, error=''):
+                    transaction.set_rollback(True)
+        except Exception as e:
+            finish(ResultNotificationJob, token, [job.pk], 'failed', error=str(e)[:500])
+    return len(jobs)
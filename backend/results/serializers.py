@@ -37,5 +37,5 @@ class ResultSerializer(serializers.ModelSerializer):
     class Meta:
         model = Result
         fields = '__all__'
-        read_only_fields = ('published_by', 'approved_by', 'published_at', 'approved_at', 'grade')
+        read_only_fields = ('published_by', 'approved_by', 'published_at', 'approved_at', 'grade', 'rank', 'percentile')
 
@@ -0,0 +1,179 @@
+"""
+Bulk result writes and status transitions shared by the API views.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from students.cache import invalidate_public_profiles
+from students.models import Student
+from .grading import compute_grades
+from .ledger import bump_for_students, bump_version
+from .models import Exam, Result, ResultNotificationJob
+from .statistics import compute_exam_statistics
+from .transcripts import pairs_for_results, refresh_aggregates
+
+
+class BulkResultError(Exception):
+    """Raised with per-record `errors` when a bulk payload is rejected."""
+
+    def __init__(self, errors):
+        super().__init__('Invalid results')
+        self.errors = errors
+
+
+def enter_marks(exam, records, user):
+    """
+    Upsert draft results for many students of one exam in a single statement.
+
+    `records` is a list of `{'student': pk, 'marks_obtained': n, 'remarks': ...}`.
+    Results that are already published, or drafts entered by another user,
+    cannot be overwritten. The whole payload is rejected with
+    `BulkResultError` if any record is invalid.
+    """
+    errors = []
+    marks = {}
+    positions = {}
+    for index, record in enumerate(records):
+        record = record if isinstance(record, dict) else {}
+        student, obtained = record.get('student'), record.get('marks_obtained')
+        try:
+            student = int(student)
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'student': student, 'error': 'student must be a student id'})
+            continue
+        try:
+            obtained = int(obtained)
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'student': student, 'error': 'marks_obtained must be a whole number'})
+            continue
+        if not 0 <= obtained <= exam.total_marks:
+            errors.append({'index': index, 'student': student, 'error': f'marks_obtained must be between 0 and {exam.total_marks}'})
+            continue
+        if student in marks:
+            errors.append({'index': index, 'student': student, 'error': 'duplicate student'})
+            continue
+        marks[student] = (obtained, record.get('remarks') or None)
+        positions[student] = index
+
+    sections = dict(
+        (pk, (class_name, section)) for pk, class_name, section in
+        Student.objects.filter(pk__in=list(marks)).values_list('pk', 'current_class', 'current_section')
+    )
+    existing = {
+        row['student_id']: row
+        for row in Result.objects.filter(exam=exam, student_id__in=list(marks)).values('student_id', 'status', 'published_by_id')
+    }
+    for student in marks:
+        row = existing.get(student)
+        if student not in sections:
+            errors.append({'index': positions[student], 'student': student, 'error': 'unknown student'})
+        elif row and row['status'] != 'draft':
+            errors.append({'index': positions[student], 'student': student, 'error': f"result is already {row['status']}"})
+        elif row and row['published_by_id'] != user.pk:
+            errors.append({'index': positions[student], 'student': student, 'error': 'draft belongs to another user'})
+    if errors:
+        raise BulkResultError(sorted(errors, key=lambda e: e['index']))
+
+    students = sorted(marks)
+    grades = compute_grades([marks[s][0] for s in students], exam)
+    rows = [
+        Result(
+            student_id=student, exam=exam, marks_obtained=marks[student][0], remarks=marks[student][1],
+            grade=grade, status='draft', published_by=user,
+        )
+        for student, grade in zip(students, grades)
+    ]
+    # bulk_create skips signals; drafts are not part of any cached public
+    # profile, but draft ledgers must be invalidated here
+    with transaction.atomic():
+        Result.objects.bulk_create(
+            rows,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['student', 'exam'],
+            update_fields=['marks_obtained', 'grade', 'remarks', 'updated_at'],
+        )
+    for class_name, section in set(sections.values()):
+        bump_version(class_name, section)
+
+    return {
+        'exam': exam.pk,
+        'saved': len(rows),
+        'created': len(rows) - len(existing),
+        'updated': len(existing),
+        'results': [
+            {'student': r.student_id, 'marks_obtained': r.marks_obtained, 'grade': r.grade} for r in rows
+        ],
+    }
+
+
+# Status transitions. Each is one UPDATE whose row count is the result; the
+# rows it touched are found again by the timestamp it wrote, so follow-up
+# work (ledgers, statistics, transcripts, notifications) uses subqueries
+# instead of materialising student ids.
+
+def _pending(exam_id, class_name=None):
+    results = Result.objects.filter(exam_id=exam_id, status='pending_approval')
+    if class_name:
+        results = results.filter(student__current_class=class_name)
+    return results
+
+
+def publish_results(exam_id, user):
+    """Send `user`'s drafts for an exam to approval; returns the number published."""
+    now = timezone.now()
+    count = Result.objects.filter(exam_id=exam_id, published_by=user, status='draft').update(
+        status='pending_approval', published_at=now,
+    )
+    if count:
+        published = Result.objects.filter(exam_id=exam_id, published_by=user, published_at=now)
+        # The queryset update sends no signals, so profiles are dropped here
+        _invalidate_on_commit(published.values('student_id'))
+    return count
+
+
+def _invalidate_on_commit(students):
+    """Drop the ledger and public profile caches of `students` once committed."""
+    def invalidate():
+        bump_for_students(students)
+        invalidate_public_profiles('student', Student.objects.filter(pk__in=students).values_list('student_id', flat=True))
+    transaction.on_commit(invalidate)
+
+
+@transaction.atomic
+def approve_results(exam_id, user, class_name=None, remarks=''):
+    """
+    Approve an exam's pending results (of one class); returns the number approved.
+
+    Ranks, statistics and transcripts are refreshed inline, and a
+    ResultNotificationJob is queued to tell the students, all in one
+    transaction so an approval never lands without its notifications.
+    """
+    now = timezone.now()
+    count = _pending(exam_id, class_name).update(
+        status='approved', approved_by=user, approved_at=now, approval_remarks=remarks,
+    )
+    if not count:
+        return 0
+    approved = Result.objects.filter(exam_id=exam_id, status='approved', approved_at=now)
+    students = approved.values('student_id')
+
+    # Caches are dropped once the approval is visible to other requests;
+    # approved results are part of the public profile
+    _invalidate_on_commit(students)
+    exam = Exam.objects.get(pk=exam_id)
+    compute_exam_statistics(exam)
+    if exam.semester_id:
+        refresh_aggregates(pairs_for_results(approved))
+    ResultNotificationJob.objects.create(exam=exam, approved_at=now)
+    return count
+
+
+def reject_results(exam_id, class_name=None, remarks=''):
+    """Send an exam's pending results (of one class) back; returns the number rejected."""
+    count = _pending(exam_id, class_name).update(status='rejected', approval_remarks=remarks)
+    if count:
+        # Rejections carry no timestamp; every class with a rejected result
+        # of the exam covers this batch
+        bump_for_students(Result.objects.filter(exam_id=exam_id, status='rejected').values('student_id'))
+    return count
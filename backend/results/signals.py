@@ -0,0 +1,95 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from attendance.models import Subject
+from students.models import Student
+from .ledger import bump_exams_version, bump_for_students, bump_version
+from .models import Exam, Result, SemesterAggregate
+from .statistics import compute_exam_statistics
+from .transcripts import pairs_for_results, refresh_aggregates
+
+
+@receiver([post_save, post_delete], sender=Result)
+def invalidate_result_ledger(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_for_students([instance.student_id])
+
+
+@receiver(post_save, sender=Result)
+def refresh_exam_statistics(sender, instance, raw=False, **kwargs):
+    if not raw and instance.ranked():
+        compute_exam_statistics(instance.exam)
+
+
+@receiver(post_delete, sender=Result)
+def refresh_exam_statistics_after_delete(sender, instance, **kwargs):
+    if not instance.ranked():
+        return
+    exam_id = instance.exam_id
+
+    # The exam itself may be part of the same cascade, so wait for the commit
+    def refresh():
+        exam = Exam.objects.filter(pk=exam_id).first()
+        if exam is not None:
+            compute_exam_statistics(exam)
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=Exam)
+def refresh_exam_statistics_for_exam(sender, instance, created=False, raw=False, **kwargs):
+    # Passing marks and the histogram range come from the exam
+    if not raw and not created and hasattr(instance, 'statistics'):
+        compute_exam_statistics(instance)
+
+
+@receiver(post_save, sender=Result)
+def refresh_semester_aggregate(sender, instance, raw=False, **kwargs):
+    if not raw and instance.ranked() and instance.exam.semester_id:
+        refresh_aggregates([(instance.student_id, instance.exam.semester_id)])
+
+
+@receiver(post_delete, sender=Result)
+def refresh_semester_aggregate_after_delete(sender, instance, **kwargs):
+    if not instance.ranked():
+        return
+    student_id, exam_id = instance.student_id, instance.exam_id
+
+    # The exam may be deleted in the same cascade, so its semester is not
+    # known; refresh every semester the student has an aggregate for
+    def refresh():
+        semester_ids = SemesterAggregate.objects.filter(student_id=student_id).values_list('semester_id', flat=True)
+        refresh_aggregates([(student_id, semester_id) for semester_id in semester_ids])
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=Exam)
+def refresh_semester_aggregates_for_exam(sender, instance, created=False, raw=False, **kwargs):
+    # Marks, passing marks and the semester all feed the transcript
+    semesters = {instance.semester_id, getattr(instance, '_loaded_semester_id', None)} - {None}
+    if not raw and not created and semesters:
+        students = instance.results.filter(status='approved').values_list('student_id', flat=True)
+        refresh_aggregates([(student, semester) for student in students for semester in semesters])
+    instance._loaded_semester_id = instance.semester_id
+
+
+@receiver(post_save, sender=Subject)
+def refresh_semester_aggregates_for_subject(sender, instance, created=False, raw=False, **kwargs):
+    # Credits weight the subject in every GPA it is part of
+    if not raw and not created:
+        refresh_aggregates(pairs_for_results(Result.objects.filter(exam__subject=instance, status='approved')))
+
+
+@receiver([post_save, post_delete], sender=Exam)
+def invalidate_exam_ledgers(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_exams_version()
+
+
+@receiver(post_save, sender=Student)
+def invalidate_transfer_ledgers(sender, instance, created=False, raw=False, **kwargs):
+    # A transfer moves the student's marks to another class ledger
+    loaded = getattr(instance, '_loaded_section', None)
+    if not raw and not created and loaded and loaded != (instance.current_class, instance.current_section):
+        bump_version(*loaded)
+        bump_version(instance.current_class, instance.current_section)
@@ -0,0 +1,71 @@
+"""
+Precomputed rank, percentile and score distribution per exam.
+
+`compute_exam_statistics()` reads an exam's approved results once, with
+`Rank` and `PercentRank` window functions giving each row its position,
+writes the rank and percentile back onto the results with `bulk_update`,
+and stores mean, median, standard deviation, histogram and top-N (computed
+with NumPy) in ExamStatistics. It runs whenever the approved set changes,
+so the statistics endpoint only reads stored rows.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import PercentRank, Rank
+
+from .models import ExamStatistics, Result
+
+HISTOGRAM_BINS = 10
+
+
+def top_count():
+    return getattr(settings, 'EXAM_STATISTICS_TOP', 10)
+
+
+def compute_exam_statistics(exam):
+    """Recompute ranks and the stored distribution of `exam`; returns the ExamStatistics row."""
+    rows = list(
+        Result.objects.filter(exam=exam, status='approved').annotate(
+            position=Window(Rank(), order_by=F('marks_obtained').desc()),
+            below=Window(PercentRank(), order_by=F('marks_obtained').asc()),
+        ).order_by('position', 'student__roll_number').values_list(
+            'pk', 'student_id', 'student__student_id', 'student__user__first_name', 'student__user__last_name',
+            'marks_obtained', 'position', 'below', 'rank', 'percentile',
+        )
+    )
+    marks = np.fromiter((r[5] for r in rows), dtype=np.float64, count=len(rows))
+
+    values = {'count': len(rows), 'pass_count': int((marks >= exam.passing_marks).sum())}
+    if len(rows):
+        counts, edges = np.histogram(marks, bins=HISTOGRAM_BINS, range=(0, max(exam.total_marks, 1)))
+        values.update(
+            mean=round(float(marks.mean()), 2),
+            median=round(float(np.median(marks)), 2),
+            std_dev=round(float(marks.std()), 2),
+            highest=int(marks.max()),
+            lowest=int(marks.min()),
+            histogram=[
+                {'from': round(float(lo), 2), 'to': round(float(hi), 2), 'count': int(n)}
+                for lo, hi, n in zip(edges[:-1], edges[1:], counts)
+            ],
+        )
+    else:
+        values.update(mean=None, median=None, std_dev=None, highest=None, lowest=None, histogram=[])
+    values['top'] = [
+        {'student': r[1], 'student_id': r[2], 'name': f'{r[3]} {r[4]}'.strip(), 'marks': r[5], 'rank': r[6]}
+        for r in rows[:top_count()]
+    ]
+
+    # Only rows whose position moved are written back
+    changed = [
+        Result(pk=r[0], rank=r[6], percentile=round(r[7] * 100, 2))
+        for r in rows
+        if (r[6], round(r[7] * 100, 2)) != (r[8], r[9])
+    ]
+    with transaction.atomic():
+        Result.objects.bulk_update(changed, ['rank', 'percentile'], batch_size=500)
+        # Results that left the approved set lose their position
+        Result.objects.filter(exam=exam, rank__isnull=False).exclude(status='approved').update(rank=None, percentile=None)
+        statistics, _ = ExamStatistics.objects.update_or_create(exam=exam, defaults=values)
+    return statistics
@@ -1,3 +1,328 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+from accounts.models import User
+from attendance.models import Subject
+from students.cache import public_profile_key
+from students.models import Student
+from notices.models import UserNotification
+from .models import AcademicYear, Exam, ExamStatistics, Result, ResultNotificationJob, Semester, SemesterAggregate
+
+
+class ResultExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='admin', password=None, role='admin'))
+        math = Subject.objects.create(name='Mathematics', code='MATH')
+        science = Subject.objects.create(name='Science', code='SCI')
+        exams = [
+            Exam.objects.create(name='Mid Term', exam_type='mid_term', subject=subject, total_marks=50, passing_marks=20, exam_date='2025-06-01')
+            for subject in (math, science)
+        ]
+        for username, marks in (('ram', (40, 30)), ('sita', (25, None))):
+            user = User.objects.create_user(username=username, password=None, role='student', first_name=username.title())
+            student = Student.objects.create(
+                user=user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+                father_name='F', mother_name='M', guardian_contact='1', current_class='10', current_section='A',
+            )
+            for exam, mark in zip(exams, marks):
+                if mark is not None:
+                    Result.objects.create(student=student, exam=exam, marks_obtained=mark, status='approved')
+
+    def test_wide_export_has_a_column_per_exam(self):
+        resp = self.client.get('/api/results/export/', {'class': '10', 'status': 'approved'})
+        self.assertEqual(resp.status_code, 200)
+        lines = b''.join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[5:], ['Mid Term (MATH)', 'Mid Term (SCI)', 'total', 'out_of', 'percentage'])
+        self.assertEqual(lines[1].split(',')[2:], ['Ram', '10', 'A', '40', '30', '70', '100', '70.0'])
+        self.assertEqual(lines[2].split(',')[2:], ['Sita', '10', 'A', '25', '', '25', '50', '50.0'])
+
+    def test_defaults_to_approved_and_scopes_teachers(self):
+        teacher = User.objects.create_user(username='teacher', password=None, role='teacher')
+        exam = Exam.objects.get(subject__code='SCI')
+        sita = Student.objects.get(user__username='sita')
+        Result.objects.create(student=sita, exam=exam, marks_obtained=10, status='pending_approval', published_by=teacher)
+        lines = b''.join(self.client.get('/api/results/export/', {'layout': 'long'}).streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(self.client.get('/api/results/export/', {'status': 'draft'}).status_code, 400)
+
+        self.client.force_authenticate(user=teacher)
+        resp = self.client.get('/api/results/export/', {'layout': 'long', 'status': 'approved,pending_approval'})
+        lines = b''.join(resp.streaming_content).decode().splitlines()
+        self.assertEqual([line.split(',')[-1] for line in lines[1:]], ['pending_approval'])
+
+
+class BulkResultEntryTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teach', password=None, role='teacher')
+        self.client.force_authenticate(user=self.teacher)
+        subject = Subject.objects.create(name='Mathematics', code='MATH')
+        self.exam = Exam.objects.create(name='Final', exam_type='final', subject=subject, total_marks=100, passing_marks=32, exam_date='2025-06-01')
+        self.students = []
+        for i in range(4):
+            user = User.objects.create_user(username=f's{i}', password=None, role='student')
+            self.students.append(Student.objects.create(
+                user=user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+                father_name='F', mother_name='M', guardian_contact='1', current_class='10', current_section='A',
+            ))
+        self.url = f'/api/results/exams/{self.exam.pk}/results/bulk/'
+
+    def test_grades_match_single_entry(self):
+        marks = [95, 45, 35, 10]
+        records = [{'student': s.pk, 'marks_obtained': m} for s, m in zip(self.students, marks)]
+        # exam, students, existing results, and the upsert inside a savepoint
+        with self.assertNumQueries(6):
+            resp = self.client.post(self.url, {'results': records}, format='json')
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.assertEqual([r['grade'] for r in resp.data['results']], ['A+', 'C', 'D', 'F'])
+        for result in Result.objects.select_related('exam'):
+            self.assertEqual(result.grade, result.calculate_grade())
+            self.assertEqual((result.status, result.published_by), ('draft', self.teacher))
+
+        records[3]['marks_obtained'] = 60
+        resp = self.client.post(self.url, {'results': records}, format='json')
+        self.assertEqual((resp.data['created'], resp.data['updated']), (0, 4))
+        self.assertEqual(Result.objects.get(student=self.students[3]).grade, 'B')
+
+    def test_all_errors_are_reported_and_nothing_saved(self):
+        Result.objects.create(student=self.students[0], exam=self.exam, marks_obtained=50, status='approved', published_by=self.teacher)
+        resp = self.client.post(self.url, {'results': [
+            {'student': self.students[0].pk, 'marks_obtained': 70},
+            {'student': self.students[1].pk, 'marks_obtained': 101},
+            {'student': 9999, 'marks_obtained': 50},
+            {'student': self.students[2].pk, 'marks_obtained': 50},
+        ]}, format='json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual([e['index'] for e in resp.data['errors']], [0, 1, 2])
+        self.assertEqual(Result.objects.count(), 1)
+
+
+class ClassLedgerTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='teach', password=None, role='teacher'))
+        self.years = [
+            AcademicYear.objects.create(name=f'{y}-{y + 1}', start_date=f'{y}-01-01', end_date=f'{y}-12-31') for y in (2024, 2025)
+        ]
+        self.semester = Semester.objects.create(academic_year=self.years[1], name='First', start_date='2025-01-01', end_date='2025-06-30')
+        self.exams = [
+            Exam.objects.create(name='Mid Term', exam_type='mid_term', subject=Subject.objects.create(name=name, code=name[:3]),
+                                total_marks=100, passing_marks=40, exam_date='2025-06-01', semester=self.semester)
+            for name in ('English', 'Mathematics')
+        ]
+        self.students = []
+        for username, marks in (('a', (90, 80)), ('b', (35, 95)), ('c', (50, None))):
+            user = User.objects.create_user(username=username, password=None, role='student', first_name=username.upper())
+            student = Student.objects.create(
+                user=user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+                father_name='F', mother_name='M', guardian_contact='1', current_class='8', current_section='A',
+            )
+            self.students.append(student)
+            for exam, mark in zip(self.exams, marks):
+                if mark is not None:
+                    Result.objects.create(student=student, exam=exam, marks_obtained=mark, status='approved')
+        self.params = {'exam': 'Mid Term', 'semester': self.semester.pk, 'class': '8', 'section': 'A'}
+
+    def test_ledger_pivots_students_against_subjects(self):
+        resp = self.client.get('/api/results/ledger/', self.params)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([s['code'] for s in resp.data['subjects']], ['Eng', 'Mat'])
+        self.assertEqual(resp.data['subjects'][0]['passed'], 2)
+        rows = {row['name']: row for row in resp.data['students']}
+        self.assertEqual((rows['A']['total'], rows['A']['percentage'], rows['A']['grade'], rows['A']['passed']), (170, 85.0, 'A', True))
+        self.assertEqual((rows['B']['grades'], rows['B']['passed']), (['F', 'A+'], False))
+        self.assertEqual((rows['C']['marks'], rows['C']['grade'], rows['C']['passed']), ([50.0, None], 'F', False))
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/results/ledger/', self.params)
+        result = Result.objects.get(student=self.students[2], exam=self.exams[0])
+        result.marks_obtained = 60
+        result.save()
+        rows = {row['name']: row for row in self.client.get('/api/results/ledger/', self.params).data['students']}
+        self.assertEqual(rows['C']['total'], 60)
+
+    def test_same_name_in_another_year_is_a_separate_group(self):
+        semester = Semester.objects.create(academic_year=self.years[0], name='First', start_date='2024-01-01', end_date='2024-06-30')
+        old = Exam.objects.create(name='Mid Term', exam_type='mid_term', subject=self.exams[0].subject,
+                                  total_marks=50, passing_marks=20, exam_date='2024-06-01', semester=semester)
+        Result.objects.create(student=self.students[0], exam=old, marks_obtained=45, status='approved')
+
+        for params in (self.params, {k: v for k, v in self.params.items() if k != 'semester'}):
+            resp = self.client.get('/api/results/ledger/', params)
+            self.assertEqual((resp.data['semester'], resp.data['out_of']), (self.semester.pk, 200))
+        resp = self.client.get('/api/results/ledger/', {**self.params, 'semester': semester.pk})
+        self.assertEqual((resp.data['out_of'], resp.data['students'][0]['total']), (50, 45))
+
+
+class ExamStatisticsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password=None, role='admin')
+        self.client.force_authenticate(user=self.admin)
+        subject = Subject.objects.create(name='Science', code='SCI')
+        self.exam = Exam.objects.create(name='Final', exam_type='final', subject=subject, total_marks=100, passing_marks=35, exam_date='2025-06-01')
+        self.results = []
+        for i, mark in enumerate((90, 75, 75, 40, 20)):
+            user = User.objects.create_user(username=f's{i}', password=None, role='student')
+            student = Student.objects.create(
+                user=user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+                father_name='F', mother_name='M', guardian_contact='1', current_class='10', current_section='A',
+            )
+            self.results.append(Result.objects.create(student=student, exam=self.exam, marks_obtained=mark, status='pending_approval'))
+        self.url = f'/api/results/exams/{self.exam.pk}/statistics/'
+
+    def test_approval_stores_ranks_and_distribution(self):
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        resp = self.client.post('/api/results/approve/', {'exam': self.exam.pk, 'action': 'approve'}, format='json')
+        self.assertEqual(resp.status_code, 200)
+
+        with self.assertNumQueries(2):
+            resp = self.client.get(self.url, {'top': 2})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual((resp.data['count'], resp.data['mean'], resp.data['median'], resp.data['pass_count']), (5, 60.0, 75.0, 4))
+        self.assertEqual(resp.data['std_dev'], 25.88)
+        self.assertEqual([t['marks'] for t in resp.data['top']], [90, 75])
+        self.assertEqual(sum(b['count'] for b in resp.data['histogram']), 5)
+        positions = [(s['marks_obtained'], s['rank'], s['percentile']) for s in resp.data['students']]
+        self.assertEqual(positions[0], (90, 1, 100.0))
+        self.assertEqual(sorted(positions[1:3]), [(75, 2, 50.0), (75, 2, 50.0)])
+        self.assertEqual(positions[3:], [(40, 4, 25.0), (20, 5, 0.0)])
+
+        # Editing an approved result re-ranks the exam
+        low = Result.objects.get(pk=self.results[4].pk)
+        low.marks_obtained = 95
+        low.save()
+        self.assertEqual(Result.objects.get(pk=low.pk).rank, 1)
+        self.assertEqual(ExamStatistics.objects.get(exam=self.exam).highest, 95)
+
+        self.client.force_authenticate(user=low.student.user)
+        own = self.client.get(self.url).data['students']
+        self.assertEqual([(s['student_id'], s['rank']) for s in own], [(low.student_id, 1)])
+
+
+class TranscriptTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password=None, role='admin')
+        year = AcademicYear.objects.create(name='2025-2026', start_date='2025-01-01', end_date='2025-12-31')
+        self.first = Semester.objects.create(academic_year=year, name='First', start_date='2025-01-01', end_date='2025-06-30')
+        self.second = Semester.objects.create(academic_year=year, name='Second', start_date='2025-07-01', end_date='2025-12-31')
+        math = Subject.objects.create(name='Math', code='MTH', credits=4)
+        science = Subject.objects.create(name='Science', code='SCI', credits=2)
+        self.math = Exam.objects.create(name='Final', exam_type='final', subject=math, semester=self.first, total_marks=100, passing_marks=35, exam_date='2025-06-01')
+        self.science = Exam.objects.create(name='Final', exam_type='final', subject=science, semester=self.first, total_marks=100, passing_marks=35, exam_date='2025-06-02')
+        self.user = User.objects.create_user(username='s1', password=None, role='student')
+        self.student = Student.objects.create(
+            user=self.user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+            father_name='F', mother_name='M', guardian_contact='1', current_class='10', current_section='A',
+        )
+        Result.objects.create(student=self.student, exam=self.math, marks_obtained=92, status='pending_approval')
+        Result.objects.create(student=self.student, exam=self.science, marks_obtained=30, status='pending_approval')
+
+    def test_approval_builds_credit_weighted_gpa(self):
+        self.client.force_authenticate(user=self.admin)
+        self.client.post('/api/results/approve/', {'exam': self.math.pk, 'action': 'approve'}, format='json')
+        self.client.post('/api/results/approve/', {'exam': self.science.pk, 'action': 'approve'}, format='json')
+
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(2):
+            resp = self.client.get('/api/results/transcript/')
+        self.assertEqual(resp.status_code, 200)
+        semester = resp.data['semesters'][0]
+        self.assertEqual((semester['gpa'], semester['credits'], semester['credits_earned']), (2.67, 6, 4))
+        self.assertEqual([(s['code'], s['grade']) for s in semester['subjects']], [('MTH', 'A+'), ('SCI', 'F')])
+        self.assertEqual(resp.data['cumulative']['cgpa'], 2.67)
+        self.assertEqual(self.client.get(f'/api/results/transcript/{self.student.pk}/').status_code, 403)
+
+    def test_subject_grades_match_stored_grades(self):
+        exam = Exam.objects.create(name='Quiz', exam_type='unit_test', subject=self.math.subject, semester=self.second,
+                                   total_marks=50, passing_marks=20, exam_date='2025-08-01')
+        result = Result.objects.create(student=self.student, exam=exam, marks_obtained=15, status='approved')
+        self.assertEqual(result.grade, 'D')
+        aggregate = SemesterAggregate.objects.get(semester=self.second)
+        self.assertEqual(aggregate.subjects[0]['grade'], 'D')
+        self.assertEqual(aggregate.credits_earned, 4)
+
+    def test_exam_moves_and_deletes_refresh_aggregates(self):
+        Result.objects.filter(student=self.student).update(status='approved')
+        from .transcripts import rebuild_aggregates
+        self.assertEqual(rebuild_aggregates(), 1)
+
+        self.science.semester = self.second
+        self.science.save()
+        gpas = dict(SemesterAggregate.objects.values_list('semester__name', 'gpa'))
+        self.assertEqual(gpas, {'First': 4.0, 'Second': 0.0})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Result.objects.get(exam=self.science).delete()
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.get(f'/api/results/transcript/{self.student.pk}/')
+        self.assertEqual([s['name'] for s in resp.data['semesters']], ['First'])
+        self.assertEqual(resp.data['cumulative']['cgpa'], 4.0)
+
+
+class ResultWorkflowTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password=None, role='admin')
+        self.teacher = User.objects.create_user(username='teacher', password=None, role='teacher')
+        other = User.objects.create_user(username='other', password=None, role='teacher')
+        subject = Subject.objects.create(name='Science', code='SCI')
+        self.exam = Exam.objects.create(name='Final', exam_type='final', subject=subject, total_marks=100, passing_marks=35, exam_date='2025-06-01')
+        self.users = []
+        for i, class_name in enumerate(('10', '10', '9', '9')):
+            user = User.objects.create_user(username=f's{i}', password=None, role='student')
+            student = Student.objects.create(
+                user=user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+                father_name='F', mother_name='M', guardian_contact='1', current_class=class_name, current_section='A',
+            )
+            Result.objects.create(student=student, exam=self.exam, marks_obtained=50 + i, published_by=other if i == 3 else self.teacher)
+            self.users.append(user)
+
+    def test_transitions_report_affected_rows_and_queue_notifications(self):
+        self.client.force_authenticate(user=self.teacher)
+        # Cache invalidation waits for the commit
+        with self.assertNumQueries(1):
+            resp = self.client.post('/api/results/publish/', {'exam_id': self.exam.pk}, format='json')
+        self.assertEqual(resp.data['count'], 3)
+        self.assertEqual(self.client.post('/api/results/publish/', {'exam_id': self.exam.pk}, format='json').status_code, 404)
+
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.post('/api/results/approve/', {'exam': self.exam.pk, 'class': '10', 'action': 'approve'}, format='json')
+        self.assertEqual((resp.status_code, resp.data['count']), (200, 2))
+        resp = self.client.post('/api/results/approve/', {'exam': self.exam.pk, 'action': 'reject'}, format='json')
+        self.assertEqual(resp.data['count'], 1)
+        self.assertEqual(self.client.post('/api/results/approve/', {'exam': self.exam.pk, 'action': 'approve'}, format='json').status_code, 404)
+
+        job = ResultNotificationJob.objects.get()
+        self.assertEqual(job.status, 'pending')
+        self.assertFalse(UserNotification.objects.exists())
+        call_command('process_result_notifications', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.sent), ('done', 2))
+        self.assertEqual(set(UserNotification.objects.values_list('user_id', flat=True)), {self.users[0].pk, self.users[1].pk})
+
+    def test_publishing_drops_cached_profiles(self):
+        student_ids = list(Student.objects.values_list('student_id', flat=True))
+        cache.set_many({public_profile_key('student', i): {'data': {}} for i in student_ids})
+        self.client.force_authenticate(user=self.teacher)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/results/publish/', {'exam_id': self.exam.pk}, format='json')
+        # Only the other teacher's draft is still unpublished
+        kept = Student.objects.get(user=self.users[3]).student_id
+        self.assertEqual(list(cache.get_many([public_profile_key('student', i) for i in student_ids])), [public_profile_key('student', kept)])
 
-# Create your tests here.
+    def test_failed_refresh_rolls_back_approval(self):
+        Result.objects.update(status='pending_approval')
+        self.client.force_authenticate(user=self.admin)
+        with mock.patch('results.services.compute_exam_statistics', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                self.client.post('/api/results/approve/', {'exam': self.exam.pk, 'action': 'approve'}, format='json')
+        self.assertFalse(Result.objects.filter(status='approved').exists())
+        self.assertFalse(ResultNotificationJob.objects.exists())
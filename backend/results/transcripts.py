@@ -0,0 +1,166 @@
+"""
+Per-student semester aggregates behind the transcript endpoint.
+
+Exams belong to a Semester and subjects carry credits. For every
+(student, semester) with approved results, a SemesterAggregate row holds
+the marks, percentage, credit-weighted GPA and a per-subject breakdown.
+When results are approved, edited or removed, only the affected
+(student, semester) pairs are recomputed: one `values_list()` query per
+semester, aggregated with NumPy, written back with a single upsert. The
+transcript endpoint then reads these rows and never scans historical
+results.
+"""
+from collections import defaultdict
+
+import numpy as np
+from django.db import transaction
+
+from .grading import grade_percentages
+from .models import Result, SemesterAggregate
+
+RESULT_COLUMNS = (
+    'student_id', 'exam__subject_id', 'exam__subject__code', 'exam__subject__name', 'exam__subject__credits',
+    'marks_obtained', 'exam__total_marks', 'exam__passing_marks',
+)
+
+
+def pairs_for_results(results):
+    """`(student_id, semester_id)` pairs touched by a Result queryset."""
+    return set(results.filter(exam__semester__isnull=False).values_list('student_id', 'exam__semester_id').distinct())
+
+
+def refresh_aggregates(pairs):
+    """Recompute the SemesterAggregate rows of `(student_id, semester_id)` pairs."""
+    by_semester = defaultdict(set)
+    for student_id, semester_id in pairs:
+        if student_id and semester_id:
+            by_semester[semester_id].add(student_id)
+    for semester_id, student_ids in by_semester.items():
+        student_ids = sorted(student_ids)
+        for start in range(0, len(student_ids), 500):
+            _refresh_semester(semester_id, student_ids[start:start + 500])
+
+
+def rebuild_aggregates(semester=None):
+    """Recompute every aggregate (of one semester). Returns the number of stored rows."""
+    results = Result.objects.filter(status='approved')
+    aggregates = SemesterAggregate.objects.all()
+    if semester is not None:
+        results = results.filter(exam__semester=semester)
+        aggregates = aggregates.filter(semester=semester)
+    refresh_aggregates(pairs_for_results(results) | set(aggregates.values_list('student_id', 'semester_id')))
+    return aggregates.count()
+
+
+def _refresh_semester(semester_id, student_ids):
+    rows = list(
+        Result.objects.filter(status='approved', exam__semester_id=semester_id, student_id__in=student_ids)
+        .order_by().values_list(*RESULT_COLUMNS)
+    )
+    with transaction.atomic(savepoint=False):
+        aggregates = build_aggregates(semester_id, rows)
+        SemesterAggregate.objects.bulk_create(
+            aggregates,
+            update_conflicts=True,
+            unique_fields=['student', 'semester'],
+            update_fields=['marks_obtained', 'total_marks', 'percentage', 'gpa', 'credits', 'credits_earned', 'subjects', 'updated_at'],
+        )
+        # Students without approved results left in the semester
+        SemesterAggregate.objects.filter(semester_id=semester_id, student_id__in=student_ids).exclude(
+            student_id__in=[a.student_id for a in aggregates]
+        ).delete()
+
+
+def build_aggregates(semester_id, rows):
+    """Unsaved SemesterAggregate objects from `RESULT_COLUMNS` rows of one semester."""
+    if not rows:
+        return []
+    columns = list(zip(*rows))
+    student_col = np.array(columns[0], dtype=np.int64)
+    subject_col = np.array(columns[1], dtype=np.int64)
+    obtained_col = np.array(columns[5], dtype=np.float64)
+    total_col = np.array(columns[6], dtype=np.float64)
+    passing_col = np.array(columns[7], dtype=np.float64)
+
+    # One group per (student, subject): all of the subject's exams in the semester
+    pairs, group = np.unique(np.stack([student_col, subject_col], axis=1), axis=0, return_inverse=True)
+    group = group.reshape(-1)
+    obtained, total, passing = (np.bincount(group, weights=col, minlength=len(pairs)) for col in (obtained_col, total_col, passing_col))
+    exams = np.bincount(group, minlength=len(pairs))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        percentage = np.where(total > 0, obtained * 100.0 / total, 0.0)
+        # Same D rule as Result.calculate_grade: the percentage against the
+        # raw passing marks (their mean when a subject has several exams)
+        grades = grade_percentages(percentage, passing / exams)
+    points = np.array([Result.GRADE_POINTS[g] for g in grades.tolist()])
+
+    subjects = {}
+    for row in rows:
+        subjects.setdefault(row[1], (row[2], row[3], row[4]))
+    credits = np.array([subjects[int(s)][2] for s in pairs[:, 1]], dtype=np.float64)
+
+    aggregates = []
+    for student_id in np.unique(pairs[:, 0]).tolist():
+        mine = np.flatnonzero(pairs[:, 0] == student_id)
+        weight = credits[mine].sum()
+        aggregates.append(SemesterAggregate(
+            student_id=student_id,
+            semester_id=semester_id,
+            marks_obtained=int(obtained[mine].sum()),
+            total_marks=int(total[mine].sum()),
+            percentage=round(float(obtained[mine].sum() * 100.0 / total[mine].sum()), 2) if total[mine].sum() else 0.0,
+            gpa=round(float((credits[mine] * points[mine]).sum() / weight), 2) if weight else 0.0,
+            credits=int(weight),
+            credits_earned=int(credits[mine][grades[mine] != 'F'].sum()),
+            subjects=[
+                {
+                    'subject': int(pairs[i, 1]),
+                    'code': subjects[int(pairs[i, 1])][0],
+                    'name': subjects[int(pairs[i, 1])][1],
+                    'credits': int(credits[i]),
+                    'marks_obtained': int(obtained[i]),
+                    'total_marks': int(total[i]),
+                    'percentage': round(float(percentage[i]), 2),
+                    'grade': str(grades[i]),
+                    'grade_point': float(points[i]),
+                }
+                for i in sorted(mine.tolist(), key=lambda i: subjects[int(pairs[i, 1])][1])
+            ],
+        ))
+    return aggregates
+
+
+def transcript(student):
+    """Transcript payload for a student, read from the stored aggregates only."""
+    aggregates = list(SemesterAggregate.objects.filter(student=student).select_related('semester__academic_year')
+                      .order_by('semester__start_date', 'semester_id'))
+    credits = sum(a.credits for a in aggregates)
+    obtained = sum(a.marks_obtained for a in aggregates)
+    total = sum(a.total_marks for a in aggregates)
+    return {
+        'student': student.pk,
+        'student_id': student.student_id,
+        'semesters': [
+            {
+                'semester': a.semester_id,
+                'name': a.semester.name,
+                'academic_year': a.semester.academic_year.name,
+                'start_date': a.semester.start_date,
+                'end_date': a.semester.end_date,
+                'marks_obtained': a.marks_obtained,
+                'total_marks': a.total_marks,
+                'percentage': a.percentage,
+                'gpa': a.gpa,
+                'credits': a.credits,
+                'credits_earned': a.credits_earned,
+                'subjects': a.subjects,
+            }
+            for a in aggregates
+        ],
+        'cumulative': {
+            'credits': credits,
+            'credits_earned': sum(a.credits_earned for a in aggregates),
+            'cgpa': round(sum(a.gpa * a.credits for a in aggregates) / credits, 2) if credits else None,
+            'percentage': round(obtained * 100.0 / total, 2) if total else None,
+        },
+    }
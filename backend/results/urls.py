@@ -10,8 +10,14 @@ urlpatterns = [
     path('semesters/<int:pk>/', views.SemesterDetailView.as_view(), name='semester-detail'),
     path('exams/', views.ExamListCreateView.as_view(), name='exam-list-create'),
     path('exams/<int:pk>/', views.ExamDetailView.as_view(), name='exam-detail'),
+    path('exams/<int:pk>/statistics/', views.ExamStatisticsView.as_view(), name='exam-statistics'),
+    path('exams/<int:pk>/results/bulk/', views.BulkResultEntryView.as_view(), name='exam-results-bulk'),
     path('', views.ResultListCreateView.as_view(), name='result-list-create'),
     path('<int:pk>/', views.ResultDetailView.as_view(), name='result-detail'),
+    path('ledger/', views.ClassLedgerView.as_view(), name='class-ledger'),
+    path('transcript/', views.TranscriptView.as_view(), name='transcript'),
+    path('transcript/<int:student_pk>/', views.TranscriptView.as_view(), name='student-transcript'),
+    path('export/', views.ResultExportView.as_view(), name='result-export'),
     path('publish/', views.PublishResultsView.as_view(), name='publish-results'),
     path('approve/', views.ApproveResultsView.as_view(), name='approve-results'),
 ]
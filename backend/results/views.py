@@ -1,9 +1,16 @@
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.utils import timezone
+from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
-from .models import AcademicYear, Semester, Exam, Result
+from students.models import Student
+from backend.exports import ExportError, export_response, request_options
+from backend.pagination import KeysetPagination
+from .models import AcademicYear, Semester, Exam, ExamStatistics, Result
+from .exports import DEFAULT_STATUSES as EXPORT_STATUSES, results_table
+from .ledger import DEFAULT_STATUSES, class_ledger, latest_semester
+from .services import BulkResultError, approve_results, enter_marks, publish_results, reject_results
+from .transcripts import transcript
 from .serializers import AcademicYearSerializer, SemesterSerializer, ExamSerializer, ResultSerializer
 
 
@@ -47,14 +54,16 @@ class ResultListCreateView(generics.ListCreateAPIView):
     queryset = Result.objects.all()
     serializer_class = ResultSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         user = self.request.user
         # Students see only approved results
-        if hasattr(user, 'student'):
+        if user.role == 'student':
             return Result.objects.filter(student__user=user, status='approved')
         # Teachers see their own published and pending results
-        elif hasattr(user, 'teacher'):
+        elif user.role == 'teacher':
             return Result.objects.filter(published_by=user).exclude(status='draft')
         # Admins see all non-draft results
         else:
@@ -65,6 +74,125 @@ class ResultListCreateView(generics.ListCreateAPIView):
         result = serializer.save(published_by=self.request.user, status='draft')
 
 
+class BulkResultEntryView(generics.GenericAPIView):
+    """
+    Enter marks for many students of one exam in a single request.
+
+    Body: `{"results": [{"student": <pk>, "marks_obtained": 42, "remarks": ""}, ...]}`.
+    Results are saved as drafts of the requesting user; if any record is
+    invalid nothing is saved and every error is returned.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk, *args, **kwargs):
+        if request.user.role not in ('admin', 'teacher'):
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        exam = get_object_or_404(Exam, pk=pk)
+        records = request.data.get('results', [])
+        if not isinstance(records, list) or not records:
+            return Response({'detail': 'results must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            summary = enter_marks(exam, records, request.user)
+        except BulkResultError as e:
+            return Response({'detail': str(e), 'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+class ClassLedgerView(generics.GenericAPIView):
+    """
+    Tabulation sheet of one exam group for a class:
+    `?exam=<exam name>&semester=<semester id>&class=&section=`.
+
+    Every active student against every subject exam of that name in the
+    semester, with totals, percentage, grade and pass/fail. Without
+    `semester` the semester of the latest exam of that name is used. Only
+    approved results count unless `?status=` lists others (comma separated).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        if request.user.role not in ('admin', 'teacher'):
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        params = request.query_params
+        exam_name, class_name, section = params.get('exam'), params.get('class'), params.get('section')
+        if not exam_name or not class_name or not section:
+            return Response({'detail': 'exam, class and section are required'}, status=status.HTTP_400_BAD_REQUEST)
+        semester = params.get('semester')
+        if semester is not None and not semester.isdigit():
+            return Response({'detail': 'semester must be a semester id'}, status=status.HTTP_400_BAD_REQUEST)
+        statuses = [s for s in params.get('status', '').split(',') if s] or DEFAULT_STATUSES
+        valid = {value for value, _ in Result.STATUS_CHOICES}
+        if not set(statuses) <= valid:
+            return Response({'detail': f"status must be among {', '.join(sorted(valid))}"}, status=status.HTTP_400_BAD_REQUEST)
+        semester_id = int(semester) if semester is not None else latest_semester(exam_name)
+        return Response(class_ledger(exam_name, semester_id, class_name, section, statuses))
+
+
+class ExamStatisticsView(generics.GenericAPIView):
+    """
+    Stored score distribution of an exam's approved results.
+
+    Mean, median, standard deviation, histogram and top-N (`?top=`), plus
+    every student's rank and percentile for admins and teachers; students
+    only see their own position.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        statistics = ExamStatistics.objects.filter(exam_id=pk).first()
+        if statistics is None:
+            return Response({'detail': 'No approved results for this exam yet.'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            top = int(request.query_params.get('top', len(statistics.top)))
+        except ValueError:
+            return Response({'detail': 'top must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+
+        ranked = Result.objects.filter(exam_id=pk, status='approved').order_by('rank', 'student_id')
+        if request.user.role == 'student':
+            ranked = ranked.filter(student__user=request.user)
+        elif request.user.role not in ('admin', 'teacher'):
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        return Response({
+            'exam': statistics.exam_id,
+            'count': statistics.count,
+            'mean': statistics.mean,
+            'median': statistics.median,
+            'std_dev': statistics.std_dev,
+            'highest': statistics.highest,
+            'lowest': statistics.lowest,
+            'pass_count': statistics.pass_count,
+            'histogram': statistics.histogram,
+            'top': statistics.top[:max(top, 0)],
+            'computed_at': statistics.computed_at,
+            'students': list(ranked.values('student_id', 'marks_obtained', 'rank', 'percentile')),
+        })
+
+
+class TranscriptView(generics.GenericAPIView):
+    """
+    Semester-by-semester transcript with GPA and cumulative CGPA.
+
+    `transcript/` is the signed-in student's own; admins and teachers read
+    any student's at `transcript/<student_pk>/`. Served from the stored
+    semester aggregates, never from the raw results.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, student_pk=None, *args, **kwargs):
+        if student_pk is None:
+            if request.user.role != 'student':
+                return Response({'detail': 'Only students have a transcript.'}, status=status.HTTP_403_FORBIDDEN)
+            student = get_object_or_404(Student, user=request.user)
+        elif request.user.role in ('admin', 'teacher'):
+            student = get_object_or_404(Student, pk=student_pk)
+        else:
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(transcript(student))
+
+
 class ResultDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Result.objects.all()
     serializer_class = ResultSerializer
@@ -78,6 +206,34 @@ class ResultDetailView(generics.RetrieveUpdateDestroyAPIView):
         return super().update(request, *args, **kwargs)
 
 
+class ResultExportView(generics.GenericAPIView):
+    """
+    Stream results as CSV or XLSX for government reporting.
+
+    Filters: `?class=&section=&subject=<pk>&from=&to=` (exam dates) and
+    `?status=approved,pending_approval` (approved only by default; drafts are
+    never exported). Teachers only get the results they entered, as in the
+    result list. `?layout=wide` (default) gives one line per student with a
+    column per exam; `?layout=long` one line per result.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        if request.user.role not in ('admin', 'teacher'):
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            filters, output, layout = request_options(request.query_params)
+        except ExportError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        statuses = [s for s in request.query_params.get('status', '').split(',') if s] or EXPORT_STATUSES
+        valid = {value for value, _ in Result.STATUS_CHOICES} - {'draft'}
+        if not set(statuses) <= valid:
+            return Response({'detail': f"status must be among {', '.join(sorted(valid))}"}, status=status.HTTP_400_BAD_REQUEST)
+        published_by = request.user if request.user.role == 'teacher' else None
+        header, rows = results_table(filters, layout, statuses, published_by)
+        return export_response(header, rows, output, filters.filename('results'))
+
+
 class PublishResultsView(generics.GenericAPIView):
     """
     Teacher publishes results for a class/exam
@@ -90,18 +246,14 @@ class PublishResultsView(generics.GenericAPIView):
         if not exam_id:
             return Response({'detail': 'exam_id is required.'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get all draft results for this exam published by this teacher
-        results = Result.objects.filter(exam_id=exam_id, published_by=request.user, status='draft')
-        
-        if not results.exists():
+        # Move this teacher's drafts for the exam to pending_approval
+        count = publish_results(exam_id, request.user)
+        if not count:
             return Response({'detail': 'No draft results to publish.'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Update status to pending_approval
-        results.update(status='pending_approval', published_at=timezone.now())
-        
         return Response({
-            'detail': f'{results.count()} results published and pending approval',
-            'count': results.count()
+            'detail': f'{count} results published and pending approval',
+            'count': count
         }, status=status.HTTP_200_OK)
 
 
@@ -121,35 +273,18 @@ class ApproveResultsView(generics.GenericAPIView):
         if not exam_id or not action_type:
             return Response({'detail': 'exam and action are required.'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get all pending results for this exam and class
-        results = Result.objects.filter(exam_id=exam_id, status='pending_approval')
-        
-        if class_id:
-            results = results.filter(student__current_class=class_id)
-        
-        if not results.exists():
-            return Response({'detail': 'No pending results to approve.'}, status=status.HTTP_404_NOT_FOUND)
-        
         if action_type == 'approve':
-            results.update(
-                status='approved',
-                approved_by=request.user,
-                approved_at=timezone.now(),
-                approval_remarks=approval_remarks
-            )
-            return Response({
-                'detail': f'{results.count()} results approved',
-                'count': results.count()
-            }, status=status.HTTP_200_OK)
-        
+            count = approve_results(exam_id, request.user, class_id, approval_remarks)
+            verb = 'approved'
         elif action_type == 'reject':
-            results.update(
-                status='rejected',
-                approval_remarks=approval_remarks
-            )
-            return Response({
-                'detail': f'{results.count()} results rejected',
-                'count': results.count()
-            }, status=status.HTTP_200_OK)
+            count = reject_results(exam_id, class_id, approval_remarks)
+            verb = 'rejected'
+        else:
+            return Response({'detail': 'Invalid action.'}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({'detail': 'Invalid action.'}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        if not count:
+            return Response({'detail': 'No pending results to approve.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'detail': f'{count} results {verb}',
+            'count': count
+        }, status=status.HTTP_200_OK)
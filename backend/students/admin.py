@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Student
+from .models import Student, QRCodeJob
 
 
 @admin.register(Student)
@@ -32,4 +32,14 @@ class StudentAdmin(admin.ModelAdmin):
     )
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('user')
\ No newline at end of file
+        return super().get_queryset(request).select_related('user')
+
+
+@admin.register(QRCodeJob)
+class QRCodeJobAdmin(admin.ModelAdmin):
+    """
+    Admin interface for inspecting background QR rendering jobs
+    """
+    list_display = ('kind', 'object_id', 'status', 'attempts', 'updated_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('created_at', 'updated_at')
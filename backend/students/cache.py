@@ -0,0 +1,78 @@
+"""
+Cache for the public (QR-scan) student and teacher profile payloads.
+
+Entries are keyed by student_id / employee_id and carry an ETag and
+Last-Modified stamp so repeat scans can be answered with 304 Not Modified.
+Signal handlers in students.signals and teachers.signals drop entries when
+the underlying records change. Class rosters (students.roster) use the
+same entry format.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def public_profile_timeout():
+    return getattr(settings, 'PUBLIC_PROFILE_CACHE_TIMEOUT', 60 * 60)
+
+
+def public_profile_key(kind, identifier):
+    return f"public_profile:{kind}:{identifier}"
+
+
+def cached_entry(key, build, timeout):
+    """
+    Return the cached `{data, etag, last_modified}` entry under `key`, building it with `build()` on a miss.
+
+    `build` returns the payload, or None if the record does not exist
+    (misses for unknown ids are not cached).
+    """
+    entry = cache.get(key)
+    if entry is None:
+        data = build()
+        if data is None:
+            return None
+        body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+        entry = {
+            'data': data,
+            'etag': '"{}"'.format(hashlib.md5(body.encode()).hexdigest()),
+            'last_modified': int(timezone.now().timestamp()),
+        }
+        cache.set(key, entry, timeout)
+    return entry
+
+
+def get_public_profile(kind, identifier, build):
+    """Return the cached entry for a profile, building it with `build()` on a miss."""
+    return cached_entry(public_profile_key(kind, identifier), build, public_profile_timeout())
+
+
+def invalidate_public_profiles(kind, identifiers):
+    cache.delete_many([public_profile_key(kind, i) for i in identifiers if i])
+
+
+def invalidate_teacher_profiles(teacher_ids):
+    """Drop the public profiles of teachers by primary key (a list or a subquery)."""
+    from teachers.models import Teacher
+    invalidate_public_profiles('teacher', Teacher.objects.filter(pk__in=teacher_ids).values_list('employee_id', flat=True))
+
+
+def cached_entry_response(request, entry):
+    """
+    Build the response for a `cached_entry()` (a public profile, a roster),
+    honouring If-None-Match / If-Modified-Since.
+    """
+    response = get_conditional_response(request, etag=entry['etag'], last_modified=entry['last_modified'])
+    if response is None:
+        response = Response(entry['data'])
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,430 @@
+"""
+Deterministic synthetic school data for load and regression testing.
+
+`SchoolDataGenerator` fills an empty database with classes, students,
+teachers, subjects, attendance, exams and results, tasks, library issues,
+notices and notifications using `bulk_create` only. All randomness comes
+from a single seeded `random.Random`, and dates are counted from a fixed
+start date, so the same options always produce the same dataset.
+
+Bulk inserts bypass `save()` and signals, so the generator fills in the
+derived state itself: roll-number counters, attendance reports and the
+search indexes.
+"""
+import random
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Student, ClassSection, RollNumberSequence, QRCodeJob
+from .roster import invalidate_rosters
+from .search import student_index, teacher_index
+
+User = get_user_model()
+
+PRESETS = {
+    # A few hundred students, enough to exercise every endpoint locally
+    'small': {
+        'classes': 4, 'sections': 2, 'students': 30, 'teachers': 12, 'subjects': 6,
+        'days': 20, 'periods': 2, 'exams': 2, 'tasks': 2, 'books': 200, 'issues': 300,
+        'notices': 20, 'notifications': 3,
+    },
+    # 50,000 students and 10,000,000 attendance rows (50k x 100 days x 2 periods)
+    'large': {
+        'classes': 20, 'sections': 50, 'students': 50, 'teachers': 1500, 'subjects': 12,
+        'days': 100, 'periods': 2, 'exams': 2, 'tasks': 4, 'books': 20000, 'issues': 60000,
+        'notices': 500, 'notifications': 5,
+    },
+}
+
+FIRST_NAMES = [
+    'Aarav', 'Anisha', 'Bikash', 'Binita', 'Deepak', 'Gita', 'Hari', 'Ishan', 'Kiran', 'Manisha',
+    'Nabin', 'Pooja', 'Pradeep', 'Rajesh', 'Ramesh', 'Sabina', 'Sita', 'Suman', 'Sunita', 'Yuvraj',
+]
+LAST_NAMES = [
+    'Adhikari', 'BK', 'Bhandari', 'Gurung', 'KC', 'Karki', 'Magar', 'Pandey', 'Rai', 'Sharma',
+    'Shrestha', 'Tamang', 'Thapa', 'Poudel',
+]
+SUBJECT_NAMES = [
+    'Mathematics', 'Science', 'English', 'Nepali', 'Social Studies', 'Computer Science',
+    'Physics', 'Chemistry', 'Biology', 'Economics', 'Accountancy', 'Health and Physical Education',
+    'Optional Mathematics', 'Geography', 'History', 'Music',
+]
+EXAM_NAMES = ['First Terminal', 'Mid Term', 'Second Terminal', 'Final']
+EXAM_TYPES = ['unit_test', 'mid_term', 'unit_test', 'final']
+SECTION_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+ATTENDANCE_STATUSES = ['present', 'absent', 'late', 'excused']
+ATTENDANCE_WEIGHTS = [85, 8, 5, 2]
+RESULT_STATUSES = ['draft', 'published', 'pending_approval', 'approved']
+RESULT_WEIGHTS = [10, 20, 20, 50]
+
+
+def section_name(index):
+    """A, B, ... Z, then AA, AB, ... for schools with more than 26 sections."""
+    name = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        name = SECTION_LETTERS[rem] + name
+    return name
+
+
+class SchoolDataGenerator:
+    """
+    Populate the database from a preset, optionally overriding individual sizes.
+
+    Sizes are per unit: `students` per section, `sections` per class,
+    `periods` per school day, `tasks` per section, `notifications` per user.
+    """
+
+    def __init__(self, preset='small', seed=42, start_date=date(2025, 4, 1), password='TempPass123!',
+                 batch_size=5000, enqueue_qr=False, stdout=None, **sizes):
+        self.sizes = dict(PRESETS[preset])
+        self.sizes.update({k: v for k, v in sizes.items() if v is not None})
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.start_date = start_date
+        # One hash for every account; hashing 50k passwords would dominate the run
+        self.password_hash = make_password(password, salt=f'seed{seed}')
+        self.batch_size = batch_size
+        self.enqueue_qr = enqueue_qr
+        self.stdout = stdout
+        self.counts = {}
+
+    def run(self):
+        if Student.objects.exists() or User.objects.filter(username='seed_admin').exists():
+            raise ValueError('generate_school_data expects an empty database')
+
+        self.admin = User.objects.create(
+            username='seed_admin', email='seed_admin@example.com', password=self.password_hash,
+            first_name='Seed', last_name='Admin', role='admin', is_staff=True, is_superuser=True,
+        )
+        self._academic_year()
+        self._subjects()
+        self._sections()
+        self._teachers()
+        self._students()
+        self._attendance()
+        self._exams_and_results()
+        self._tasks()
+        self._library()
+        self._notices()
+        self._derived_state()
+        return self.counts
+
+    # -- helpers ---------------------------------------------------------
+
+    def _log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def _count(self, key, n):
+        self.counts[key] = self.counts.get(key, 0) + n
+
+    def _bulk(self, model, objs, key=None):
+        created = model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self._count(key or model._meta.model_name, len(created))
+        return created
+
+    def _aware(self, day, hour=9):
+        moment = datetime.combine(day, time(hour))
+        return timezone.make_aware(moment) if settings.USE_TZ else moment
+
+    def _name(self):
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+
+    def _school_days(self):
+        """The first `days` weekdays other than Saturday (the weekly holiday) from the start date."""
+        days, day = [], self.start_date
+        while len(days) < self.sizes['days']:
+            if day.weekday() != 5:
+                days.append(day)
+            day += timedelta(days=1)
+        return days
+
+    # -- generators ------------------------------------------------------
+
+    def _academic_year(self):
+        from results.models import AcademicYear, Semester
+        start = self.start_date
+        end = start.replace(year=start.year + 1) - timedelta(days=1)
+        self.academic_year = AcademicYear.objects.create(
+            name=f'{start.year}-{start.year + 1}', start_date=start, end_date=end, is_current=True,
+        )
+        middle = start + (end - start) / 2
+        self.semesters = self._bulk(Semester, [
+            Semester(academic_year=self.academic_year, name='First Semester', start_date=start, end_date=middle),
+            Semester(academic_year=self.academic_year, name='Second Semester',
+                     start_date=middle + timedelta(days=1), end_date=end),
+        ])
+
+    def _semester(self, day):
+        return next((s for s in self.semesters if s.start_date <= day <= s.end_date), None)
+
+    def _subjects(self):
+        from attendance.models import Subject
+        names = [SUBJECT_NAMES[i % len(SUBJECT_NAMES)] + (f' {i // len(SUBJECT_NAMES) + 1}' if i >= len(SUBJECT_NAMES) else '')
+                 for i in range(self.sizes['subjects'])]
+        self.subjects = self._bulk(Subject, [
+            Subject(name=name, code=f'SUB{i + 1:03d}') for i, name in enumerate(names)
+        ])
+
+    def _sections(self):
+        self.sections = self._bulk(ClassSection, [
+            ClassSection(class_name=str(c + 1), section=section_name(s))
+            for c in range(self.sizes['classes'])
+            for s in range(self.sizes['sections'])
+        ])
+
+    def _teachers(self):
+        from teachers.models import Teacher
+        departments = [d for d, _ in Teacher.DEPARTMENT_CHOICES]
+        qualifications = [q for q, _ in Teacher.QUALIFICATION_CHOICES]
+        users = []
+        for i in range(self.sizes['teachers']):
+            first, last = self._name()
+            users.append(User(
+                username=f'teacher{i + 1:05d}', email=f'teacher{i + 1:05d}@example.com', password=self.password_hash,
+                first_name=first, last_name=last, role='teacher',
+            ))
+        users = self._bulk(User, users, 'teacher_user')
+        self.teachers = self._bulk(Teacher, [
+            Teacher(
+                user=user, employee_id=f'TCH{i + 1:06d}', joining_date=self.start_date - timedelta(days=self.rng.randint(0, 3650)),
+                qualification=self.rng.choice(qualifications), department=self.rng.choice(departments),
+                experience_years=self.rng.randint(0, 30),
+            )
+            for i, user in enumerate(users)
+        ])
+        # Every section gets a class teacher, round-robin
+        through = Teacher.assigned_sections.through
+        self._bulk(through, [
+            through(teacher_id=self.teachers[i % len(self.teachers)].pk, classsection_id=section.pk)
+            for i, section in enumerate(self.sections)
+        ], 'teacher_section')
+
+    def _students(self):
+        per_section = self.sizes['students']
+        self.roster = {}
+        serial = 0
+        for section in self.sections:
+            users, profiles = [], []
+            for roll in range(1, per_section + 1):
+                serial += 1
+                first, last = self._name()
+                users.append(User(
+                    username=f'student{serial:06d}', email=f'student{serial:06d}@example.com',
+                    password=self.password_hash, first_name=first, last_name=last, role='student',
+                ))
+                profiles.append(dict(
+                    student_id=f'STU{serial:07d}', admission_number=f'ADM{serial:07d}',
+                    admission_date=self.start_date - timedelta(days=self.rng.randint(0, 1500)),
+                    date_of_birth=date(2005, 1, 1) + timedelta(days=self.rng.randint(0, 4000)),
+                    gender=self.rng.choice('MF'), blood_group=self.rng.choice([b for b, _ in Student.BLOOD_GROUP_CHOICES]),
+                    father_name=f'{self.rng.choice(FIRST_NAMES)} {last}', mother_name=f'{self.rng.choice(FIRST_NAMES)} {last}',
+                    guardian_contact=f'98{self.rng.randint(0, 99999999):08d}',
+                    current_class=section.class_name, current_section=section.section, roll_number=str(roll),
+                ))
+            with transaction.atomic():
+                users = self._bulk(User, users, 'student_user')
+                students = self._bulk(Student, [Student(user=u, **p) for u, p in zip(users, profiles)])
+            self.roster[section.pk] = [(s.pk, s.user_id) for s in students]
+        self._log(f'  {serial} students')
+
+    def _attendance(self):
+        from attendance.models import AttendanceSession, Attendance
+        periods = min(self.sizes['periods'], len(self.subjects))
+        teachers = self.teachers
+        for day_index, day in enumerate(self._school_days()):
+            sessions, marks = [], []
+            for s_index, section in enumerate(self.sections):
+                for period in range(periods):
+                    subject = self.subjects[(day_index * periods + period + s_index) % len(self.subjects)]
+                    teacher = teachers[(s_index * periods + period) % len(teachers)]
+                    sessions.append(AttendanceSession(
+                        subject=subject, date=day, period=period + 1, class_name=section.class_name,
+                        section=section.section, teacher=teacher, created_by_id=teacher.user_id,
+                    ))
+            with transaction.atomic():
+                sessions = self._bulk(AttendanceSession, sessions)
+                for session in sessions:
+                    section_pk = self._section_pk(session.class_name, session.section)
+                    statuses = self.rng.choices(ATTENDANCE_STATUSES, ATTENDANCE_WEIGHTS, k=len(self.roster[section_pk]))
+                    for (student_pk, _), status in zip(self.roster[section_pk], statuses):
+                        marks.append(Attendance(
+                            session=session, student_id=student_pk, subject_id=session.subject_id,
+                            teacher_id=session.teacher_id, date=day, status=status, marked_by_id=session.created_by_id,
+                        ))
+                    if len(marks) >= self.batch_size:
+                        self._bulk(Attendance, marks)
+                        marks = []
+                self._bulk(Attendance, marks)
+            if (day_index + 1) % 10 == 0:
+                self._log(f'  attendance: {day_index + 1} days, {self.counts.get("attendance", 0)} rows')
+
+    def _section_pk(self, class_name, section):
+        if not hasattr(self, '_section_lookup'):
+            self._section_lookup = {(s.class_name, s.section): s.pk for s in self.sections}
+        return self._section_lookup[(class_name, section)]
+
+    def _exams_and_results(self):
+        from results.models import Exam, Result
+        school_days = self._school_days()
+        exams = []
+        for e in range(self.sizes['exams']):
+            exam_day = school_days[min(len(school_days) - 1, (e + 1) * len(school_days) // (self.sizes['exams'] + 1))]
+            for subject in self.subjects:
+                exams.append(Exam(
+                    name=EXAM_NAMES[e % len(EXAM_NAMES)], exam_type=EXAM_TYPES[e % len(EXAM_TYPES)], subject=subject,
+                    semester=self._semester(exam_day), total_marks=100, passing_marks=35, exam_date=exam_day,
+                ))
+        self.exams = self._bulk(Exam, exams)
+
+        all_students = [pk for roster in self.roster.values() for pk, _ in roster]
+        for exam in self.exams:
+            published_at = self._aware(exam.exam_date + timedelta(days=7))
+            results = []
+            for student_pk in all_students:
+                status = self.rng.choices(RESULT_STATUSES, RESULT_WEIGHTS)[0]
+                result = Result(
+                    student_id=student_pk, exam=exam, marks_obtained=min(100, max(0, int(self.rng.gauss(62, 18)))),
+                    status=status,
+                    published_by=self.admin if status != 'draft' else None,
+                    published_at=published_at if status != 'draft' else None,
+                    approved_by=self.admin if status == 'approved' else None,
+                    approved_at=published_at if status == 'approved' else None,
+                )
+                result.grade = result.calculate_grade()
+                results.append(result)
+            with transaction.atomic():
+                self._bulk(Result, results)
+
+    def _tasks(self):
+        from tasks.models import Task, TaskSubmission
+        school_days = self._school_days()
+        tasks = []
+        for s_index, section in enumerate(self.sections):
+            for t in range(self.sizes['tasks']):
+                teacher = self.teachers[(s_index + t) % len(self.teachers)]
+                due = school_days[min(len(school_days) - 1, (t + 1) * len(school_days) // (self.sizes['tasks'] + 1))]
+                tasks.append(Task(
+                    title=f'Assignment {t + 1} - {section}', description='Generated task',
+                    assigned_by_id=teacher.user_id, assigned_to_class=section.class_name,
+                    assigned_to_section=section.section, due_date=self._aware(due, 23),
+                    status='active' if t == self.sizes['tasks'] - 1 else 'closed',
+                ))
+        tasks = self._bulk(Task, tasks)
+
+        submissions = []
+        for task in tasks:
+            roster = self.roster[self._section_pk(task.assigned_to_class, task.assigned_to_section)]
+            for student_pk, _ in roster:
+                roll = self.rng.random()
+                if roll < 0.15:
+                    continue
+                submitted_at = task.due_date - timedelta(hours=self.rng.randint(-24, 120))
+                is_late = submitted_at > task.due_date
+                graded = roll < 0.6
+                submissions.append(TaskSubmission(
+                    task=task, student_id=student_pk, submission_file='task_submissions/generated.pdf',
+                    submitted_at=submitted_at, is_late=is_late,
+                    status='graded' if graded else 'submitted',
+                    score=0 if is_late else (self.rng.randint(0, task.total_marks) if graded else None),
+                ))
+            if len(submissions) >= self.batch_size:
+                self._bulk(TaskSubmission, submissions)
+                submissions = []
+        self._bulk(TaskSubmission, submissions)
+
+    def _library(self):
+        from library.models import Book, BookIssue
+        categories = [c for c, _ in Book.CATEGORY_CHOICES]
+        books = []
+        for i in range(self.sizes['books']):
+            copies = self.rng.randint(1, 5)
+            first, last = self._name()
+            books.append(Book(
+                title=f'Book {i + 1:06d}', author=f'{first} {last}', isbn=f'978{i + 1:010d}',
+                category=self.rng.choice(categories), total_copies=copies, available_copies=copies,
+                publication_year=self.rng.randint(1970, 2025),
+            ))
+        books = self._bulk(Book, books)
+
+        borrowers = [pk for roster in self.roster.values() for pk, _ in roster]
+        school_days = self._school_days()
+        today = school_days[-1]
+        issues = []
+        for i in range(self.sizes['issues']):
+            issued = self.rng.choice(school_days)
+            due = issued + timedelta(days=14)
+            returned = issued + timedelta(days=self.rng.randint(1, 30)) if self.rng.random() < 0.7 else None
+            if returned is not None and returned > today:
+                returned = None
+            status = 'returned' if returned else ('overdue' if due < today else 'issued')
+            by_teacher = self.rng.random() < 0.1
+            issues.append(BookIssue(
+                book=self.rng.choice(books),
+                student_id=None if by_teacher else self.rng.choice(borrowers),
+                teacher=self.rng.choice(self.teachers) if by_teacher else None,
+                issued_by=self.admin, issued_date=issued, due_date=due, return_date=returned, status=status,
+            ))
+            if len(issues) >= self.batch_size:
+                self._bulk(BookIssue, issues)
+                issues = []
+        self._bulk(BookIssue, issues)
+
+    def _notices(self):
+        from notices.models import NoticeCategory, Notice, UserNotification
+        categories = self._bulk(NoticeCategory, [
+            NoticeCategory(name=name) for name in ('General', 'Examination', 'Holiday', 'Events')
+        ])
+        priorities = ['low', 'medium', 'high', 'urgent']
+        audiences = ['all', 'students', 'teachers']
+        self._bulk(Notice, [
+            Notice(
+                title=f'Notice {i + 1}', content='Generated notice', category=self.rng.choice(categories),
+                priority=self.rng.choice(priorities), target_audience=self.rng.choice(audiences),
+                published_by=self.admin, is_pinned=i < 3,
+            )
+            for i in range(self.sizes['notices'])
+        ])
+
+        user_ids = [user_id for roster in self.roster.values() for _, user_id in roster]
+        user_ids += [t.user_id for t in self.teachers]
+        notifications = []
+        for user_id in user_ids:
+            for n in range(self.sizes['notifications']):
+                notifications.append(UserNotification(
+                    user_id=user_id, title=f'Update {n + 1}', content='Generated notification',
+                    is_read=self.rng.random() < 0.5,
+                ))
+            if len(notifications) >= self.batch_size:
+                self._bulk(UserNotification, notifications)
+                notifications = []
+        self._bulk(UserNotification, notifications)
+
+    def _derived_state(self):
+        per_section = self.sizes['students']
+        RollNumberSequence.objects.bulk_create([
+            RollNumberSequence(class_name=section.class_name, section=section.student_section, last_value=per_section)
+            for section in self.sections
+        ], batch_size=self.batch_size)
+        from attendance.reports import rebuild_reports
+        rebuild_reports()
+        student_index.rebuild()
+        teacher_index.rebuild()
+        invalidate_rosters((s.class_name, s.section) for s in self.sections)
+        from results.statistics import compute_exam_statistics
+        for exam in self.exams:
+            compute_exam_statistics(exam)
+        from results.transcripts import rebuild_aggregates
+        rebuild_aggregates()
+        if self.enqueue_qr:
+            student_ids = [pk for roster in self.roster.values() for pk, _ in roster]
+            for start in range(0, len(student_ids), self.batch_size):
+                QRCodeJob.enqueue('student', student_ids[start:start + self.batch_size])
+            QRCodeJob.enqueue('teacher', [t.pk for t in self.teachers])
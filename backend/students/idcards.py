@@ -0,0 +1,197 @@
+"""
+Printable QR ID cards for a whole class section, as a multi-page PDF or a ZIP of PNGs.
+
+Cards are composed in a process pool from the stored QR images (rendering
+missing ones on the fly) and written out chunk by chunk, so memory use
+does not grow with the size of the section.
+"""
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.db.models import IntegerField
+from django.db.models.functions import Cast
+
+from .models import Student
+from .qr import render_qr_png
+
+CARD_SIZE = (1012, 638)             # CR80 card at 300 dpi, landscape
+PAGE_SIZE = (2480, 3508)            # A4 at 300 dpi
+PAGE_GRID = (2, 5)                  # columns, rows
+PAGE_MARGIN = 120
+CHUNK_SIZE = 64
+
+
+def default_workers():
+    return getattr(settings, 'ID_CARD_WORKERS', None) or os.cpu_count() or 1
+
+
+def section_students(class_section):
+    """Active students of a ClassSection, ordered numerically by roll number."""
+    return Student.objects.filter(
+        current_class=class_section.class_name,
+        current_section=class_section.student_section,
+        is_active=True,
+    ).select_related('user').order_by(Cast('roll_number', IntegerField()), 'student_id')
+
+
+def card_data(student):
+    """Plain-data description of a card, safe to send to a worker process."""
+    qr_path = None
+    if student.qr_code:
+        try:
+            qr_path = student.qr_code.path if os.path.exists(student.qr_code.path) else None
+        except (ValueError, NotImplementedError):
+            qr_path = None
+    return {
+        'name': student.user.get_full_name() or student.user.username,
+        'student_id': student.student_id,
+        'class': student.current_class,
+        'section': student.current_section,
+        'roll_number': student.roll_number or '',
+        'admission_number': student.admission_number,
+        'qr_path': qr_path,
+        'qr_payload': student.qr_payload(),
+    }
+
+
+def compose_card(card):
+    """Draw a single ID card and return it as PNG bytes."""
+    from PIL import Image, ImageDraw
+
+    image = Image.new('RGB', CARD_SIZE, 'white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, CARD_SIZE[0], 110], fill=(25, 70, 140))
+    draw.text((40, 30), 'STUDENT ID CARD', fill='white', font=_font(48))
+
+    lines = [
+        (card['name'], 44),
+        (f"ID: {card['student_id']}", 32),
+        (f"Class: {card['class']}  Section: {card['section']}", 32),
+        (f"Roll No: {card['roll_number']}", 32),
+        (f"Admission No: {card['admission_number']}", 28),
+    ]
+    y = 150
+    for text, size in lines:
+        draw.text((40, y), text, fill='black', font=_font(size))
+        y += size + 28
+
+    if card['qr_path']:
+        qr = Image.open(card['qr_path'])
+    else:
+        qr = Image.open(BytesIO(render_qr_png(card['qr_payload'])))
+    qr = qr.convert('RGB').resize((360, 360))
+    image.paste(qr, (CARD_SIZE[0] - 400, 180))
+
+    buffer = BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _font(size):
+    from PIL import ImageFont
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 only ships a fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+def iter_cards(students, workers=1):
+    """Yield `(card, png_bytes)` in roll order, composing CHUNK_SIZE cards at a time."""
+    workers = workers or default_workers()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        chunk = []
+        for student in students.iterator(chunk_size=CHUNK_SIZE):
+            chunk.append(card_data(student))
+            if len(chunk) >= CHUNK_SIZE:
+                yield from _compose_chunk(chunk, pool)
+                chunk = []
+        if chunk:
+            yield from _compose_chunk(chunk, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _compose_chunk(chunk, pool):
+    pngs = pool.map(compose_card, chunk) if pool is not None else map(compose_card, chunk)
+    return zip(chunk, pngs)
+
+
+def write_zip(students, fileobj, workers=1):
+    """Write one PNG per card into a ZIP archive; returns the number of cards."""
+    count = 0
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for card, png in iter_cards(students, workers):
+            archive.writestr(f"{card['roll_number'] or 'x'}_{card['student_id']}.png", png)
+            count += 1
+    return count
+
+
+def write_pdf(students, path, workers=1):
+    """
+    Write cards to a multi-page A4 PDF at `path`, appending one page at a time.
+
+    Returns the number of cards written.
+    """
+    from PIL import Image
+
+    columns, rows = PAGE_GRID
+    per_page = columns * rows
+    cell_w = (PAGE_SIZE[0] - 2 * PAGE_MARGIN) // columns
+    cell_h = (PAGE_SIZE[1] - 2 * PAGE_MARGIN) // rows
+    scale = min((cell_w - 40) / CARD_SIZE[0], (cell_h - 40) / CARD_SIZE[1])
+    card_size = (int(CARD_SIZE[0] * scale), int(CARD_SIZE[1] * scale))
+
+    count = 0
+    pages = 0
+    page = None
+    for card, png in iter_cards(students, workers):
+        slot = count % per_page
+        if slot == 0:
+            if page is not None:
+                _append_page(page, path, pages)
+                pages += 1
+            page = Image.new('RGB', PAGE_SIZE, 'white')
+        x = PAGE_MARGIN + (slot % columns) * cell_w + 20
+        y = PAGE_MARGIN + (slot // columns) * cell_h + 20
+        page.paste(Image.open(BytesIO(png)).resize(card_size), (x, y))
+        count += 1
+    if page is None:
+        page = Image.new('RGB', PAGE_SIZE, 'white')
+    _append_page(page, path, pages)
+    return count
+
+
+def _append_page(page, path, existing_pages):
+    page.save(path, 'PDF', resolution=300.0, append=existing_pages > 0)
+
+
+def build_sheet(class_section, output='pdf', workers=None):
+    """
+    Render the section's cards into a temporary file and return `(file, filename, content_type)`.
+
+    The returned file is open for reading and deleted when closed.
+    """
+    students = section_students(class_section)
+    base = f"id_cards_{class_section.class_name}{class_section.section or ''}"
+    if output == 'zip':
+        tmp = tempfile.TemporaryFile()
+        write_zip(students, tmp, workers)
+        tmp.seek(0)
+        return tmp, f"{base}.zip", 'application/zip'
+
+    fd, path = tempfile.mkstemp(suffix='.pdf')
+    os.close(fd)
+    try:
+        write_pdf(students, path, workers)
+        tmp = open(path, 'rb')
+    finally:
+        # The open handle keeps the data readable on POSIX after unlinking
+        os.unlink(path)
+    return tmp, f"{base}.pdf", 'application/pdf'
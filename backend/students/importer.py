@@ -0,0 +1,376 @@
+"""
+Bulk student admission import from CSV/XLSX files.
+
+Rows are streamed from the file, validated in batches and written with
+`bulk_create` inside one transaction per batch. Password hashing is spread
+over a process pool and QR rendering is left to the background runner.
+"""
+import csv
+import io
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_date
+
+from accounts.models import User
+from .models import Student, RollNumberSequence, QRCodeJob
+from .roster import invalidate_rosters
+from .search import student_index
+
+REQUIRED_COLUMNS = [
+    'username', 'email', 'first_name', 'last_name',
+    'admission_date', 'date_of_birth', 'gender',
+    'father_name', 'mother_name', 'guardian_contact',
+    'current_class', 'current_section',
+]
+OPTIONAL_COLUMNS = ['password', 'phone', 'blood_group', 'roll_number', 'student_id', 'admission_number']
+
+# bulk_create skips field validation; every column is run through the
+# clean() of the model field it is stored in (max_length, choices, validators)
+USER_COLUMNS = ['username', 'email', 'first_name', 'last_name', 'phone']
+MODEL_FIELDS = {
+    column: (User if column in USER_COLUMNS else Student)._meta.get_field(column)
+    for column in REQUIRED_COLUMNS + OPTIONAL_COLUMNS if column != 'password'
+}
+
+GENDERS = {code for code, _ in Student.GENDER_CHOICES}
+BLOOD_GROUPS = {code for code, _ in Student.BLOOD_GROUP_CHOICES}
+
+
+class ImportFileError(Exception):
+    """Raised when the uploaded file cannot be read as a student sheet."""
+
+
+def default_workers():
+    return getattr(settings, 'STUDENT_IMPORT_WORKERS', None) or os.cpu_count() or 1
+
+
+def iter_rows(fileobj, filename):
+    """
+    Yield `(row_number, row_dict)` pairs from a CSV or XLSX file without loading it all.
+    """
+    name = (filename or '').lower()
+    if name.endswith('.xlsx'):
+        rows = _iter_xlsx(fileobj)
+    elif name.endswith('.csv') or not name:
+        rows = _iter_csv(fileobj)
+    else:
+        raise ImportFileError('Unsupported file type; upload a .csv or .xlsx file.')
+
+    header = None
+    for row_number, values in rows:
+        if header is None:
+            header = [_normalize_header(v) for v in values]
+            missing = [c for c in REQUIRED_COLUMNS if c not in header]
+            if missing:
+                raise ImportFileError(f"Missing columns: {', '.join(missing)}")
+            continue
+        if not any(v not in (None, '') for v in values):
+            continue
+        yield row_number, {
+            key: _clean(value) for key, value in zip(header, values) if key
+        }
+    if header is None:
+        raise ImportFileError('The file is empty.')
+
+
+def _iter_csv(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    try:
+        for row_number, values in enumerate(csv.reader(text), start=1):
+            yield row_number, values
+    finally:
+        text.detach()
+
+
+def _iter_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError('XLSX import requires openpyxl; upload a .csv file instead.')
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        for row_number, values in enumerate(sheet.iter_rows(values_only=True), start=1):
+            yield row_number, list(values)
+    finally:
+        workbook.close()
+
+
+def _normalize_header(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'date') and callable(value.date):
+        # openpyxl returns datetimes for date cells
+        return value.date().isoformat()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _hash_password(raw_password):
+    return make_password(raw_password)
+
+
+def _init_worker():
+    # Worker processes started with "spawn" need the app registry loaded
+    import django
+    django.setup()
+
+
+class StudentImporter:
+    """
+    Validate and create students from an iterable of `(row_number, row_dict)` pairs.
+
+    `run()` returns a report with the number of created rows and the errors
+    found for each rejected row.
+    """
+
+    def __init__(self, batch_size=500, workers=None, dry_run=False):
+        self.batch_size = batch_size
+        self.workers = default_workers() if workers is None else max(1, workers)
+        self.dry_run = dry_run
+        self.created = 0
+        self.total = 0
+        self.errors = []
+        self._pool = None
+        self._seen_usernames = set()
+        self._seen_emails = set()
+        self._seen_ids = set()
+        self._seen_admissions = set()
+        self._seen_rolls = set()
+
+    def run(self, rows):
+        try:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._process_batch(batch)
+                    batch = []
+            if batch:
+                self._process_batch(batch)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+        return self.report()
+
+    def report(self):
+        return {
+            'total': self.total,
+            'created': self.created,
+            'failed': len(self.errors),
+            'dry_run': self.dry_run,
+            'errors': self.errors,
+        }
+
+    def _process_batch(self, batch):
+        self.total += len(batch)
+        valid = []
+        for row_number, row in batch:
+            errors = self._validate_row(row)
+            if errors:
+                self.errors.append({'row': row_number, 'errors': errors})
+            else:
+                valid.append((row_number, row))
+
+        valid = self._check_database_conflicts(valid)
+        if not valid:
+            return
+        if self.dry_run:
+            self.created += len(valid)
+            return
+
+        try:
+            with transaction.atomic():
+                self._assign_roll_numbers(valid)
+                passwords = self._hash_passwords([row.get('password') for _, row in valid])
+                users = User.objects.bulk_create([
+                    User(
+                        username=row['username'],
+                        email=row['email'],
+                        first_name=row['first_name'],
+                        last_name=row['last_name'],
+                        phone=row.get('phone') or None,
+                        role='student',
+                        password=password,
+                    )
+                    for (_, row), password in zip(valid, passwords)
+                ])
+                students = Student.objects.bulk_create([
+                    self._build_student(row, user) for (_, row), user in zip(valid, users)
+                ])
+                QRCodeJob.enqueue('student', [s.pk for s in students])
+                student_index.update(students)
+                invalidate_rosters({(s.current_class, s.current_section) for s in students})
+        except IntegrityError as e:
+            for row_number, _ in valid:
+                self.errors.append({'row': row_number, 'errors': {'detail': f'Batch rejected by the database: {e}'}})
+            return
+        self.created += len(valid)
+
+    def _validate_row(self, row):
+        errors = {}
+        for column in REQUIRED_COLUMNS:
+            if not row.get(column):
+                errors[column] = 'This field is required.'
+
+        if row.get('email'):
+            try:
+                validate_email(row['email'])
+            except ValidationError:
+                errors['email'] = 'Enter a valid email address.'
+        for column in ('admission_date', 'date_of_birth'):
+            if row.get(column):
+                try:
+                    valid_date = parse_date(row[column])
+                except ValueError:
+                    valid_date = None
+                if valid_date is None:
+                    errors[column] = 'Use the YYYY-MM-DD date format.'
+        if row.get('gender') and row['gender'] not in GENDERS:
+            errors['gender'] = f"Must be one of {', '.join(sorted(GENDERS))}."
+        if row.get('blood_group') and row['blood_group'] not in BLOOD_GROUPS:
+            errors['blood_group'] = 'Invalid blood group.'
+        if row.get('roll_number') and not row['roll_number'].isdigit():
+            errors['roll_number'] = 'Roll number must be numeric.'
+        if row.get('password') and len(row['password']) < 8:
+            errors['password'] = 'Password must be at least 8 characters.'
+        for column, field in MODEL_FIELDS.items():
+            if row.get(column) and column not in errors:
+                try:
+                    field.clean(row[column], None)
+                except ValidationError as e:
+                    errors[column] = ' '.join(e.messages)
+        if errors:
+            return errors
+
+        # Duplicates inside the file itself
+        username, email = row['username'].lower(), row['email'].lower()
+        if username in self._seen_usernames:
+            errors['username'] = 'Duplicate username in file.'
+        if email in self._seen_emails:
+            errors['email'] = 'Duplicate email in file.'
+        if row.get('student_id') and row['student_id'] in self._seen_ids:
+            errors['student_id'] = 'Duplicate student_id in file.'
+        if row.get('admission_number') and row['admission_number'] in self._seen_admissions:
+            errors['admission_number'] = 'Duplicate admission number in file.'
+        roll_key = (row['current_class'], row['current_section'], row.get('roll_number'))
+        if row.get('roll_number') and roll_key in self._seen_rolls:
+            errors['roll_number'] = 'Duplicate roll number for this class and section in file.'
+        if not errors:
+            self._seen_usernames.add(username)
+            self._seen_emails.add(email)
+            if row.get('student_id'):
+                self._seen_ids.add(row['student_id'])
+            if row.get('admission_number'):
+                self._seen_admissions.add(row['admission_number'])
+            if row.get('roll_number'):
+                self._seen_rolls.add(roll_key)
+        return errors
+
+    def _check_database_conflicts(self, valid):
+        """Reject rows that clash with existing records, using one query per kind of key."""
+        if not valid:
+            return valid
+        usernames = {row['username'] for _, row in valid}
+        emails = {row['email'] for _, row in valid}
+        student_ids = {row['student_id'] for _, row in valid if row.get('student_id')}
+        admission_numbers = {row['admission_number'] for _, row in valid if row.get('admission_number')}
+
+        taken_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        taken_emails = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+        taken_ids = set(Student.objects.filter(student_id__in=student_ids).values_list('student_id', flat=True)) if student_ids else set()
+        taken_admissions = set(
+            Student.objects.filter(admission_number__in=admission_numbers).values_list('admission_number', flat=True)
+        ) if admission_numbers else set()
+
+        rolls_by_section = {}
+        for _, row in valid:
+            if row.get('roll_number'):
+                rolls_by_section.setdefault((row['current_class'], row['current_section']), set()).add(row['roll_number'])
+        taken_rolls = set()
+        for (class_name, section), rolls in rolls_by_section.items():
+            taken_rolls.update(
+                (class_name, section, roll) for roll in Student.objects.filter(
+                    current_class=class_name, current_section=section, roll_number__in=rolls
+                ).values_list('roll_number', flat=True)
+            )
+
+        accepted = []
+        for row_number, row in valid:
+            errors = {}
+            if row['username'] in taken_usernames:
+                errors['username'] = 'A user with that username already exists.'
+            if row['email'] in taken_emails:
+                errors['email'] = 'A user with that email already exists.'
+            if row.get('student_id') in taken_ids:
+                errors['student_id'] = 'A student with that student_id already exists.'
+            if row.get('admission_number') in taken_admissions:
+                errors['admission_number'] = 'A student with that admission number already exists.'
+            if (row['current_class'], row['current_section'], row.get('roll_number')) in taken_rolls:
+                errors['roll_number'] = 'Roll number already taken in this class and section.'
+            if errors:
+                self.errors.append({'row': row_number, 'errors': errors})
+            else:
+                accepted.append((row_number, row))
+        return accepted
+
+    def _assign_roll_numbers(self, valid):
+        """Fill blank roll numbers from one reserved block per class+section."""
+        pending = {}
+        explicit = {}
+        for _, row in valid:
+            key = (row['current_class'], row['current_section'])
+            if row.get('roll_number'):
+                explicit[key] = max(explicit.get(key, 0), int(row['roll_number']))
+            else:
+                pending.setdefault(key, []).append(row)
+        for key, highest in explicit.items():
+            if key not in pending:
+                RollNumberSequence.observe(*key, highest)
+        for (class_name, section), rows in pending.items():
+            block = RollNumberSequence.allocate(class_name, section, count=len(rows), floor=explicit.get((class_name, section), 0))
+            for row, roll in zip(rows, block):
+                row['roll_number'] = str(roll)
+
+    def _hash_passwords(self, raw_passwords):
+        """Hash the given passwords; rows without one get an unusable password until reset."""
+        to_hash = [p for p in raw_passwords if p]
+        if self.workers > 1 and len(to_hash) > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            hashed = iter(self._pool.map(_hash_password, to_hash, chunksize=8))
+        else:
+            hashed = iter([_hash_password(p) for p in to_hash])
+        return [next(hashed) if p else make_password(None) for p in raw_passwords]
+
+    @staticmethod
+    def _build_student(row, user):
+        return Student(
+            user=user,
+            student_id=row.get('student_id') or f"STU{str(uuid.uuid4())[:8].upper()}",
+            admission_number=row.get('admission_number') or f"ADM{str(uuid.uuid4())[:8].upper()}",
+            admission_date=parse_date(row['admission_date']),
+            date_of_birth=parse_date(row['date_of_birth']),
+            gender=row['gender'],
+            blood_group=row.get('blood_group') or None,
+            father_name=row['father_name'],
+            mother_name=row['mother_name'],
+            guardian_contact=row['guardian_contact'],
+            current_class=row['current_class'],
+            current_section=row['current_section'],
+            roll_number=row['roll_number'],
+        )
@@ -0,0 +1,55 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from students.datagen import PRESETS, SchoolDataGenerator
+
+
+class Command(BaseCommand):
+    help = 'Populate an empty database with a deterministic synthetic school for load and regression testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=sorted(PRESETS), default='small',
+                            help='Base sizes; "large" is 50k students and 10M attendance rows')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed gives the same data')
+        parser.add_argument('--start-date', type=date.fromisoformat, default=date(2025, 4, 1),
+                            help='First school day (YYYY-MM-DD)')
+        parser.add_argument('--password', type=str, default='TempPass123!', help='Password shared by every generated account')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert')
+        parser.add_argument('--enqueue-qr', action='store_true', help='Queue QR rendering jobs for every student and teacher')
+        sizes = parser.add_argument_group('sizes (override the preset)')
+        sizes.add_argument('--classes', type=int)
+        sizes.add_argument('--sections', type=int, help='Sections per class')
+        sizes.add_argument('--students', type=int, help='Students per section')
+        sizes.add_argument('--teachers', type=int)
+        sizes.add_argument('--subjects', type=int)
+        sizes.add_argument('--days', type=int, help='School days of attendance')
+        sizes.add_argument('--periods', type=int, help='Attendance sessions per section per day')
+        sizes.add_argument('--exams', type=int, help='Exam rounds; each covers every subject')
+        sizes.add_argument('--tasks', type=int, help='Tasks per section')
+        sizes.add_argument('--books', type=int)
+        sizes.add_argument('--issues', type=int, help='Library issues')
+        sizes.add_argument('--notices', type=int)
+        sizes.add_argument('--notifications', type=int, help='Notifications per student and teacher')
+
+    def handle(self, *args, **options):
+        size_keys = PRESETS['small'].keys()
+        generator = SchoolDataGenerator(
+            preset=options['preset'],
+            seed=options['seed'],
+            start_date=options['start_date'],
+            password=options['password'],
+            batch_size=options['batch_size'],
+            enqueue_qr=options['enqueue_qr'],
+            stdout=self.stdout,
+            **{key: options[key] for key in size_keys},
+        )
+        started = time.monotonic()
+        try:
+            counts = generator.run()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for key, value in sorted(counts.items()):
+            self.stdout.write(f" - {key}: {value}")
+        self.stdout.write(self.style.SUCCESS(f"Generated school data in {time.monotonic() - started:.1f}s."))
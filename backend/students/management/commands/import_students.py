@@ -0,0 +1,41 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from students.importer import StudentImporter, ImportFileError, iter_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk-admit students from a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Path to a .csv or .xlsx file with one student per row')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows validated and inserted per transaction')
+        parser.add_argument('--workers', type=int, default=None, help='Processes used for password hashing (default: CPU count)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; do not create anything')
+        parser.add_argument('--report', type=str, default=None, help='Write the per-row error report as JSON to this path')
+
+    def handle(self, *args, **options):
+        importer = StudentImporter(
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+        )
+        try:
+            with open(options['path'], 'rb') as f:
+                report = importer.run(iter_rows(f, options['path']))
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+
+        if options['report']:
+            with open(options['report'], 'w') as out:
+                json.dump(report, out, indent=2)
+
+        for entry in report['errors'][:20]:
+            self.stdout.write(f" - row {entry['row']}: {entry['errors']}")
+        if len(report['errors']) > 20:
+            self.stdout.write(f" ... and {len(report['errors']) - 20} more")
+
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {report['created']} of {report['total']} students."))
+        if report['failed']:
+            self.stdout.write(self.style.WARNING(f"{report['failed']} rows rejected."))
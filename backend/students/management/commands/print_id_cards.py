@@ -0,0 +1,28 @@
+import shutil
+
+from django.core.management.base import BaseCommand, CommandError
+from students.idcards import build_sheet
+from students.models import ClassSection
+
+
+class Command(BaseCommand):
+    help = 'Render printable QR ID cards for a whole class section as a PDF or ZIP'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--class', dest='class_name', required=True, help='Class name, e.g. 12')
+        parser.add_argument('--section', type=str, default=None, help='Section, e.g. A')
+        parser.add_argument('--format', dest='output', choices=['pdf', 'zip'], default='pdf')
+        parser.add_argument('--output', dest='path', type=str, default=None, help='Destination file (default: ./<generated name>)')
+        parser.add_argument('--workers', type=int, default=None, help='Processes used to compose cards (default: CPU count)')
+
+    def handle(self, *args, **options):
+        try:
+            class_section = ClassSection.objects.get(class_name=options['class_name'], section=options['section'])
+        except ClassSection.DoesNotExist:
+            raise CommandError(f"No class section {options['class_name']} {options['section'] or ''}".strip())
+
+        fileobj, filename, _ = build_sheet(class_section, options['output'], options['workers'])
+        path = options['path'] or filename
+        with fileobj, open(path, 'wb') as out:
+            shutil.copyfileobj(fileobj, out)
+        self.stdout.write(self.style.SUCCESS(f"Wrote ID cards for {class_section} to {path}"))
@@ -0,0 +1,41 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from students.models import QRCodeJob
+from students.qr import process_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Render pending student/teacher QR code images in the background'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of render processes')
+        parser.add_argument('--batch-size', type=int, default=200, help='Jobs claimed per batch')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new jobs instead of exiting when the queue is empty')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep between polls when looping')
+        parser.add_argument('--retry-failed', action='store_true', help='Re-queue failed jobs before starting')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        batch_size = options['batch_size']
+
+        if options['retry_failed']:
+            requeued = QRCodeJob.objects.filter(status='failed').update(status='pending', attempts=0)
+            self.stdout.write(f"Re-queued {requeued} failed jobs")
+
+        total = 0
+        while True:
+            processed = process_pending_jobs(batch_size=batch_size, workers=workers)
+            total += processed
+            if processed:
+                self.stdout.write(f"Processed {processed} jobs ({total} total)")
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        failed = QRCodeJob.objects.filter(status='failed').count()
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} jobs failed; rerun with --retry-failed"))
+        self.stdout.write(self.style.SUCCESS(f"Done. Processed {total} jobs."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from students.search import student_index, teacher_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the student and teacher full-text search indexes from scratch'
+
+    def handle(self, *args, **options):
+        if not student_index.available():
+            self.stdout.write(self.style.WARNING('Full-text indexes are only maintained on SQLite; nothing to do.'))
+            return
+        for index in (student_index, teacher_index):
+            index.rebuild()
+            self.stdout.write(f"Rebuilt {index.table}")
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -1,6 +1,7 @@
+import json
+
 from django.core.management.base import BaseCommand
-from students.models import Student
-from django.db import transaction
+from students.renumber import plan_renumber, apply_plan
 
 class Command(BaseCommand):
     help = 'Normalize and renumber roll numbers per class+section starting from 1'
@@ -8,25 +9,28 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--dry-run', action='store_true', help='Do not save changes; only show what would change')
         parser.add_argument('--order-by', type=str, default='created_at', help='Field to order students by when assigning rolls')
+        parser.add_argument('--class', dest='class_name', type=str, default=None, help='Only renumber this class')
+        parser.add_argument('--section', type=str, default=None, help='Only renumber this section')
+        parser.add_argument('--json', action='store_true', help='Print the diff as JSON instead of text')
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
-        order_by = options['order_by']
+        plan = plan_renumber(
+            order_by=options['order_by'],
+            class_name=options['class_name'],
+            section=options['section'],
+        )
+        total_changed = sum(len(entry['changes']) for entry in plan)
+
+        if not dry_run:
+            apply_plan(plan)
 
-        groups = {}
-        for s in Student.objects.all().order_by('current_class','current_section', order_by):
-            key = (s.current_class, s.current_section)
-            groups.setdefault(key, []).append(s)
+        if options['json']:
+            self.stdout.write(json.dumps({'dry_run': dry_run, 'total_changes': total_changed, 'sections': plan}, indent=2))
+            return
 
-        total_changed = 0
-        for (cls, sec), students in groups.items():
-            self.stdout.write(f"Renumbering class {cls} section {sec} ({len(students)} students)")
-            for idx, s in enumerate(students, start=1):
-                new_roll = str(idx)
-                if s.roll_number != new_roll:
-                    self.stdout.write(f" - {s.user.username}: {s.roll_number} -> {new_roll}")
-                    if not dry_run:
-                        s.roll_number = new_roll
-                        s.save()
-                    total_changed += 1
-        self.stdout.write(self.style.SUCCESS(f"Done. Total changes: {total_changed}"))
\ No newline at end of file
+        for entry in plan:
+            self.stdout.write(f"Renumbering class {entry['class']} section {entry['section']} ({entry['count']} students)")
+            for change in entry['changes']:
+                self.stdout.write(f" - {change['username']}: {change['old']} -> {change['new']}")
+        self.stdout.write(self.style.SUCCESS(f"Done. Total changes: {total_changed}"))
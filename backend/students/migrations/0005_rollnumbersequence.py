@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0004_classsection'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollNumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_value', models.PositiveIntegerField(default=0)),
+                ('class_section', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='roll_sequence', to='students.classsection')),
+            ],
+        ),
+    ]
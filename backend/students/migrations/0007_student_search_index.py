@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from students.search import student_index
+    with schema_editor.connection.cursor() as cursor:
+        student_index.create(cursor)
+        cursor.execute(student_index._insert_sql(student_index.source_sql))
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from students.search import student_index
+    with schema_editor.connection.cursor() as cursor:
+        student_index.drop(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0006_qrcodejob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0007_student_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='qrcodejob',
+            name='claim',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+def copy_sections(apps, schema_editor):
+    RollNumberSequence = apps.get_model('students', 'RollNumberSequence')
+    kept = {}
+    for sequence in RollNumberSequence.objects.select_related('class_section').order_by('-last_value', 'pk'):
+        key = (sequence.class_section.class_name, sequence.class_section.section or '')
+        if key in kept:
+            # '' and None sections had separate counters; keep the higher one
+            sequence.delete()
+            continue
+        kept[key] = sequence
+        sequence.class_name, sequence.section = key
+        sequence.save(update_fields=['class_name', 'section'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0008_qr_job_claim'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rollnumbersequence',
+            name='class_name',
+            field=models.CharField(default='', max_length=20),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='rollnumbersequence',
+            name='section',
+            field=models.CharField(blank=True, default='', max_length=10),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_sections, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='rollnumbersequence',
+            name='class_section',
+        ),
+        migrations.AlterUniqueTogether(
+            name='rollnumbersequence',
+            unique_together={('class_name', 'section')},
+        ),
+    ]
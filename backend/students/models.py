@@ -1,10 +1,9 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, IntegerField, Max
+from django.db.models.functions import Cast, Greatest
 from django.contrib.auth import get_user_model
-from django.core.validators import RegexValidator
-import qrcode
-from io import BytesIO
 from django.core.files.base import ContentFile
-from PIL import Image
+from django.core.validators import RegexValidator
 import uuid
 
 User = get_user_model()
@@ -67,6 +66,19 @@ class Student(models.Model):
     
     def __str__(self):
         return f"{self.student_id} - {self.user.get_full_name()}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the enrollment so a transfer invalidates the old roster too
+        if 'current_class' in field_names and 'current_section' in field_names:
+            instance._loaded_section = (instance.current_class, instance.current_section)
+        # and a new student_id drops the profile cached under the old one
+        if 'student_id' in field_names:
+            instance._loaded_student_id = instance.student_id
+        if 'roll_number' in field_names:
+            instance._loaded_roll_number = instance.roll_number
+        return instance
     
     def save(self, *args, **kwargs):
         # Assign student_id if missing
@@ -79,73 +91,36 @@ class Student(models.Model):
 
         # Auto-assign roll_number within class+section if not provided
         if not self.roll_number:
-            try:
-                qs = Student.objects.filter(current_class=self.current_class, current_section=self.current_section)
-                if self.pk:
-                    qs = qs.exclude(pk=self.pk)
-                max_roll = 0
-                for s in qs.exclude(roll_number__isnull=True).exclude(roll_number=''):
-                    try:
-                        r = int(s.roll_number)
-                    except Exception:
-                        continue
-                    if r > max_roll:
-                        max_roll = r
-                self.roll_number = str(max_roll + 1)
-            except Exception:
-                # If anything goes wrong, fall back to '1'
-                self.roll_number = '1'
-
-        # Generate QR code if not exists
-        if not self.qr_code:
-            self.generate_qr_code()
+            self.roll_number = str(RollNumberSequence.allocate(self.current_class, self.current_section)[0])
+        elif self._state.adding or (
+            getattr(self, '_loaded_roll_number', None), getattr(self, '_loaded_section', None)
+        ) != (self.roll_number, (self.current_class, self.current_section)):
+            # Keep the section counter ahead of explicitly chosen roll numbers,
+            # on admission as well as on edits and transfers
+            RollNumberSequence.observe(self.current_class, self.current_section, self.roll_number)
 
+        adding = self._state.adding
         super().save(*args, **kwargs)
-    
+
+        # QR images are rendered by the background runner (see students.qr)
+        if adding and not self.qr_code:
+            QRCodeJob.enqueue('student', [self.pk])
+
+    def qr_identifier(self):
+        return self.student_id
+
+    def qr_payload(self):
+        """Text encoded in the QR image: a link to the public profile page."""
+        from .qr import profile_url
+        return profile_url('student', self.student_id)
+
     def generate_qr_code(self):
         """
-        Generate QR code for the student containing their basic information
+        Render the QR code image for the student (without saving the model)
         """
-        qr_data = {
-            'student_id': self.student_id,
-            'name': self.user.get_full_name(),
-            'class': self.current_class,
-            'section': self.current_section,
-            'roll_number': self.roll_number,
-            'admission_number': self.admission_number,
-        }
-        
-        # Create QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        
-        # Encode profile URL (prefer linking to frontend profile page)
-        try:
-            from django.conf import settings
-            profile_url = f"{getattr(settings, 'FRONTEND_URL', '').rstrip('/')}" + f"/public/student/{self.student_id}"
-            qr_payload = profile_url
-        except Exception:
-            # fallback to original data string
-            qr_payload = "|".join([f"{k}:{v}" for k, v in qr_data.items()])
-
-        qr.add_data(qr_payload)
-        qr.make(fit=True)
-        
-        # Create image
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Save to BytesIO
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        
-        # Save to model
+        from .qr import render_qr_png
         filename = f"qr_{self.student_id}.png"
-        self.qr_code.save(filename, ContentFile(buffer.getvalue()), save=False)
+        self.qr_code.save(filename, ContentFile(render_qr_png(self.qr_payload())), save=False)
     
     def get_qr_code_data(self):
         """
@@ -216,4 +191,130 @@ class ClassSection(models.Model):
         ordering = ['class_name', 'section']
 
     def __str__(self):
-        return f"{self.class_name}{(' ' + self.section) if self.section else ''}"
\ No newline at end of file
+        return f"{self.class_name}{(' ' + self.section) if self.section else ''}"
+
+    @property
+    def student_section(self):
+        """The section as stored on Student.current_section, where no section is ''."""
+        return self.section or ''
+
+
+class RollNumberSequence(models.Model):
+    """
+    Per class-section counter used to hand out roll numbers in constant time.
+
+    Keyed by the class and section as stored on Student, where no section is
+    '' (a None section is folded into it), so admissions never need a
+    ClassSection row.
+    """
+    class_name = models.CharField(max_length=20)
+    section = models.CharField(max_length=10, blank=True)
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['class_name', 'section']
+
+    def __str__(self):
+        return f"{self.class_name}{(' ' + self.section) if self.section else ''} - {self.last_value}"
+
+    @classmethod
+    def allocate(cls, class_name, section, count=1, floor=0):
+        """
+        Reserve `count` consecutive roll numbers for a class+section and return them as a range.
+
+        Numbers start above `floor`, which lets callers skip rolls they are about to assign by hand.
+
+        The counter is bumped with a single UPDATE, so concurrent admissions
+        serialize on the sequence row instead of racing on the unique constraint.
+        """
+        if count < 1:
+            raise ValueError('count must be at least 1')
+        section = section or ''
+        with transaction.atomic():
+            sequence, _ = cls.objects.get_or_create(
+                class_name=class_name, section=section,
+                defaults={'last_value': cls._highest_roll(class_name, section)},
+            )
+            # The UPDATE takes the row lock before we read the new value back
+            cls.objects.filter(pk=sequence.pk).update(last_value=Greatest(F('last_value'), floor) + count)
+            last_value = cls.objects.filter(pk=sequence.pk).values_list('last_value', flat=True).get()
+        return range(last_value - count + 1, last_value + 1)
+
+    @classmethod
+    def observe(cls, class_name, section, roll_number):
+        """Move the counter past a roll number that was assigned by hand."""
+        try:
+            value = int(roll_number)
+        except (TypeError, ValueError):
+            return
+        cls.objects.filter(class_name=class_name, section=section or '', last_value__lt=value).update(last_value=value)
+
+    @classmethod
+    def reset(cls, class_name, section, last_value):
+        """Set the counter for a class+section, e.g. after renumbering."""
+        cls.objects.update_or_create(class_name=class_name, section=section or '', defaults={'last_value': last_value})
+
+    @staticmethod
+    def _highest_roll(class_name, section):
+        # One-off seed for sections that existed before the counter did
+        return Student.objects.filter(
+            current_class=class_name,
+            current_section=section,
+            roll_number__regex=r'^[0-9]+$',
+        ).aggregate(highest=Max(Cast('roll_number', IntegerField())))['highest'] or 0
+
+
+class QRCodeJob(models.Model):
+    """
+    Pending QR image render for a student or teacher, processed by `process_qr_jobs`.
+    """
+    KIND_CHOICES = [
+        ('student', 'Student'),
+        ('teacher', 'Teacher'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    # Token of the runner working on the job (see backend.jobs)
+    claim = models.CharField(max_length=32, blank=True, default='')
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} - {self.status}"
+
+    @staticmethod
+    def kind_for(obj):
+        return obj._meta.model_name
+
+    @classmethod
+    def enqueue(cls, kind, object_ids):
+        """Queue (or re-queue) QR rendering for the given records in one statement."""
+        jobs = [cls(kind=kind, object_id=object_id) for object_id in object_ids]
+        if not jobs:
+            return
+        cls.objects.bulk_create(
+            jobs,
+            update_conflicts=True,
+            unique_fields=['kind', 'object_id'],
+            update_fields=['status', 'attempts', 'claim', 'error', 'updated_at'],
+        )
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_qr_job_per_object')
+        ]
+        indexes = [
+            models.Index(fields=['status', 'id'], name='qr_job_status_idx'),
+        ]
@@ -0,0 +1,127 @@
+"""
+QR code rendering and the background job runner for student/teacher QR images.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from backend.jobs import claim, finish
+
+
+def profile_url(kind, identifier):
+    """Frontend URL encoded in the QR image for a student or teacher."""
+    return f"{getattr(settings, 'FRONTEND_URL', '').rstrip('/')}/public/{kind}/{identifier}"
+
+
+def render_qr_png(payload):
+    """
+    Render a QR code for `payload` and return the PNG bytes.
+
+    Kept free of ORM access so it can run inside a worker process.
+    """
+    import qrcode
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def qr_models():
+    """Map QRCodeJob kinds to the models that own a `qr_code` field."""
+    from teachers.models import Teacher
+    from .models import Student
+    return {'student': Student, 'teacher': Teacher}
+
+
+def store_qr_png(obj, png):
+    """Attach rendered PNG bytes to `obj.qr_code` without a full model save."""
+    from .cache import invalidate_public_profiles
+    previous = obj.qr_code.name
+    obj.qr_code.save(f"qr_{obj.qr_identifier()}.png", ContentFile(png), save=False)
+    type(obj).objects.filter(pk=obj.pk).update(qr_code=obj.qr_code.name)
+    # A re-render (e.g. after renumbering) replaces the image; drop the old file
+    if previous and previous != obj.qr_code.name:
+        obj.qr_code.storage.delete(previous)
+    invalidate_public_profiles(obj._meta.model_name, [obj.qr_identifier()])
+
+
+def ensure_qr_code(obj):
+    """
+    Make sure `obj` has a QR image, rendering it inline if the background job has not run yet.
+    """
+    if obj.qr_code:
+        return obj.qr_code
+    from .models import QRCodeJob
+    store_qr_png(obj, render_qr_png(obj.qr_payload()))
+    QRCodeJob.objects.filter(kind=QRCodeJob.kind_for(obj), object_id=obj.pk).update(
+        status='done', error='', updated_at=timezone.now()
+    )
+    return obj.qr_code
+
+
+def process_pending_jobs(batch_size=100, workers=1):
+    """
+    Render one batch of pending QR jobs and return the number of jobs processed.
+
+    Rendering is spread over a process pool when `workers` > 1; files and
+    rows are written from the calling process.
+    """
+    from .models import QRCodeJob
+
+    token, jobs = claim(QRCodeJob, batch_size)
+    if not jobs:
+        return 0
+
+    models = qr_models()
+    targets = []
+    for kind, model in models.items():
+        ids = [job.object_id for job in jobs if job.kind == kind]
+        targets.extend(model.objects.filter(pk__in=ids))
+    by_key = {(QRCodeJob.kind_for(obj), obj.pk): obj for obj in targets}
+
+    rendered = _render_all([obj.qr_payload() for obj in targets], workers)
+    png_by_key = dict(zip(by_key.keys(), rendered))
+
+    done = []
+    for job in jobs:
+        key = (job.kind, job.object_id)
+        png = png_by_key.get(key)
+        if key not in by_key:
+            finish(QRCodeJob, token, [job.pk], 'failed', error='Record no longer exists')
+        elif png is None:
+            finish(QRCodeJob, token, [job.pk], 'failed', error='Rendering failed')
+        else:
+            try:
+                store_qr_png(by_key[key], png)
+                done.append(job.pk)
+            except Exception as exc:
+                finish(QRCodeJob, token, [job.pk], 'failed', error=str(exc)[:500])
+    finish(QRCodeJob, token, done, 'done', error='')
+    return len(jobs)
+
+
+def _render_all(payloads, workers):
+    if workers > 1 and len(payloads) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_render_or_none, payloads, chunksize=16))
+    return [_render_or_none(p) for p in payloads]
+
+
+def _render_or_none(payload):
+    try:
+        return render_qr_png(payload)
+    except Exception:
+        return None
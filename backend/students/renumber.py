@@ -0,0 +1,73 @@
+"""
+Roll-number renumbering engine used by the `renumber_rolls` command.
+
+The new assignment for every class+section is computed in memory from a
+single `values_list` query, then applied with two `bulk_update` passes per
+section: changed rows first move to temporary non-numeric rolls, then to
+their final numbers, so `unique_roll_per_section` never sees a collision.
+"""
+from itertools import groupby
+
+from django.db import transaction
+
+from .cache import invalidate_public_profiles
+from .models import Student, RollNumberSequence, QRCodeJob
+from .roster import invalidate_rosters
+from .search import student_index
+
+
+def plan_renumber(order_by='created_at', class_name=None, section=None):
+    """
+    Return the renumbering plan as a list of per-section dicts.
+
+    Each dict has `class`, `section`, `count` and `changes`, where every
+    change is `{'id', 'student_id', 'username', 'old', 'new'}`.
+    """
+    qs = Student.objects.all()
+    if class_name:
+        qs = qs.filter(current_class=class_name)
+    if section:
+        qs = qs.filter(current_section=section)
+    rows = qs.order_by('current_class', 'current_section', order_by, 'pk').values_list(
+        'pk', 'current_class', 'current_section', 'roll_number', 'student_id', 'user__username'
+    )
+
+    plan = []
+    for (cls, sec), members in groupby(rows, key=lambda r: (r[1], r[2])):
+        members = list(members)
+        changes = [
+            {'id': pk, 'student_id': student_id, 'username': username, 'old': roll, 'new': str(idx)}
+            for idx, (pk, _, _, roll, student_id, username) in enumerate(members, start=1)
+            if roll != str(idx)
+        ]
+        plan.append({'class': cls, 'section': sec, 'count': len(members), 'changes': changes})
+    return plan
+
+
+def apply_plan(plan):
+    """Apply a plan from `plan_renumber` and return the ids of the students that changed."""
+    changed_ids = []
+    changed_codes = []
+    for entry in plan:
+        changes = entry['changes']
+        with transaction.atomic():
+            if changes:
+                # Phase 1: park changed rows on unique placeholder rolls
+                Student.objects.bulk_update(
+                    [Student(pk=c['id'], roll_number=f"t{c['id']}") for c in changes], ['roll_number'], batch_size=500
+                )
+                # Phase 2: move them to their final numbers
+                Student.objects.bulk_update(
+                    [Student(pk=c['id'], roll_number=c['new']) for c in changes], ['roll_number'], batch_size=500
+                )
+            RollNumberSequence.reset(entry['class'], entry['section'], entry['count'])
+        changed_ids.extend(c['id'] for c in changes)
+        changed_codes.extend(c['student_id'] for c in changes)
+
+    if changed_ids:
+        QRCodeJob.enqueue('student', changed_ids)
+        invalidate_public_profiles('student', changed_codes)
+        invalidate_rosters({(entry['class'], entry['section']) for entry in plan if entry['changes']})
+        for start in range(0, len(changed_ids), 500):
+            student_index.update(Student.objects.select_related('user').filter(pk__in=changed_ids[start:start + 500]))
+    return changed_ids
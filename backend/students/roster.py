@@ -0,0 +1,92 @@
+"""
+Cached class rosters for attendance taking.
+
+A roster is the id, roll number, name and photo thumbnail of every active
+student of a ClassSection, sorted numerically by roll, read in one
+`values()` query. Entries are cached per class/section in the same
+ETag-carrying format as the public profiles, so the start-of-period fetch
+by every teacher is usually a cache hit or a 304. Signal handlers in
+students.signals, and the bulk importer and renumbering, drop entries when
+enrollment changes.
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import IntegerField
+from django.db.models.functions import Cast
+from PIL import Image, UnidentifiedImageError
+
+from .cache import cached_entry
+from .models import Student
+
+THUMBNAIL_DIR = 'student_profiles/thumbs'
+
+
+def roster_timeout():
+    return getattr(settings, 'ROSTER_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def thumbnail_size():
+    return getattr(settings, 'ROSTER_THUMBNAIL_SIZE', 96)
+
+
+def roster_key(class_name, section):
+    return f"class_roster:{class_name}:{section or ''}"
+
+
+def invalidate_rosters(sections):
+    """Drop the cached rosters of `(class_name, section)` pairs."""
+    cache.delete_many({roster_key(class_name, section) for class_name, section in sections if class_name})
+
+
+def thumbnail_url(name):
+    """URL of a square JPEG thumbnail of a stored picture, rendering it on first use."""
+    if not name:
+        return None
+    size = thumbnail_size()
+    stem = os.path.splitext(os.path.basename(name))[0]
+    thumb = f"{THUMBNAIL_DIR}/{stem}_{size}.jpg"
+    if not default_storage.exists(thumb):
+        try:
+            with default_storage.open(name) as source, Image.open(source) as image:
+                image = image.convert('RGB')
+                image.thumbnail((size, size))
+                out = BytesIO()
+                image.save(out, 'JPEG', quality=85)
+        except (OSError, UnidentifiedImageError):
+            return None
+        thumb = default_storage.save(thumb, ContentFile(out.getvalue()))
+    return default_storage.url(thumb)
+
+
+def build_roster(class_section):
+    students = Student.objects.filter(
+        current_class=class_section.class_name, current_section=class_section.student_section, is_active=True,
+    ).order_by(Cast('roll_number', IntegerField()), 'student_id').values(
+        'id', 'student_id', 'roll_number', 'user__first_name', 'user__last_name', 'profile_picture',
+    )
+    return {
+        'section': {'id': class_section.pk, 'class': class_section.class_name, 'section': class_section.section},
+        'students': [
+            {
+                'id': s['id'],
+                'student_id': s['student_id'],
+                'roll_number': s['roll_number'],
+                'name': f"{s['user__first_name']} {s['user__last_name']}".strip(),
+                'thumbnail': thumbnail_url(s['profile_picture']),
+            }
+            for s in students
+        ],
+    }
+
+
+def get_roster(class_section):
+    return cached_entry(
+        roster_key(class_section.class_name, class_section.section),
+        lambda: build_roster(class_section),
+        roster_timeout(),
+    )
@@ -0,0 +1,136 @@
+"""
+SQLite FTS5 search indexes for students and teachers.
+
+Each index is a standalone FTS5 table keyed by the model's primary key (the
+FTS rowid) using the trigram tokenizer, so substring queries of three or
+more characters are answered from the index and ranked with bm25.
+Indexes are kept in sync through signals (see students.signals); bulk
+writes that bypass signals call `update()` themselves.
+"""
+from django.db import connection
+
+
+class SearchIndex:
+    """
+    An FTS5 table mirroring a few text columns of a model.
+
+    `source_sql` selects `(rowid, <columns>)` for every row to index and
+    `document(obj)` returns the column values for a single instance.
+    """
+
+    def __init__(self, table, columns, weights, source_sql, document):
+        self.table = table
+        self.columns = columns
+        self.weights = weights
+        self.source_sql = source_sql
+        self.document = document
+
+    @staticmethod
+    def available():
+        return connection.vendor == 'sqlite'
+
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+            f"USING fts5({', '.join(self.columns)}, tokenize='trigram')"
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def rebuild(self):
+        """Re-index every row from the source tables."""
+        if not self.available():
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(self._insert_sql(self.source_sql))
+
+    def update(self, objs):
+        """Insert or replace the documents for the given instances."""
+        objs = [obj for obj in objs if obj.pk is not None]
+        if not objs or not self.available():
+            return
+        placeholders = ', '.join(['%s'] * (len(self.columns) + 1))
+        with connection.cursor() as cursor:
+            self._delete(cursor, [obj.pk for obj in objs])
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, {', '.join(self.columns)}) VALUES ({placeholders})",
+                [[obj.pk] + [str(v or '') for v in self.document(obj)] for obj in objs],
+            )
+
+    def remove(self, pks):
+        if not pks or not self.available():
+            return
+        with connection.cursor() as cursor:
+            self._delete(cursor, pks)
+
+    def filter(self, queryset, query):
+        """
+        Restrict `queryset` to rows matching `query`, best matches first.
+
+        Returns None when the index cannot answer the query (non-SQLite
+        database, or no term long enough for trigram matching); callers
+        then fall back to a plain `icontains` filter.
+        """
+        expression = self.match_expression(query)
+        if expression is None or not self.available():
+            return None
+        model_table = queryset.model._meta.db_table
+        weights = ', '.join(str(w) for w in self.weights)
+        return queryset.extra(
+            tables=[self.table],
+            where=[f'{self.table}.rowid = {model_table}.id', f'{self.table} MATCH %s'],
+            params=[expression],
+            select={'search_rank': f'bm25({self.table}, {weights})'},
+            order_by=['search_rank'],
+        )
+
+    @staticmethod
+    def match_expression(query):
+        """Quote each term as an FTS5 phrase; trigram matching needs at least three characters."""
+        terms = [t for t in (query or '').split() if len(t) >= 3]
+        if not terms:
+            return None
+        return ' '.join('"{}"'.format(t.replace('"', '""')) for t in terms)
+
+    def _delete(self, cursor, pks):
+        for start in range(0, len(pks), 500):
+            chunk = list(pks[start:start + 500])
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})", chunk
+            )
+
+    def _insert_sql(self, select_sql):
+        return f"INSERT INTO {self.table} (rowid, {', '.join(self.columns)}) {select_sql}"
+
+
+student_index = SearchIndex(
+    table='students_student_fts',
+    columns=['name', 'username', 'student_id', 'class_name', 'roll_number'],
+    weights=[5.0, 5.0, 10.0, 1.0, 1.0],
+    source_sql=(
+        "SELECT s.id, u.first_name || ' ' || u.last_name, u.username, s.student_id, "
+        "s.current_class || ' ' || s.current_section, COALESCE(s.roll_number, '') "
+        "FROM students_student s JOIN auth_user u ON u.id = s.user_id"
+    ),
+    document=lambda s: [
+        f"{s.user.first_name} {s.user.last_name}", s.user.username, s.student_id,
+        f"{s.current_class} {s.current_section}", s.roll_number,
+    ],
+)
+
+teacher_index = SearchIndex(
+    table='teachers_teacher_fts',
+    columns=['name', 'username', 'employee_id', 'department', 'designation'],
+    weights=[5.0, 5.0, 10.0, 1.0, 1.0],
+    source_sql=(
+        "SELECT t.id, u.first_name || ' ' || u.last_name, u.username, t.employee_id, "
+        "t.department, t.designation "
+        "FROM teachers_teacher t JOIN auth_user u ON u.id = t.user_id"
+    ),
+    document=lambda t: [
+        f"{t.user.first_name} {t.user.last_name}", t.user.username, t.employee_id,
+        t.department, t.designation,
+    ],
+)
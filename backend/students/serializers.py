@@ -105,6 +105,26 @@ class StudentSerializer(serializers.ModelSerializer):
             return None
 
 
+class StudentListSerializer(StudentSerializer):
+    """
+    Lightweight serializer for student listings and search results.
+
+    Leaves out the QR payload (borrowed books and recent results), which costs
+    extra queries per row; it stays available on the detail and QR endpoints.
+    """
+    qr_code_data = None
+
+    class Meta(StudentSerializer.Meta):
+        fields = [
+            'id', 'student_id', 'admission_number', 'admission_date',
+            'user', 'user_details', 'date_of_birth', 'gender', 'blood_group',
+            'father_name', 'mother_name', 'guardian_contact',
+            'current_class', 'current_section', 'roll_number', 'qr_code', 'qr_code_url',
+            'profile_picture', 'profile_picture_url',
+            'is_active', 'created_at', 'updated_at'
+        ]
+
+
 from django.db import IntegrityError, transaction
 
 class StudentCreateSerializer(serializers.ModelSerializer):
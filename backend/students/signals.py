@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_public_profiles
+from .models import Student
+from .roster import invalidate_rosters
+from .search import student_index
+
+# Only these user fields feed the search index
+INDEXED_USER_FIELDS = {'first_name', 'last_name', 'username'}
+
+
+@receiver(post_save, sender=Student)
+def index_student(sender, instance, raw=False, **kwargs):
+    if not raw:
+        student_index.update([instance])
+
+
+@receiver(post_delete, sender=Student)
+def unindex_student(sender, instance, **kwargs):
+    student_index.remove([instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reindex_student_user(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    if raw or created or instance.role != 'student':
+        return
+    if update_fields is not None and not INDEXED_USER_FIELDS.intersection(update_fields):
+        return
+    student = Student.objects.filter(user=instance).select_related('user').first()
+    if student is not None:
+        student_index.update([student])
+
+
+def student_codes(pks):
+    """Map Student primary keys to the student_id codes used as cache keys."""
+    return list(Student.objects.filter(pk__in=[pk for pk in pks if pk]).values_list('student_id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Student)
+def invalidate_student_profile(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_public_profiles('student', [instance.student_id, getattr(instance, '_loaded_student_id', None)])
+
+
+@receiver([post_save, post_delete], sender=Student)
+def invalidate_student_roster(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_rosters({
+            (instance.current_class, instance.current_section),
+            getattr(instance, '_loaded_section', (None, None)),
+        })
+
+
+@receiver([post_save, post_delete], sender='library.BookIssue')
+@receiver([post_save, post_delete], sender='results.Result')
+def invalidate_student_profile_for_related(sender, instance, raw=False, **kwargs):
+    # Borrowed books and recent results are part of the public payload
+    if not raw and instance.student_id:
+        invalidate_public_profiles('student', student_codes([instance.student_id]))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_student_profile_for_user(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    if raw or created or instance.role != 'student':
+        return
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    students = list(Student.objects.filter(user=instance).values_list('student_id', 'current_class', 'current_section'))
+    invalidate_public_profiles('student', [code for code, _, _ in students])
+    # Names are shown on the class roster
+    invalidate_rosters({(class_name, section) for _, class_name, section in students})
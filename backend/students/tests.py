@@ -1,9 +1,33 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+import zipfile
+from io import BytesIO, StringIO
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
 from rest_framework.test import APIClient
-from .models import Student
+from .models import Student, ClassSection, RollNumberSequence, QRCodeJob
+from .qr import process_pending_jobs
+from .datagen import SchoolDataGenerator
+from .search import student_index
+from attendance.models import Attendance
+from results.models import Result
 
 User = get_user_model()
+# Rendered QR codes, photos and uploads of every test land here
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
 
 class ResetPasswordAPITest(TestCase):
     def setUp(self):
@@ -41,3 +65,459 @@ class ResetPasswordAPITest(TestCase):
         self.client.force_authenticate(user=self.student_user)
         resp = self.client.post(f'/api/students/{self.student.id}/reset-password/')
         self.assertEqual(resp.status_code, 403)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class StudentListQueryCountTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='adminpass', role='admin')
+        self.client.force_authenticate(user=self.admin)
+
+    def _create_students(self, count, offset=0):
+        for i in range(offset, offset + count):
+            user = User.objects.create_user(username=f'stud{i}', password='pass', role='student')
+            Student.objects.create(
+                user=user, student_id=f'S{i}', admission_number=f'ADM{i}',
+                admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+                father_name='F', mother_name='M', guardian_contact='1',
+                current_class='10', current_section='A', roll_number=str(i + 1)
+            )
+
+    def _list_query_count(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries), resp
+
+    def test_list_query_count_independent_of_page_size(self):
+        self._create_students(2)
+        small, _ = self._list_query_count('/api/students/')
+        self._create_students(10, offset=2)
+        large, resp = self._list_query_count('/api/students/')
+        self.assertEqual(len(resp.data['results']), 12)
+        self.assertEqual(small, large)
+        self.assertNotIn('qr_code_data', resp.data['results'][0])
+
+    def test_search_omits_qr_payload(self):
+        self._create_students(3)
+        _, resp = self._list_query_count('/api/students/search/?query=S1')
+        self.assertNotIn('qr_code_data', resp.data['results'][0])
+
+    def test_detail_keeps_qr_payload(self):
+        self._create_students(1)
+        student = Student.objects.get()
+        resp = self.client.get(f'/api/students/{student.pk}/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('borrowed_books', resp.data['qr_code_data'])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RollNumberSequenceTest(TestCase):
+    def _create_student(self, username, roll_number=None, section='A'):
+        user = User.objects.create_user(username=username, password='pass', role='student')
+        return Student.objects.create(
+            user=user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='F',
+            father_name='F', mother_name='M', guardian_contact='1',
+            current_class='9', current_section=section, roll_number=roll_number
+        )
+
+    def test_rolls_are_assigned_sequentially_per_section(self):
+        first = self._create_student('a1')
+        second = self._create_student('a2')
+        other_section = self._create_student('b1', section='B')
+        self.assertEqual((first.roll_number, second.roll_number), ('1', '2'))
+        self.assertEqual(other_section.roll_number, '1')
+
+    def test_counter_starts_after_existing_rolls(self):
+        self._create_student('a1', roll_number='7')
+        self.assertEqual(self._create_student('a2').roll_number, '8')
+
+    def test_counter_skips_manually_assigned_rolls(self):
+        self._create_student('a1')
+        self._create_student('a2', roll_number='5')
+        self.assertEqual(self._create_student('a3').roll_number, '6')
+
+    def test_reserve_block(self):
+        self._create_student('a1')
+        block = RollNumberSequence.allocate('9', 'A', count=10)
+        self.assertEqual(list(block), list(range(2, 12)))
+        self.assertEqual(self._create_student('a2').roll_number, '12')
+
+    def test_admission_does_not_create_class_sections(self):
+        self._create_student('a1')
+        self.assertFalse(ClassSection.objects.exists())
+
+    def test_blank_and_missing_section_share_a_counter(self):
+        self.assertEqual(RollNumberSequence.allocate('9', None)[0], 1)
+        self.assertEqual(self._create_student('a1', section='').roll_number, '2')
+        self.assertEqual(RollNumberSequence.objects.get(class_name='9').section, '')
+
+    def test_edited_and_transferred_rolls_advance_the_counter(self):
+        student = self._create_student('a1')
+        self._create_student('b1', section='B')
+        student.roll_number = '9'
+        student.save()
+        self.assertEqual(self._create_student('a2').roll_number, '10')
+        student = Student.objects.get(pk=student.pk)
+        student.current_section, student.roll_number = 'B', '4'
+        student.save()
+        self.assertEqual(self._create_student('b2', section='B').roll_number, '5')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class QRCodeJobTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='qrstudent', password='pass', role='student')
+        self.student = Student.objects.create(
+            user=self.user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+            father_name='F', mother_name='M', guardian_contact='1',
+            current_class='8', current_section='A'
+        )
+
+    def test_create_queues_job_instead_of_rendering(self):
+        self.assertFalse(self.student.qr_code)
+        job = QRCodeJob.objects.get(kind='student', object_id=self.student.pk)
+        self.assertEqual(job.status, 'pending')
+
+    def test_runner_renders_pending_jobs(self):
+        self.assertEqual(process_pending_jobs(), 1)
+        self.student.refresh_from_db()
+        self.assertTrue(self.student.qr_code.name.endswith('.png'))
+        self.assertEqual(QRCodeJob.objects.get(object_id=self.student.pk).status, 'done')
+        self.assertEqual(process_pending_jobs(), 0)
+
+    @override_settings(MEDIA_ROOT=MEDIA_ROOT)
+    def test_only_claimed_jobs_run_and_stale_jobs_recover(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from backend.jobs import claim
+        # Another runner holds the job: this one must not touch it
+        token, claimed = claim(QRCodeJob, 10)
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(process_pending_jobs(), 0)
+
+        # ... until that runner is presumed dead and the retry delay has passed
+        QRCodeJob.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(process_pending_jobs(), 0)
+        self.assertEqual(QRCodeJob.objects.get().status, 'failed')
+        QRCodeJob.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(process_pending_jobs(), 1)
+        job = QRCodeJob.objects.get()
+        self.assertEqual((job.status, job.attempts), ('done', 2))
+
+        # Re-rendering replaces the stored file
+        self.student.refresh_from_db()
+        old = self.student.qr_code.name
+        QRCodeJob.enqueue('student', [self.student.pk])
+        self.assertEqual(process_pending_jobs(), 1)
+        self.student.refresh_from_db()
+        self.assertTrue(self.student.qr_code.storage.exists(self.student.qr_code.name))
+        self.assertFalse(self.student.qr_code.storage.exists(old))
+
+    def test_qr_view_renders_on_demand(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        resp = client.get(f'/api/students/{self.student.pk}/qr-code/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.data['qr_code_url'])
+        self.assertEqual(QRCodeJob.objects.get(object_id=self.student.pk).status, 'done')
+
+
+IMPORT_HEADER = (
+    'username,email,password,first_name,last_name,admission_date,date_of_birth,gender,'
+    'father_name,mother_name,guardian_contact,current_class,current_section,roll_number\n'
+)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, STUDENT_IMPORT_WORKERS=1)
+class StudentImportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='adminpass', role='admin')
+        self.client.force_authenticate(user=self.admin)
+
+    def _upload(self, body, **extra):
+        upload = SimpleUploadedFile('students.csv', (IMPORT_HEADER + body).encode(), content_type='text/csv')
+        return self.client.post('/api/students/import/', {'file': upload, **extra}, format='multipart')
+
+    def test_import_creates_students_and_reports_bad_rows(self):
+        resp = self._upload(
+            'ram,ram@example.com,secret123,Ram,KC,2024-04-01,2008-02-03,M,F,M,111,11,A,\n'
+            'sita,sita@example.com,,Sita,Rai,2024-04-01,2008-05-06,F,F,M,222,11,A,5\n'
+            'hari,hari@example.com,,Hari,BK,2024-04-01,2008-07-08,X,F,M,333,11,A,\n'
+            'ram,ram2@example.com,,Ram,Two,2024-04-01,2008-07-08,M,F,M,444,11,A,\n'
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['created'], 2)
+        self.assertEqual([e['row'] for e in resp.data['errors']], [4, 5])
+        self.assertIn('gender', resp.data['errors'][0]['errors'])
+        self.assertIn('username', resp.data['errors'][1]['errors'])
+
+        ram = Student.objects.get(user__username='ram')
+        self.assertEqual(ram.roll_number, '6')
+        self.assertTrue(ram.user.check_password('secret123'))
+        self.assertFalse(Student.objects.get(user__username='sita').user.has_usable_password())
+        self.assertEqual(QRCodeJob.objects.filter(status='pending').count(), 2)
+
+    def test_dry_run_writes_nothing(self):
+        resp = self._upload('ram,ram@example.com,,Ram,KC,2024-04-01,2008-02-03,M,F,M,111,11,A,\n', dry_run='true')
+        self.assertEqual(resp.data['created'], 1)
+        self.assertFalse(Student.objects.exists())
+
+    def test_student_id_follows_model_validator(self):
+        upload = SimpleUploadedFile('students.csv', (
+            IMPORT_HEADER.rstrip('\n') + ',student_id\n'
+            'ram,ram@example.com,,Ram,KC,2024-04-01,2008-02-03,M,F,M,111,11,A,,stu1\n'
+            'sita,sita@example.com,,Sita,Rai,2024-04-01,2008-05-06,F,F,M,222,11,A,,ŞT2\n'
+            'hari,hari@example.com,,Hari,BK,2024-04-01,2008-07-08,M,F,M,333,11,A,,STU3\n'
+        ).encode(), content_type='text/csv')
+        resp = self.client.post('/api/students/import/', {'file': upload}, format='multipart')
+        self.assertEqual(resp.data['created'], 1)
+        self.assertEqual([e['row'] for e in resp.data['errors']], [2, 3])
+        self.assertIn('student_id', resp.data['errors'][0]['errors'])
+
+    def test_rows_follow_model_field_rules(self):
+        upload = SimpleUploadedFile('students.csv', (
+            IMPORT_HEADER.rstrip('\n') + ',admission_number\n'
+            'ram,ram@example.com,,Ram,KC,2024-04-01,2008-02-03,M,F,M,111,11,A,,A1\n'
+            'sita,sita@example.com,,Sita,Rai,2024-04-01,2008-05-06,F,F,M,222,11,A,,A1\n'
+            'hari,hari@example.com,,Hari,BK,2024-04-01,2008-07-08,M,F,M,' + '9' * 25 + ',11,A,,A3\n'
+            'bad user!,gita@example.com,,Gita,BK,2024-04-01,2008-07-08,F,F,M,444,11,A,,A4\n'
+        ).encode(), content_type='text/csv')
+        resp = self.client.post('/api/students/import/', {'file': upload}, format='multipart')
+        self.assertEqual(resp.data['created'], 1)
+        self.assertEqual([(e['row'], list(e['errors'])) for e in resp.data['errors']],
+                         [(3, ['admission_number']), (4, ['guardian_contact']), (5, ['username'])])
+
+    def test_missing_columns_rejected(self):
+        upload = SimpleUploadedFile('students.csv', b'username,email\nram,ram@example.com\n', content_type='text/csv')
+        resp = self.client.post('/api/students/import/', {'file': upload}, format='multipart')
+        self.assertEqual(resp.status_code, 400)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class StudentSearchIndexTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='adminpass', role='admin')
+        self.client.force_authenticate(user=self.admin)
+        for username, first, last, section in [('ramk', 'Ram', 'Karki', 'A'), ('sitar', 'Sita', 'Ramdam', 'B'), ('hari', 'Hari', 'Bk', 'A')]:
+            user = User.objects.create_user(username=username, password='pass', role='student', first_name=first, last_name=last)
+            Student.objects.create(
+                user=user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+                father_name='F', mother_name='M', guardian_contact='1',
+                current_class='10', current_section=section
+            )
+
+    def _search(self, query):
+        resp = self.client.get('/api/students/search/', {'query': query})
+        self.assertEqual(resp.status_code, 200)
+        return [r['user_details']['username'] for r in resp.data['results']]
+
+    def test_substring_match_ranked(self):
+        self.assertEqual(set(self._search('ram')), {'ramk', 'sitar'})
+        self.assertEqual(self._search('karki'), ['ramk'])
+
+    def test_index_follows_name_changes_and_deletes(self):
+        user = User.objects.get(username='hari')
+        user.last_name = 'Gurung'
+        user.save()
+        self.assertEqual(self._search('gurung'), ['hari'])
+        Student.objects.get(user=user).delete()
+        self.assertEqual(self._search('gurung'), [])
+
+    def test_short_query_falls_back(self):
+        self.assertEqual(set(self._search('Bk')), {'hari'})
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RenumberRollsTest(TestCase):
+    def setUp(self):
+        for username, roll in [('r1', '4'), ('r2', '2'), ('r3', '9')]:
+            user = User.objects.create_user(username=username, password='pass', role='student')
+            Student.objects.create(
+                user=user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+                father_name='F', mother_name='M', guardian_contact='1',
+                current_class='7', current_section='A', roll_number=roll
+            )
+
+    def test_dry_run_reports_diff_without_writing(self):
+        out = StringIO()
+        call_command('renumber_rolls', '--dry-run', '--json', stdout=out)
+        diff = json.loads(out.getvalue())
+        self.assertEqual(diff['total_changes'], 2)
+        self.assertEqual(
+            [(c['username'], c['old'], c['new']) for c in diff['sections'][0]['changes']],
+            [('r1', '4', '1'), ('r3', '9', '3')]
+        )
+        self.assertEqual(Student.objects.get(user__username='r1').roll_number, '4')
+
+    def test_renumber_applies_swaps_and_resets_counter(self):
+        # r2 takes roll 1, which frees 2 for r1; the two-phase update avoids the collision
+        Student.objects.filter(user__username='r2').update(roll_number='1')
+        Student.objects.filter(user__username='r1').update(roll_number='2')
+        call_command('renumber_rolls', stdout=StringIO())
+        rolls = dict(Student.objects.values_list('user__username', 'roll_number'))
+        self.assertEqual(rolls, {'r1': '1', 'r2': '2', 'r3': '3'})
+        self.assertEqual(RollNumberSequence.allocate('7', 'A')[0], 4)
+        self.assertEqual(QRCodeJob.objects.filter(status='pending').count(), 3)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PublicProfileCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='pubstudent', password='pass', role='student', first_name='Asha')
+        self.student = Student.objects.create(
+            user=self.user, student_id='PUB1', admission_date='2020-01-01', date_of_birth='2005-01-01', gender='F',
+            father_name='F', mother_name='M', guardian_contact='1', current_class='6', current_section='A'
+        )
+        self.url = '/api/students/public/PUB1/'
+
+    def test_repeat_scan_gets_not_modified(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('ETag', first)
+        with self.assertNumQueries(0):
+            repeat = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+
+    def test_book_issue_invalidates_cached_payload(self):
+        from library.models import Book, BookIssue
+        first = self.client.get(self.url)
+        book = Book.objects.create(title='Muna Madan', author='Devkota')
+        BookIssue.objects.create(book=book, student=self.student, issued_by=self.user, issued_date='2024-01-01', due_date='2024-01-15')
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data['borrowed_books'][0]['title'], 'Muna Madan')
+
+    def test_unknown_student_not_found(self):
+        self.assertEqual(self.client.get('/api/students/public/NOPE/').status_code, 404)
+
+    def test_new_student_id_drops_old_entry(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        student = Student.objects.get(pk=self.student.pk)
+        student.student_id = 'PUB2'
+        student.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class SectionRosterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='teach', password=None, role='teacher'))
+        self.students = []
+        for i in range(11):
+            user = User.objects.create_user(username=f'roll{i}', password=None, role='student', first_name=f'Roll{i}')
+            self.students.append(Student.objects.create(
+                user=user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+                father_name='F', mother_name='M', guardian_contact='1', current_class='4', current_section='A'
+            ))
+        photo = BytesIO()
+        Image.new('RGB', (400, 300), 'red').save(photo, 'PNG')
+        self.students[0].profile_picture = SimpleUploadedFile('face.png', photo.getvalue(), content_type='image/png')
+        self.students[0].save()
+        self.section = ClassSection.objects.create(class_name='4', section='A')
+        self.url = f'/api/students/sections/{self.section.pk}/roster/'
+
+    def test_roster_is_sorted_by_roll_and_cached(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        rolls = [s['roll_number'] for s in first.data['students']]
+        self.assertEqual(rolls, [str(i) for i in range(1, 12)])
+        self.assertEqual(set(first.data['students'][0]), {'id', 'student_id', 'roll_number', 'name', 'thumbnail'})
+        self.assertTrue(first.data['students'][0]['thumbnail'].endswith('_96.jpg'))
+        self.assertIsNone(first.data['students'][1]['thumbnail'])
+        with self.assertNumQueries(1):
+            repeat = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+
+    def test_section_without_a_letter(self):
+        Student.objects.filter(pk=self.students[1].pk).update(current_class='5', current_section='')
+        section = ClassSection.objects.create(class_name='5', section=None)
+        resp = self.client.get(f'/api/students/sections/{section.pk}/roster/')
+        self.assertEqual([s['id'] for s in resp.data['students']], [self.students[1].pk])
+
+    def test_enrollment_changes_invalidate_both_sections(self):
+        other = ClassSection.objects.create(class_name='4', section='B')
+        self.client.get(self.url)
+        self.client.get(f'/api/students/sections/{other.pk}/roster/')
+        moved = Student.objects.get(pk=self.students[3].pk)
+        moved.current_section = 'B'
+        moved.roll_number = '1'
+        moved.save()
+        self.assertEqual(len(self.client.get(self.url).data['students']), 10)
+        self.assertEqual(len(self.client.get(f'/api/students/sections/{other.pk}/roster/').data['students']), 1)
+
+        user = self.students[1].user
+        user.first_name = 'Renamed'
+        user.save()
+        self.assertEqual(self.client.get(self.url).data['students'][1]['name'], 'Renamed')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, ID_CARD_WORKERS=1)
+class SectionIdCardsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='adminpass', role='admin')
+        for i in range(12):
+            user = User.objects.create_user(username=f'card{i}', password=None, role='student', first_name=f'Card{i}')
+            Student.objects.create(
+                user=user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+                father_name='F', mother_name='M', guardian_contact='1',
+                current_class='5', current_section='B'
+            )
+        # One stored QR, the rest are rendered on the fly
+        process_pending_jobs(batch_size=1)
+        self.section = ClassSection.objects.create(class_name='5', section='B')
+
+    def test_pdf_sheet_has_one_page_per_ten_cards(self):
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.get(f'/api/students/sections/{self.section.pk}/id-cards/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'application/pdf')
+        body = b''.join(resp.streaming_content)
+        self.assertTrue(body.startswith(b'%PDF'))
+        self.assertIn(b'/Count 2', body)
+
+    def test_zip_has_one_png_per_student_in_roll_order(self):
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.get(f'/api/students/sections/{self.section.pk}/id-cards/', {'output': 'zip'})
+        self.assertEqual(resp.status_code, 200)
+        with zipfile.ZipFile(BytesIO(b''.join(resp.streaming_content))) as archive:
+            names = archive.namelist()
+        self.assertEqual(len(names), 12)
+        self.assertEqual([n.split('_')[0] for n in names], [str(i) for i in range(1, 13)])
+
+    def test_students_cannot_download_cards(self):
+        self.client.force_authenticate(user=User.objects.get(username='card0'))
+        resp = self.client.get(f'/api/students/sections/{self.section.pk}/id-cards/')
+        self.assertEqual(resp.status_code, 403)
+
+
+class GenerateSchoolDataTest(TestCase):
+    options = dict(classes=2, sections=2, students=5, teachers=3, subjects=3, days=4, periods=2,
+                   exams=1, tasks=1, books=10, issues=10, notices=2, notifications=1)
+
+    def test_generates_consistent_dataset(self):
+        out = StringIO()
+        call_command('generate_school_data', *[f'--{k}={v}' for k, v in self.options.items()], stdout=out)
+        self.assertEqual(Student.objects.count(), 20)
+        self.assertEqual(Attendance.objects.count(), 20 * 4 * 2)
+        self.assertEqual(Result.objects.count(), 20 * 3)
+        self.assertEqual(RollNumberSequence.allocate('1', 'A')[0], 6)
+        self.assertEqual(student_index.filter(Student.objects.all(), 'STU0000001').count(), 1)
+
+    def test_same_seed_gives_same_data(self):
+        def snapshot():
+            return list(Attendance.objects.order_by('id').values_list('student__student_id', 'subject__code', 'date', 'status'))
+
+        SchoolDataGenerator(seed=7, **self.options).run()
+        first = snapshot()
+        call_command('flush', '--noinput', verbosity=0)
+        SchoolDataGenerator(seed=7, **self.options).run()
+        self.assertEqual(snapshot(), first)
@@ -5,6 +5,9 @@ app_name = 'students'
 
 urlpatterns = [
     path('', views.StudentListCreateView.as_view(), name='student-list-create'),
+    path('import/', views.StudentImportView.as_view(), name='student-import'),
+    path('sections/<int:pk>/roster/', views.SectionRosterView.as_view(), name='section-roster'),
+    path('sections/<int:pk>/id-cards/', views.SectionIdCardsView.as_view(), name='section-id-cards'),
     path('profile/', views.StudentProfileView.as_view(), name='student-profile'),
     path('public/<str:student_id>/', views.PublicStudentProfileView.as_view(), name='student-public-profile'),
     path('<int:pk>/', views.StudentDetailView.as_view(), name='student-detail'),
@@ -3,9 +3,17 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.db.models import Q
-from .models import Student
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from .models import Student, ClassSection
+from .qr import ensure_qr_code
+from .search import student_index
+from .cache import get_public_profile, cached_entry_response
+from .roster import get_roster
+from .importer import StudentImporter, ImportFileError, iter_rows
+from .idcards import build_sheet
 from .serializers import (
-    StudentSerializer, StudentCreateSerializer, StudentSearchSerializer,
+    StudentSerializer, StudentListSerializer, StudentCreateSerializer, StudentSearchSerializer,
     StudentProfileSerializer, StudentProfileUpdateSerializer
 )
 import logging
@@ -21,7 +29,7 @@ class StudentListCreateView(generics.ListCreateAPIView):
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return StudentCreateSerializer
-        return StudentSerializer
+        return StudentListSerializer
     
     def get_queryset(self):
         queryset = Student.objects.select_related('user').all()
@@ -54,6 +62,71 @@ class StudentListCreateView(generics.ListCreateAPIView):
         serializer.save()
 
 
+class StudentImportView(generics.GenericAPIView):
+    """
+    Admin-only bulk admission import from a CSV/XLSX upload.
+
+    Returns a per-row error report; pass `dry_run=true` to validate without saving.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = (MultiPartParser, FormParser)
+
+    def post(self, request, *args, **kwargs):
+        if request.user.role != 'admin':
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'detail': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        importer = StudentImporter(dry_run=dry_run)
+        try:
+            report = importer.run(iter_rows(upload, upload.name))
+        except ImportFileError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class SectionIdCardsView(generics.GenericAPIView):
+    """
+    Download printable ID cards for every active student of a ClassSection.
+
+    `?output=pdf` (default) returns a multi-page A4 sheet, `?output=zip` one PNG per card.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        if request.user.role not in ('admin', 'teacher'):
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        output = request.query_params.get('output', 'pdf').lower()
+        if output not in ('pdf', 'zip'):
+            return Response({'detail': 'output must be pdf or zip'}, status=status.HTTP_400_BAD_REQUEST)
+
+        class_section = get_object_or_404(ClassSection, pk=pk)
+        fileobj, filename, content_type = build_sheet(class_section, output)
+        return FileResponse(fileobj, as_attachment=True, filename=filename, content_type=content_type)
+
+
+class SectionRosterView(generics.GenericAPIView):
+    """
+    Lightweight roster of a ClassSection for taking attendance.
+
+    Active students sorted numerically by roll with id, roll number, name and
+    photo thumbnail. Served from cache with an ETag, so clients can revalidate
+    with If-None-Match at the start of every period.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        if request.user.role not in ('admin', 'teacher'):
+            return Response({'detail': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        class_section = get_object_or_404(ClassSection, pk=pk)
+        return cached_entry_response(request, get_roster(class_section))
+
+
 class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     View for retrieving, updating, and deleting a student
@@ -90,10 +163,8 @@ class StudentQRCodeView(generics.RetrieveAPIView):
             student.user != request.user):
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Ensure a QR image exists; generate if missing
-        if not student.qr_code:
-            student.generate_qr_code()
-            student.save()
+        # Render on demand only if the background job has not produced an image yet
+        ensure_qr_code(student)
 
         qr_data = student.get_qr_code_data()
         # Also include absolute URL to QR image when possible
@@ -121,7 +192,7 @@ class StudentSearchView(generics.ListAPIView):
     """
     View for searching students
     """
-    serializer_class = StudentSerializer
+    serializer_class = StudentListSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -131,7 +202,9 @@ class StudentSearchView(generics.ListAPIView):
         queryset = Student.objects.select_related('user').all()
         
         if query:
-            queryset = queryset.filter(
+            # Ranked FTS lookup; short queries fall back to a plain scan
+            searched = student_index.filter(queryset, query)
+            queryset = searched if searched is not None else queryset.filter(
                 Q(student_id__icontains=query) |
                 Q(user__first_name__icontains=query) |
                 Q(user__last_name__icontains=query) |
@@ -154,20 +227,27 @@ class PublicStudentProfileView(generics.RetrieveAPIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, student_id, *args, **kwargs):
-        try:
-            student = Student.objects.get(student_id=student_id)
-        except Student.DoesNotExist:
-            return Response({'detail': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
+        def build():
+            try:
+                student = Student.objects.select_related('user').get(student_id=student_id)
+            except Student.DoesNotExist:
+                return None
 
-        data = student.get_qr_code_data()
-        # Do not include any sensitive user fields like email/password
-        safe_user = {
-            'first_name': student.user.first_name,
-            'last_name': student.user.last_name,
-            'profile_picture': student.user.profile_picture.url if student.user.profile_picture else None,
-        }
-        data['user'] = safe_user
-        return Response(data)
+            data = student.get_qr_code_data()
+            # Do not include any sensitive user fields like email/password
+            safe_user = {
+                'first_name': student.user.first_name,
+                'last_name': student.user.last_name,
+                'profile_picture': student.user.profile_picture.url if student.user.profile_picture else None,
+            }
+            data['user'] = safe_user
+            return data
+
+        # Cached per student_id; repeat scans are answered with 304 Not Modified
+        entry = get_public_profile('student', student_id, build)
+        if entry is None:
+            return Response({'detail': 'Student not found'}, status=status.HTTP_404_NOT_FOUND)
+        return cached_entry_response(request, entry)
 
 
 class StudentProfileView(generics.RetrieveUpdateAPIView):
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 from students.models import Student
 from teachers.models import Teacher
@@ -26,10 +27,28 @@ class Task(models.Model):
     
     class Meta:
         ordering = ['-due_date']
+        indexes = [
+            models.Index(fields=['assigned_to_class', 'assigned_to_section'], name='task_class_section_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def for_student(cls, student):
+        """
+        Tasks assigned to the student directly or to their class (any or their section).
+
+        Written as an OR of indexable terms instead of a join on the M2M table,
+        so no DISTINCT is needed and the database can use an index per term.
+        """
+        direct = cls.assigned_to_students.through.objects.filter(student=student).values('task_id')
+        return cls.objects.filter(
+            Q(pk__in=direct)
+            | Q(assigned_to_class=student.current_class, assigned_to_section__in=['', student.current_section])
+            | Q(assigned_to_class=student.current_class, assigned_to_section__isnull=True)
+        )
+
     @property
     def is_overdue(self):
         """Check if task deadline has passed"""
@@ -1,4 +1,7 @@
-from django.test import TestCase
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from students.models import Student
@@ -8,7 +11,13 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils import timezone
 
 User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
 
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
 class AdminTaskVisibilityTests(TestCase):
     def setUp(self):
         self.client = APIClient()
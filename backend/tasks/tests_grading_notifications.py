@@ -1,3 +1,6 @@
+import shutil
+import tempfile
+
 from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
@@ -10,8 +13,13 @@ from notices.models import UserNotification
 from django.core import mail
 
 User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
 
-@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
 class GradingNotificationTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -5,7 +5,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.utils import timezone
-from django.db.models import Q, Avg, Count
+from django.db.models import Avg, Count
 from .models import Task, TaskSubmission
 from .serializers import (
     TaskSerializer, TaskDetailSerializer, TaskSubmissionSerializer,
@@ -29,10 +29,7 @@ class TaskListCreateView(generics.ListCreateAPIView):
             # Students see tasks assigned to them, their class, or their class+section
             try:
                 student = Student.objects.get(user=user)
-                return Task.objects.filter(
-                    Q(assigned_to_students=student) |
-                    (Q(assigned_to_class=student.current_class) & (Q(assigned_to_section__isnull=True) | Q(assigned_to_section='') | Q(assigned_to_section=student.current_section)))
-                ).distinct()
+                return Task.for_student(student)
             except Student.DoesNotExist:
                 return Task.objects.none()
         
@@ -87,10 +84,7 @@ class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
         if user.role == 'student':
             try:
                 student = Student.objects.get(user=user)
-                return Task.objects.filter(
-                    Q(assigned_to_students=student) |
-                    (Q(assigned_to_class=student.current_class) & (Q(assigned_to_section__isnull=True) | Q(assigned_to_section='') | Q(assigned_to_section=student.current_section)))
-                ).distinct()
+                return Task.for_student(student)
             except Student.DoesNotExist:
                 return Task.objects.none()
         
@@ -254,10 +248,7 @@ def student_task_scores(request, student_id):
     
     submissions = TaskSubmission.objects.filter(student=student, status='graded')
     
-    total_tasks = Task.objects.filter(
-        Q(assigned_to_students=student) |
-        (Q(assigned_to_class=student.current_class) & (Q(assigned_to_section__isnull=True) | Q(assigned_to_section='') | Q(assigned_to_section=student.current_section)))
-    ).distinct().count()
+    total_tasks = Task.for_student(student).count()
     
     completed = submissions.count()
     total_score = sum(sub.score for sub in submissions if sub.score is not None)
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from students.search import teacher_index
+    with schema_editor.connection.cursor() as cursor:
+        teacher_index.create(cursor)
+        cursor.execute(teacher_index._insert_sql(teacher_index.source_sql))
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from students.search import teacher_index
+    with schema_editor.connection.cursor() as cursor:
+        teacher_index.drop(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teachers', '0003_teacher_assigned_sections'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
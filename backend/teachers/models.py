@@ -58,64 +58,84 @@ class Teacher(models.Model):
     def __str__(self):
         return f"{self.employee_id} - {self.user.get_full_name()}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # A new employee_id drops the profile cached under the old one
+        if 'employee_id' in field_names:
+            instance._loaded_employee_id = instance.employee_id
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.employee_id:
             # Generate unique employee ID if not provided
             self.employee_id = f"TCH{str(uuid.uuid4())[:8].upper()}"
-        # Generate QR code if not exists
-        if not self.qr_code:
-            try:
-                self.generate_qr_code()
-            except Exception:
-                # Fail silently; QR generation is optional
-                pass
+        adding = self._state.adding
         super().save(*args, **kwargs)
 
+        # QR images are rendered by the background runner (see students.qr)
+        if adding and not self.qr_code:
+            from students.models import QRCodeJob
+            QRCodeJob.enqueue('teacher', [self.pk])
+
+    def qr_identifier(self):
+        return self.employee_id
+
+    def qr_payload(self):
+        """Text encoded in the QR image: a link to the public profile page."""
+        from students.qr import profile_url
+        return profile_url('teacher', self.employee_id)
+
     def generate_qr_code(self):
         """
-        Generate QR code image for teacher containing basic information
+        Render the QR code image for the teacher (without saving the model)
         """
         try:
-            import qrcode
-            from io import BytesIO
             from django.core.files.base import ContentFile
-
-            qr_data = {
-                'employee_id': self.employee_id,
-                'name': self.user.get_full_name(),
-                'department': self.department,
-                'designation': self.designation,
-                'qualification': self.qualification,
-            }
-
-                # Prefer encoding a frontend profile URL in the QR so scanning opens a readable page
-            try:
-                from django.conf import settings
-                profile_url = f"{getattr(settings, 'FRONTEND_URL', '').rstrip('/')}" + f"/public/teacher/{self.employee_id}"
-                qr_payload = profile_url
-            except Exception:
-                qr_payload = "|".join([f"{k}:{v}" for k, v in qr_data.items()])
-
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(qr_payload)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-
-            buffer = BytesIO()
-            img.save(buffer, format='PNG')
-            buffer.seek(0)
+            from students.qr import render_qr_png
 
             filename = f"qr_{self.employee_id}.png"
-            self.qr_code.save(filename, ContentFile(buffer.getvalue()), save=False)
+            self.qr_code.save(filename, ContentFile(render_qr_png(self.qr_payload())), save=False)
         except Exception:
             # Log or ignore silently
             pass
 
+    @staticmethod
+    def with_activity(queryset):
+        """
+        Annotate session/attendance counts and prefetch currently issued books.
+
+        Lets listings show the activity summary without per-row queries; the
+        helpers below use these values when present.
+        """
+        from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery
+        from django.db.models.functions import Coalesce
+        from attendance.models import Attendance, AttendanceSession
+        from library.models import BookIssue
+
+        def count_of(model):
+            rows = model.objects.filter(teacher=OuterRef('pk')).order_by().values('teacher').annotate(n=Count('*')).values('n')
+            return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+        return queryset.annotate(
+            attendance_sessions_count=count_of(AttendanceSession),
+            marked_attendances_count=count_of(Attendance),
+        ).prefetch_related(
+            Prefetch('book_issues', queryset=BookIssue.objects.filter(status='issued').select_related('book'), to_attr='issued_books')
+        )
+
+    def current_issues(self):
+        if hasattr(self, 'issued_books'):
+            return self.issued_books
+        from library.models import BookIssue
+        return BookIssue.objects.filter(teacher=self, status='issued').select_related('book')
+
+    def activity_counts(self):
+        """(attendance sessions created, attendances marked)"""
+        if hasattr(self, 'attendance_sessions_count'):
+            return self.attendance_sessions_count, self.marked_attendances_count
+        return self.attendance_sessions.count(), self.marked_attendances.count()
+
     def get_qr_code_data(self):
         """
         Return QR code data as dictionary for teacher
@@ -134,8 +154,6 @@ class Teacher(models.Model):
 
         # Add current issued books to teacher (if any)
         try:
-            from library.models import BookIssue
-            issues = BookIssue.objects.filter(teacher=self, status='issued').select_related('book')
             data['borrowed_books'] = [
                 {
                     'book_id': i.book.id,
@@ -143,15 +161,14 @@ class Teacher(models.Model):
                     'issued_date': i.issued_date.isoformat() if i.issued_date else None,
                     'status': i.status,
                 }
-                for i in issues
+                for i in self.current_issues()
             ]
         except Exception:
             data['borrowed_books'] = []
 
         # Add basic attendance summary (sessions created and marked attendances)
         try:
-            data['attendance_sessions_count'] = self.attendance_sessions.count()
-            data['marked_attendances_count'] = self.marked_attendances.count()
+            data['attendance_sessions_count'], data['marked_attendances_count'] = self.activity_counts()
         except Exception:
             data['attendance_sessions_count'] = 0
             data['marked_attendances_count'] = 0
@@ -64,6 +64,39 @@ class TeacherSerializer(serializers.ModelSerializer):
         return url
 
 
+class TeacherListSerializer(TeacherSerializer):
+    """
+    Serializer for teacher listings and search results.
+
+    Reads the activity counts and issued books from `Teacher.with_activity()`
+    instead of building the full QR payload for every row.
+    """
+    qr_code_data = None
+    attendance_sessions_count = serializers.IntegerField(read_only=True)
+    marked_attendances_count = serializers.IntegerField(read_only=True)
+    borrowed_books = serializers.SerializerMethodField()
+
+    class Meta(TeacherSerializer.Meta):
+        fields = [
+            'id', 'employee_id', 'joining_date', 'user', 'user_details',
+            'qualification', 'department', 'designation', 'experience_years', 'salary',
+            'emergency_contact', 'emergency_contact_name', 'qr_code', 'qr_code_url',
+            'attendance_sessions_count', 'marked_attendances_count', 'borrowed_books',
+            'is_active', 'created_at', 'updated_at'
+        ]
+
+    def get_borrowed_books(self, obj):
+        return [
+            {
+                'book_id': i.book_id,
+                'title': i.book.title,
+                'issued_date': i.issued_date.isoformat() if i.issued_date else None,
+                'status': i.status,
+            }
+            for i in obj.current_issues()
+        ]
+
+
 class TeacherCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating teachers with user account
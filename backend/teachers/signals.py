@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from attendance.signals import is_muted
+from students.cache import invalidate_public_profiles, invalidate_teacher_profiles
+from students.search import teacher_index
+from students.signals import INDEXED_USER_FIELDS
+from .models import Teacher
+
+
+@receiver(post_save, sender=Teacher)
+def index_teacher(sender, instance, raw=False, **kwargs):
+    if not raw:
+        teacher_index.update([instance])
+
+
+@receiver(post_delete, sender=Teacher)
+def unindex_teacher(sender, instance, **kwargs):
+    teacher_index.remove([instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reindex_teacher_user(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    if raw or created or instance.role != 'teacher':
+        return
+    if update_fields is not None and not INDEXED_USER_FIELDS.intersection(update_fields):
+        return
+    teacher = Teacher.objects.filter(user=instance).select_related('user').first()
+    if teacher is not None:
+        teacher_index.update([teacher])
+
+
+@receiver([post_save, post_delete], sender=Teacher)
+def invalidate_teacher_profile(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_public_profiles('teacher', [instance.employee_id, getattr(instance, '_loaded_employee_id', None)])
+
+
+@receiver([post_save, post_delete], sender='attendance.Attendance')
+@receiver([post_save, post_delete], sender='attendance.AttendanceSession')
+def invalidate_teacher_profile_for_attendance(sender, instance, raw=False, **kwargs):
+    # Session and marked-attendance counts are part of the public payload;
+    # bulk marking and archiving call invalidate_teacher_profiles themselves
+    if not raw and instance.teacher_id and not is_muted():
+        invalidate_teacher_profiles([instance.teacher_id])
+
+
+@receiver([post_save, post_delete], sender='library.BookIssue')
+def invalidate_teacher_profile_for_issue(sender, instance, raw=False, **kwargs):
+    if not raw and instance.teacher_id:
+        invalidate_public_profiles(
+            'teacher', Teacher.objects.filter(pk=instance.teacher_id).values_list('employee_id', flat=True)
+        )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_teacher_profile_for_user(sender, instance, created=False, update_fields=None, raw=False, **kwargs):
+    if raw or created or instance.role != 'teacher':
+        return
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_public_profiles('teacher', Teacher.objects.filter(user=instance).values_list('employee_id', flat=True))
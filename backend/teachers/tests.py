@@ -1,7 +1,13 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from django.urls import reverse
 from accounts.models import User
+from attendance.models import Subject, AttendanceSession
+from library.models import Book, BookIssue
+from .models import Teacher
 
 
 class TeacherAPICreationTest(TestCase):
@@ -35,3 +41,95 @@ class TeacherAPICreationTest(TestCase):
         # Ensure teacher created and linked to user
         self.assertIn('employee_id', resp.data)
         self.assertEqual(resp.data['user_details']['email'], payload['email'])
+
+
+class TeacherSearchIndexTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='adminpass', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        user = User.objects.create_user(username='tmaya', password='pass', role='teacher', first_name='Maya', last_name='Shrestha')
+        Teacher.objects.create(user=user, joining_date='2020-01-01', qualification='M.Sc', department='Science')
+
+    def test_search_uses_index(self):
+        resp = self.client.get(reverse('teachers:teacher-search'), {'query': 'shrest'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([t['user_details']['username'] for t in resp.data['results']], ['tmaya'])
+
+
+class TeacherListQueryCountTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='adminpass', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.subject = Subject.objects.create(name='Science', code='SCI')
+        self.book = Book.objects.create(title='Optics', author='Newton', total_copies=5)
+
+    def _create_teachers(self, count, offset=0):
+        for i in range(offset, offset + count):
+            user = User.objects.create_user(username=f'teach{i}', password=None, role='teacher')
+            teacher = Teacher.objects.create(user=user, joining_date='2020-01-01', qualification='M.Sc', department='Science')
+            AttendanceSession.objects.create(
+                subject=self.subject, date='2025-01-01', period=i + 1, class_name='10', section='A', teacher=teacher
+            )
+            BookIssue.objects.create(
+                book=self.book, teacher=teacher, issued_by=self.admin, issued_date='2025-01-01', due_date='2025-01-15'
+            )
+
+    def _list(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries), resp
+
+    def test_list_query_count_independent_of_rows(self):
+        self._create_teachers(2)
+        small, _ = self._list(reverse('teachers:teacher-list-create'))
+        self._create_teachers(8, offset=2)
+        large, resp = self._list(reverse('teachers:teacher-list-create'))
+        self.assertEqual(small, large)
+        row = resp.data['results'][0]
+        self.assertNotIn('qr_code_data', row)
+        self.assertEqual(row['attendance_sessions_count'], 1)
+        self.assertEqual(row['marked_attendances_count'], 0)
+        self.assertEqual([b['title'] for b in row['borrowed_books']], ['Optics'])
+
+    def test_search_uses_annotations(self):
+        self._create_teachers(3)
+        _, resp = self._list(reverse('teachers:teacher-search') + '?query=teach')
+        self.assertEqual(len(resp.data['results']), 3)
+        self.assertTrue(all(r['attendance_sessions_count'] == 1 for r in resp.data['results']))
+
+
+class PublicTeacherProfileCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        user = User.objects.create_user(username='pubteacher', password=None, role='teacher')
+        self.teacher = Teacher.objects.create(user=user, employee_id='TCHPUB', joining_date='2020-01-01', qualification='M.Sc', department='Science')
+        self.subject = Subject.objects.create(name='Science', code='SCI')
+
+    def test_attendance_writes_refresh_activity_counts(self):
+        from attendance.services import mark_session
+        from students.models import Student
+        url = '/api/teachers/public/TCHPUB/'
+        self.assertEqual(self.client.get(url).data['attendance_sessions_count'], 0)
+        session = AttendanceSession.objects.create(
+            subject=self.subject, date='2025-01-01', period=1, class_name='10', section='A', teacher=self.teacher
+        )
+        self.assertEqual(self.client.get(url).data['attendance_sessions_count'], 1)
+
+        student_user = User.objects.create_user(username='s1', password=None, role='student')
+        student = Student.objects.create(
+            user=student_user, admission_date='2020-01-01', date_of_birth='2005-01-01', gender='M',
+            father_name='F', mother_name='M', guardian_contact='1', current_class='10', current_section='A',
+        )
+        mark_session(session, [{'student': student.pk, 'status': 'present'}], self.teacher.user)
+        self.assertEqual(self.client.get(url).data['marked_attendances_count'], 1)
+
+    def test_new_employee_id_drops_old_entry(self):
+        self.assertEqual(self.client.get('/api/teachers/public/TCHPUB/').status_code, 200)
+        teacher = Teacher.objects.get(pk=self.teacher.pk)
+        teacher.employee_id = 'TCHNEW'
+        teacher.save()
+        self.assertEqual(self.client.get('/api/teachers/public/TCHPUB/').status_code, 404)
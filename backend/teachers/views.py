@@ -4,7 +4,10 @@ from rest_framework.response import Response
 from django.db.models import Q
 from django.db import IntegrityError
 from .models import Teacher
-from .serializers import TeacherSerializer, TeacherCreateSerializer
+from .serializers import TeacherSerializer, TeacherListSerializer, TeacherCreateSerializer
+from students.qr import ensure_qr_code
+from students.search import teacher_index
+from students.cache import get_public_profile, cached_entry_response
 
 
 class TeacherListCreateView(generics.ListCreateAPIView):
@@ -17,10 +20,12 @@ class TeacherListCreateView(generics.ListCreateAPIView):
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return TeacherCreateSerializer
-        return TeacherSerializer
+        return TeacherListSerializer
     
     def get_queryset(self):
         queryset = Teacher.objects.select_related('user').all()
+        if self.request.method == 'GET':
+            queryset = Teacher.with_activity(queryset)
         
         # Filter by department if provided
         department = self.request.query_params.get('department', None)
@@ -82,17 +87,19 @@ class TeacherSearchView(generics.ListAPIView):
     """
     View for searching teachers
     """
-    serializer_class = TeacherSerializer
+    serializer_class = TeacherListSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
         query = self.request.query_params.get('query', '')
         department_filter = self.request.query_params.get('department', None)
         
-        queryset = Teacher.objects.select_related('user').all()
+        queryset = Teacher.with_activity(Teacher.objects.select_related('user').all())
         
         if query:
-            queryset = queryset.filter(
+            # Ranked FTS lookup; short queries fall back to a plain scan
+            searched = teacher_index.filter(queryset, query)
+            queryset = searched if searched is not None else queryset.filter(
                 Q(employee_id__icontains=query) |
                 Q(user__first_name__icontains=query) |
                 Q(user__last_name__icontains=query) |
@@ -121,10 +128,8 @@ class TeacherQRCodeView(generics.RetrieveAPIView):
         if (request.user.role not in ['admin'] and teacher.user != request.user):
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
-        # Ensure QR image exists
-        if not teacher.qr_code:
-            teacher.generate_qr_code()
-            teacher.save()
+        # Render on demand only if the background job has not produced an image yet
+        ensure_qr_code(teacher)
 
         qr_data = teacher.get_qr_code_data()
         # Include absolute URL when possible
@@ -161,16 +166,23 @@ class PublicTeacherProfileView(generics.RetrieveAPIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, employee_id, *args, **kwargs):
-        try:
-            teacher = Teacher.objects.get(employee_id=employee_id)
-        except Teacher.DoesNotExist:
+        def build():
+            try:
+                teacher = Teacher.objects.select_related('user').get(employee_id=employee_id)
+            except Teacher.DoesNotExist:
+                return None
+
+            data = teacher.get_qr_code_data()
+            safe_user = {
+                'first_name': teacher.user.first_name,
+                'last_name': teacher.user.last_name,
+                'profile_picture': teacher.user.profile_picture.url if teacher.user.profile_picture else None,
+            }
+            data['user'] = safe_user
+            return data
+
+        # Cached per employee_id; repeat scans are answered with 304 Not Modified
+        entry = get_public_profile('teacher', employee_id, build)
+        if entry is None:
             return Response({'detail': 'Teacher not found'}, status=status.HTTP_404_NOT_FOUND)
-
-        data = teacher.get_qr_code_data()
-        safe_user = {
-            'first_name': teacher.user.first_name,
-            'last_name': teacher.user.last_name,
-            'profile_picture': teacher.user.profile_picture.url if teacher.user.profile_picture else None,
-        }
-        data['user'] = safe_user
-        return Response(data)
\ No newline at end of file
+        return cached_entry_response(request, entry)